@@ -0,0 +1,130 @@
+"""
+Batched deletion of user accounts.
+
+Deleting a User in one call makes the Django collector load the whole cascade (sessions, systems, links,
+characters, sheets and their history) into memory and delete it in one long transaction holding locks on
+every table it touches. Instead, request_deletion() only disables the account, revokes its API tokens and
+queues a 'delete_account' job. The job runs STEPS from the leaves of the cascade up, each in batches of
+ACCOUNT_DELETION_BATCH_SIZE rows committed in their own transaction, and records its progress in AccountDeletion.
+The user row is deleted last, when only the profiles are left to cascade.
+
+Rows the user wrote in other users' data (messages in foreign sessions, changes of foreign sheets) are kept
+and detached from the user, as the SET_NULL foreign keys of these models require, also in batches.
+
+An interrupted deletion simply continues from the remaining rows when the job is retried. The job worker renews
+the lease of the job while it runs, so a long deletion is not queued again under a second worker.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import (AccountDeletion, ArchivedGameSession, ArchivedGameSystem, ArchivedSessionCharacter,
+                     ArchivedSessionMessage, CharacterSheet, CharacterSheetEvent, CharacterSheetSnapshot,
+                     DailyActivity, GameSession, GameSystem, PlayerCharacter, SentReminder, SessionMessage,
+                     SessionRecommendation, SlotReservation)
+from .tokens import revoke_user_tokens
+
+LINKS = PlayerCharacter.game_session_id.through
+
+# (step name, function returning the rows of the user, None to delete them or the fields to update them with)
+STEPS = [
+    ('session_messages', lambda user: SessionMessage.objects.filter(session_id__owner_id__user_id=user), None),
+    ('authored_messages', lambda user: SessionMessage.objects.filter(user_id=user), {'user_id': None}),
+    ('sent_reminders', lambda user: SentReminder.objects.filter(session_id__owner_id__user_id=user), None),
+    ('slot_reservations', lambda user: SlotReservation.objects.filter(session_id__owner_id__user_id=user), None),
+    ('recommendations', lambda user: SessionRecommendation.objects.filter(
+        Q(session_id__owner_id__user_id=user) | Q(player_id__user_id=user)), None),
+    ('game_systems', lambda user: GameSystem.objects.filter(session_id__owner_id__user_id=user), None),
+    ('session_links', lambda user: LINKS.objects.filter(
+        Q(gamesession_id__owner_id__user_id=user) | Q(playercharacter_id__owner_id__user_id=user)), None),
+    ('archived_session_messages', lambda user: ArchivedSessionMessage.objects.filter(
+        session_id__owner_id__user_id=user), None),
+    ('authored_archived_messages', lambda user: ArchivedSessionMessage.objects.filter(user_id=user),
+     {'user_id': None}),
+    ('archived_session_characters', lambda user: ArchivedSessionCharacter.objects.filter(
+        Q(session_id__owner_id__user_id=user) | Q(character_id__owner_id__user_id=user)), None),
+    ('archived_game_systems', lambda user: ArchivedGameSystem.objects.filter(session_id__owner_id__user_id=user),
+     None),
+    ('archived_game_sessions', lambda user: ArchivedGameSession.objects.filter(owner_id__user_id=user), None),
+    ('game_sessions', lambda user: GameSession.objects.filter(owner_id__user_id=user), None),
+    ('daily_activity', lambda user: DailyActivity.objects.filter(owner_id__user_id=user), None),
+    ('authored_sheet_events', lambda user: CharacterSheetEvent.objects.filter(user_id=user).exclude(
+        sheet_id__character_id__owner_id__user_id=user), {'user_id': None}),
+    ('sheet_events', lambda user: CharacterSheetEvent.objects.filter(
+        sheet_id__character_id__owner_id__user_id=user), None),
+    ('sheet_snapshots', lambda user: CharacterSheetSnapshot.objects.filter(
+        sheet_id__character_id__owner_id__user_id=user), None),
+    ('character_sheets', lambda user: CharacterSheet.objects.filter(character_id__owner_id__user_id=user), None),
+    ('characters', lambda user: PlayerCharacter.objects.filter(owner_id__user_id=user), None),
+]
+
+
+def request_deletion(user, queue=True):
+    """
+    Disables the account of the user and revokes its API tokens at once and, with `queue`, queues the deletion
+    of its data for the job workers. Returns the AccountDeletion.
+    """
+    from .jobs import enqueue
+
+    with transaction.atomic():
+        deletion = AccountDeletion.objects.filter(user_id=user).exclude(status=AccountDeletion.Status.DONE).first()
+        if deletion is not None:
+            return deletion
+        # An unusable password also changes the session auth hash, which logs the user out everywhere.
+        user.is_active = False
+        user.set_unusable_password()
+        user.save(update_fields=['is_active', 'password'])
+        revoke_user_tokens(user)
+        deletion = AccountDeletion.objects.create(user_id=user, username=user.username)
+        if queue:
+            enqueue('delete_account', deletion_id=deletion.pk)
+    return deletion
+
+
+def count_rows(user):
+    return sum(rows(user).count() for _, rows, _ in STEPS)
+
+
+def delete_batch(deletion, user, batch_size):
+    """
+    Deletes or detaches up to `batch_size` rows of the first unfinished step in one transaction. Returns the
+    number of rows, 0 once every step is finished.
+    """
+    for name, rows, update in STEPS:
+        with transaction.atomic():
+            pks = list(rows(user).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                continue
+            batch = rows(user).model.objects.filter(pk__in=pks)
+            count = batch.delete()[0] if update is None else batch.update(**update)
+            AccountDeletion.objects.filter(pk=deletion.pk).update(step=name, deleted_rows=F('deleted_rows') + count)
+        return len(pks)
+    return 0
+
+
+def run_deletion(deletion, batch_size=None):
+    """
+    Deletes the data of the user of `deletion` batch by batch, then the user itself. Yields the size of every
+    committed batch, so callers can report progress.
+    """
+    batch_size = batch_size or settings.ACCOUNT_DELETION_BATCH_SIZE
+    user = User.objects.filter(pk=deletion.user_id_id).first()
+    if user is not None:
+        if deletion.status == AccountDeletion.Status.QUEUED:
+            deletion.total_rows = count_rows(user)
+            deletion.status = AccountDeletion.Status.RUNNING
+            deletion.save(update_fields=['total_rows', 'status'])
+        while True:
+            deleted = delete_batch(deletion, user, batch_size)
+            if not deleted:
+                break
+            yield deleted
+            time.sleep(settings.ACCOUNT_DELETION_BATCH_PAUSE)
+        # Only the GameMaster and Player profiles are left to cascade.
+        user.delete()
+    AccountDeletion.objects.filter(pk=deletion.pk).update(status=AccountDeletion.Status.DONE, step='',
+                                                          finished_date=timezone.now())
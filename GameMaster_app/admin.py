@@ -1,3 +1,235 @@
+"""
+Admin registrations made for large tables.
+
+Every changelist uses EstimatedCountPaginator and show_full_result_count=False, so no page runs a full
+COUNT(*), loads the related rows it displays with list_select_related, and is ordered by primary key. Foreign
+keys to users, characters and sheets are edited as raw ids and those to game masters, players and sessions
+with autocomplete, so forms never render a select with every row of a table.
+"""
+import json
+
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .models import (AccountDeletion, ArchivedGameSession, ArchivedGameSystem, ArchivedSessionCharacter,
+                     ArchivedSessionMessage, CharacterSheet, CharacterSheetEvent, CharacterSheetSnapshot,
+                     DailyActivity, GameMaster, GameSession, GameSystem, Job, Player, PlayerCharacter, RenderedText,
+                     RevokedToken, RollupWatermark, SentReminder, SessionMessage, SessionRecommendation,
+                     SlotReservation)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator counting large PostgreSQL tables from planner statistics instead of COUNT(*).
+
+    Unfiltered querysets use pg_class.reltuples, filtered ones the row estimate of their EXPLAIN plan. Estimates
+    below ADMIN_EXACT_COUNT_LIMIT, and every count on other databases, are exact.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            estimate = self.estimate(queryset, connection)
+            if estimate is not None and estimate >= settings.ADMIN_EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def estimate(queryset, connection):
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                               [connection.ops.quote_name(queryset.model._meta.db_table)])
+                row = cursor.fetchone()
+                # reltuples is -1 for tables never analyzed.
+                return row[0] if row and row[0] >= 0 else None
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ['-pk']
+    list_per_page = 50
+
+
+class AppendOnlyAdmin(ScalableAdmin):
+    """
+    Read-only admin for append-only logs, whose models refuse updates and deletes.
+    """
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(GameMaster)
+class GameMasterAdmin(ScalableAdmin):
+    list_display = ['user_nickname', 'user_id', 'is_game_master', 'creation_date']
+    list_select_related = ['user_id']
+    raw_id_fields = ['user_id']
+    search_fields = ['user_nickname', 'user_id__username']
+
+
+@admin.register(Player)
+class PlayerAdmin(ScalableAdmin):
+    list_display = ['player_nickname', 'user_id', 'is_player', 'creation_date']
+    list_select_related = ['user_id']
+    raw_id_fields = ['user_id']
+    search_fields = ['player_nickname', 'user_id__username']
+
+
+@admin.register(GameSession)
+class GameSessionAdmin(ScalableAdmin):
+    list_display = ['title', 'owner_id', 'session_date', 'slots', 'is_public', 'is_open']
+    list_filter = ['is_public', 'is_open']
+    list_select_related = ['owner_id']
+    autocomplete_fields = ['owner_id']
+    search_fields = ['title']
+
+
+@admin.register(GameSystem)
+class GameSystemAdmin(ScalableAdmin):
+    list_display = ['session_id', 'system', 'creation_date']
+    list_filter = ['system']
+    list_select_related = ['session_id']
+    autocomplete_fields = ['session_id']
+
+
+@admin.register(PlayerCharacter)
+class PlayerCharacterAdmin(ScalableAdmin):
+    list_display = ['name', 'owner_id', 'character_status', 'creation_date']
+    list_filter = ['character_status']
+    list_select_related = ['owner_id']
+    autocomplete_fields = ['owner_id']
+    raw_id_fields = ['game_session_id']
+    search_fields = ['name']
+
+
+@admin.register(CharacterSheet)
+class CharacterSheetAdmin(ScalableAdmin):
+    list_display = ['character_id', 'strength', 'dexterity', 'life_points', 'wealth', 'reputation']
+    list_select_related = ['character_id']
+    raw_id_fields = ['character_id']
+
+
+@admin.register(CharacterSheetEvent)
+class CharacterSheetEventAdmin(AppendOnlyAdmin):
+    list_display = ['sheet_id', 'sequence', 'user_id', 'creation_date']
+    list_select_related = ['sheet_id__character_id', 'user_id']
+    raw_id_fields = ['sheet_id', 'user_id']
+
+
+@admin.register(CharacterSheetSnapshot)
+class CharacterSheetSnapshotAdmin(AppendOnlyAdmin):
+    list_display = ['sheet_id', 'sequence', 'creation_date']
+    list_select_related = ['sheet_id__character_id']
+    raw_id_fields = ['sheet_id']
+
+
+@admin.register(ArchivedGameSession)
+class ArchivedGameSessionAdmin(ScalableAdmin):
+    list_display = ['title', 'owner_id', 'session_date', 'archived_date']
+    list_select_related = ['owner_id']
+    autocomplete_fields = ['owner_id']
+    search_fields = ['title']
+
+
+@admin.register(ArchivedGameSystem)
+class ArchivedGameSystemAdmin(ScalableAdmin):
+    list_display = ['session_id', 'system', 'creation_date']
+    list_select_related = ['session_id']
+    raw_id_fields = ['session_id']
+
+
+@admin.register(ArchivedSessionCharacter)
+class ArchivedSessionCharacterAdmin(ScalableAdmin):
+    list_display = ['session_id', 'character_id']
+    list_select_related = ['session_id', 'character_id']
+    raw_id_fields = ['session_id', 'character_id']
+
+
+@admin.register(ArchivedSessionMessage)
+class ArchivedSessionMessageAdmin(ScalableAdmin):
+    list_display = ['session_id', 'user_id', 'creation_date']
+    list_select_related = ['session_id', 'user_id']
+    raw_id_fields = ['session_id', 'user_id']
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(ScalableAdmin):
+    list_display = ['token_id', 'expiry_date', 'creation_date']
+
+
+@admin.register(SentReminder)
+class SentReminderAdmin(ScalableAdmin):
+    list_display = ['session_id', 'offset_minutes', 'creation_date']
+    list_select_related = ['session_id']
+    autocomplete_fields = ['session_id']
+
+
+@admin.register(Job)
+class JobAdmin(ScalableAdmin):
+    list_display = ['name', 'status', 'attempts', 'run_after', 'locked_by', 'finished_date']
+    list_filter = ['status']
+
+
+@admin.register(SlotReservation)
+class SlotReservationAdmin(ScalableAdmin):
+    list_display = ['session_id', 'character_id', 'expiry_date']
+    list_select_related = ['session_id', 'character_id']
+    autocomplete_fields = ['session_id']
+    raw_id_fields = ['character_id']
+
+
+@admin.register(RenderedText)
+class RenderedTextAdmin(ScalableAdmin):
+    list_display = ['content_hash', 'renderer_version', 'creation_date']
+
+
+@admin.register(SessionMessage)
+class SessionMessageAdmin(AppendOnlyAdmin):
+    list_display = ['session_id', 'user_id', 'body', 'creation_date']
+    list_select_related = ['session_id', 'user_id']
+    autocomplete_fields = ['session_id']
+    raw_id_fields = ['user_id']
+
+
+@admin.register(DailyActivity)
+class DailyActivityAdmin(ScalableAdmin):
+    list_display = ['day', 'owner_id', 'sessions_created', 'slots_offered', 'slots_filled', 'active_players']
+    list_select_related = ['owner_id']
+    autocomplete_fields = ['owner_id']
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(ScalableAdmin):
+    list_display = ['name', 'day']
+
+
+@admin.register(SessionRecommendation)
+class SessionRecommendationAdmin(ScalableAdmin):
+    list_display = ['player_id', 'rank', 'session_id', 'score', 'creation_date']
+    list_select_related = ['player_id', 'session_id']
+    autocomplete_fields = ['player_id', 'session_id']
+
 
-# Register your models here.
+@admin.register(AccountDeletion)
+class AccountDeletionAdmin(ScalableAdmin):
+    list_display = ['username', 'status', 'step', 'deleted_rows', 'total_rows', 'creation_date', 'finished_date']
+    list_filter = ['status']
+    readonly_fields = ['user_id', 'username', 'status', 'step', 'total_rows', 'deleted_rows', 'creation_date',
+                      'finished_date']
+    search_fields = ['username']
@@ -0,0 +1,121 @@
+"""
+Daily activity rollups.
+
+update_rollups() computes DailyActivity rows for the whole days after the 'daily' RollupWatermark, with a
+handful of grouped queries restricted to those days by the indexed date columns, and moves the watermark. A
+day is computed once ANALYTICS_ROLLUP_LAG seconds have passed since its end, so late writes of that day are
+included; whole days are computed at once so distinct counts such as active players are exact. Charts read
+the small rollup table only, never the raw GameSession and PlayerCharacter tables.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyActivity, GameSession, PlayerCharacter, RollupWatermark
+
+WATERMARK = 'daily'
+COUNTERS = ['sessions_created', 'slots_offered', 'slots_filled', 'active_players', 'characters_created',
+            'characters_died']
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def last_complete_day(now=None):
+    now = timezone.now() if now is None else now
+    return timezone.localdate(now - timedelta(seconds=settings.ANALYTICS_ROLLUP_LAG)) - timedelta(days=1)
+
+
+def first_day():
+    """
+    Returns the day of the oldest session or character, found through the creation_date indexes.
+    """
+    dates = [model.objects.order_by('creation_date').values_list('creation_date', flat=True).first()
+             for model in (GameSession, PlayerCharacter)]
+    dates = [date for date in dates if date is not None]
+    return timezone.localdate(min(dates)) if dates else None
+
+
+def compute_days(first, last):
+    """
+    Returns {(day, game master id or None): {counter: value}} for the days from first to last.
+    """
+    start, end = day_start(first), day_start(last + timedelta(days=1))
+    rows = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+    created = (GameSession.objects.filter(creation_date__gte=start, creation_date__lt=end)
+               .annotate(day=TruncDate('creation_date')).values('day', 'owner_id')
+               .annotate(count=Count('pk')).order_by())
+    for row in created:
+        rows[row['day'], row['owner_id']]['sessions_created'] = row['count']
+        rows[row['day'], None]['sessions_created'] += row['count']
+
+    offered = (GameSession.objects.filter(session_date__gte=start, session_date__lt=end)
+               .annotate(day=TruncDate('session_date')).values('day', 'owner_id')
+               .annotate(slots=Sum('slots')).order_by())
+    for row in offered:
+        rows[row['day'], row['owner_id']]['slots_offered'] = row['slots']
+        rows[row['day'], None]['slots_offered'] += row['slots']
+
+    links = (PlayerCharacter.game_session_id.through.objects
+             .filter(gamesession_id__session_date__gte=start, gamesession_id__session_date__lt=end)
+             .annotate(day=TruncDate('gamesession_id__session_date')))
+    filled = (links.values('day', 'gamesession_id__owner_id')
+              .annotate(count=Count('pk'), players=Count('playercharacter_id__owner_id', distinct=True)).order_by())
+    for row in filled:
+        counters = rows[row['day'], row['gamesession_id__owner_id']]
+        counters['slots_filled'] = row['count']
+        counters['active_players'] = row['players']
+        rows[row['day'], None]['slots_filled'] += row['count']
+    for row in links.values('day').annotate(players=Count('playercharacter_id__owner_id', distinct=True)).order_by():
+        rows[row['day'], None]['active_players'] = row['players']
+
+    for counter, column in (('characters_created', 'creation_date'), ('characters_died', 'death_date')):
+        characters = (PlayerCharacter.objects.filter(**{f'{column}__gte': start, f'{column}__lt': end})
+                      .annotate(day=TruncDate(column)).values('day').annotate(count=Count('pk')).order_by())
+        for row in characters:
+            rows[row['day'], None][counter] = row['count']
+    return rows
+
+
+def update_rollups(now=None):
+    """
+    Computes the rollups of the complete days after the watermark and returns the number of rows stored.
+    """
+    last = last_complete_day(now)
+    with transaction.atomic():
+        watermark = RollupWatermark.objects.select_for_update().filter(name=WATERMARK).first()
+        first = watermark.day + timedelta(days=1) if watermark else first_day()
+        if first is None or first > last:
+            return 0
+        rows = compute_days(first, last)
+        DailyActivity.objects.filter(day__gte=first, day__lte=last).delete()
+        DailyActivity.objects.bulk_create([
+            DailyActivity(day=day, owner_id_id=owner, **counters) for (day, owner), counters in rows.items()
+        ])
+        RollupWatermark.objects.update_or_create(name=WATERMARK, defaults={'day': last})
+    return len(rows)
+
+
+def activity_series(owner=None, since=None, until=None):
+    """
+    Returns the rollup rows of a game master, or of the platform when owner is None, as a list of dicts
+    with one entry per day, days without activity included.
+    """
+    until = until or last_complete_day()
+    since = since or until - timedelta(days=89)
+    rows = DailyActivity.objects.filter(day__gte=since, day__lte=until)
+    rows = rows.filter(owner_id=owner) if owner is not None else rows.filter(owner_id__isnull=True)
+    stored = {row['day']: row for row in rows.values('day', *COUNTERS)}
+    series = []
+    day = since
+    while day <= until:
+        series.append({'day': day.isoformat(), **{name: stored.get(day, {}).get(name, 0) for name in COUNTERS}})
+        day += timedelta(days=1)
+    return series
@@ -0,0 +1,428 @@
+"""
+Versioned JSON API over game sessions, game systems, player characters and character sheets.
+
+Every resource supports:
+- ?fields=a,b sparse fieldsets, which narrow the SQL SELECT to the requested columns,
+- cursor pagination ordered by primary key (?cursor=<next> from the previous page, ?limit=N),
+- strong ETags on every response, answered with 304 Not Modified on a matching If-None-Match.
+
+Clients authenticate with the cookie session or with a signed bearer token from /api/v1/token/.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers, set_response_etag
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from .models import ArchivedGameSession, CharacterSheet, GameMaster, GameSession, GameSystem, PlayerCharacter
+from .params import MAX_ID, parse_int
+from .ratelimit import rate_limit
+from .richtext import rendered_html_many
+from .tokens import TokenError, issue_token, revoke_token
+
+API_VERSION = 'v1'
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BATCH_SIZE = 50
+
+
+def api_response(request, payload, status=200):
+    """
+    Returns a JsonResponse with a strong ETag computed from its body, or 304 Not Modified when the
+    client already has this representation.
+    """
+    response = JsonResponse(payload, status=status)
+    response['API-Version'] = API_VERSION
+    patch_vary_headers(response, ['Cookie', 'Authorization'])
+    if status != 200:
+        return response
+    set_response_etag(response)
+    return get_conditional_response(request, etag=response['ETag'], response=response)
+
+
+def api_error(request, message, status):
+    return api_response(request, {'error': message}, status=status)
+
+
+def encode_cursor(pk):
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        return parse_int(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+def visible_sessions(user):
+    return GameSession.objects.filter(Q(is_public=True) | Q(owner_id__user_id=user))
+
+
+def visible_characters(user):
+    links = PlayerCharacter.game_session_id.through.objects.filter(gamesession_id__in=visible_sessions(user))
+    return PlayerCharacter.objects.filter(Q(owner_id__user_id=user) | Q(pk__in=links.values('playercharacter_id')))
+
+
+class Resource:
+    """
+    Describes how a model is exposed by the API.
+
+    Attributes:
+    - model: The Django model.
+    - fields (dict): Public field names mapped to the columns selected for them.
+    - related (dict): Public names of many-to-many or computed fields mapped to methods loading them for a page.
+    - parents (dict): Names of parent lookups accepted by the batch endpoint, e.g. 'session', mapped to
+      methods returning {parent id: [primary keys]} for many parents with one query.
+    - archive_model: Optional model with the same columns, used for detail lookups of archived rows.
+
+    Methods:
+    - visible(user): Returns the queryset of rows the user may read.
+    - parse_fields(raw): Validates a ?fields= value and returns the requested public field names.
+    - serialize(queryset, fields): Loads the requested columns only and returns a list of dicts.
+    """
+    model = None
+    fields = {}
+    related = {}
+    parents = {}
+    archive_model = None
+
+    def visible(self, user):
+        raise NotImplementedError
+
+    def visible_archived(self, user):
+        return self.archive_model.objects.none()
+
+    def parse_fields(self, raw):
+        available = list(self.fields) + list(self.related)
+        if not raw:
+            return available
+        requested = [name.strip() for name in raw.split(',') if name.strip()]
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return requested
+
+    def serialize(self, queryset, fields):
+        columns = {name: self.fields[name] for name in fields if name in self.fields}
+        rows = list(queryset.values('pk', *columns.values()))
+        data = [{'id': row['pk'], **{name: row[column] for name, column in columns.items()}} for row in rows]
+        for name in fields:
+            if name in self.related:
+                loaded = self.related[name](self, [row['id'] for row in data])
+                for row in data:
+                    row[name] = loaded.get(row['id'], [])
+        return data
+
+
+class SessionResource(Resource):
+    model = GameSession
+    archive_model = ArchivedGameSession
+    fields = {
+        'owner': 'owner_id_id',
+        'title': 'title',
+        'slots': 'slots',
+        'session_date': 'session_date',
+        'is_public': 'is_public',
+        'is_open': 'is_open',
+        'creation_date': 'creation_date',
+    }
+
+    def visible(self, user):
+        return visible_sessions(user)
+
+    def visible_archived(self, user):
+        return ArchivedGameSession.objects.filter(Q(is_public=True) | Q(owner_id__user_id=user))
+
+
+class GameMasterResource(Resource):
+    model = GameMaster
+    fields = {
+        'nickname': 'user_nickname',
+        'is_game_master': 'is_game_master',
+        'creation_date': 'creation_date',
+    }
+
+    def visible(self, user):
+        return GameMaster.objects.all()
+
+
+class SystemResource(Resource):
+    model = GameSystem
+    fields = {
+        'session': 'session_id_id',
+        'system': 'system',
+        'creation_date': 'creation_date',
+    }
+
+    def load_by_session(self, session_ids):
+        systems = {}
+        rows = GameSystem.objects.filter(session_id__in=session_ids).order_by('pk')
+        for session_id, pk in rows.values_list('session_id_id', 'pk'):
+            systems.setdefault(session_id, []).append(pk)
+        return systems
+
+    parents = {'session': load_by_session}
+
+    def visible(self, user):
+        return GameSystem.objects.filter(session_id__in=visible_sessions(user))
+
+
+class CharacterResource(Resource):
+    model = PlayerCharacter
+    fields = {
+        'owner': 'owner_id_id',
+        'name': 'name',
+        'description': 'description',
+        'character_status': 'character_status',
+        'creation_date': 'creation_date',
+    }
+
+    def load_sessions(self, ids):
+        sessions = {}
+        links = PlayerCharacter.game_session_id.through.objects.filter(playercharacter_id__in=ids)
+        for character_id, session_id in links.values_list('playercharacter_id', 'gamesession_id'):
+            sessions.setdefault(character_id, []).append(session_id)
+        return sessions
+
+    def load_description_html(self, ids):
+        descriptions = dict(PlayerCharacter.objects.filter(pk__in=ids).values_list('pk', 'description'))
+        html = rendered_html_many(set(descriptions.values()))
+        return {pk: html[description] for pk, description in descriptions.items()}
+
+    related = {'sessions': load_sessions, 'description_html': load_description_html}
+
+    def load_by_session(self, session_ids):
+        characters = {}
+        links = PlayerCharacter.game_session_id.through.objects.filter(gamesession_id__in=session_ids)
+        for session_id, character_id in links.order_by('playercharacter_id').values_list(
+                'gamesession_id', 'playercharacter_id'):
+            characters.setdefault(session_id, []).append(character_id)
+        return characters
+
+    parents = {'session': load_by_session}
+
+    def visible(self, user):
+        return visible_characters(user)
+
+
+class SheetResource(Resource):
+    model = CharacterSheet
+    fields = {name: name for name in CharacterSheet.HISTORY_FIELDS}
+
+    def visible(self, user):
+        return CharacterSheet.objects.filter(character_id__in=visible_characters(user))
+
+
+class ApiView(View):
+    """
+    ApiView is a Django View class serving one API resource as a paginated list or a single object.
+
+    Methods:
+    - get(request, pk=None): Handles HTTP GET requests. Without pk it returns {"data": [...], "next": cursor},
+      with pk it returns {"data": {...}}.
+    """
+    resource = None
+
+    def get(self, request, pk=None):
+        if not request.user.is_authenticated:
+            return api_error(request, 'Authentication required', 401)
+        try:
+            fields = self.resource.parse_fields(request.GET.get('fields'))
+        except ValueError as error:
+            return api_error(request, str(error), 400)
+        if pk is not None:
+            return self.detail(request, pk, fields)
+        try:
+            limit = min(max(int(request.GET.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+            cursor = request.GET.get('cursor')
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as error:
+            return api_error(request, str(error), 400)
+        queryset = self.resource.visible(request.user).order_by('pk')
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+        data = self.resource.serialize(queryset[:limit], fields)
+        next_cursor = encode_cursor(data[-1]['id']) if len(data) == limit else None
+        return api_response(request, {'data': data, 'next': next_cursor})
+
+    def detail(self, request, pk, fields):
+        if pk > MAX_ID:
+            return api_error(request, 'Not found', 404)
+        data = self.resource.serialize(self.resource.visible(request.user).filter(pk=pk), fields)
+        if not data and self.resource.archive_model is not None:
+            data = self.resource.serialize(self.resource.visible_archived(request.user).filter(pk=pk), fields)
+        if not data:
+            return api_error(request, 'Not found', 404)
+        return api_response(request, {'data': data[0]})
+
+
+API_RESOURCES = {
+    'sessions': SessionResource(),
+    'game_masters': GameMasterResource(),
+    'systems': SystemResource(),
+    'characters': CharacterResource(),
+    'sheets': SheetResource(),
+}
+
+
+class BatchLoader:
+    """
+    DataLoader-style loader coalescing the lookups of one resource within a batch request.
+
+    Keys and parent lookups are queued first; dispatch() then resolves every parent lookup with one query
+    per parent name and loads all queued primary keys with a single IN query, selecting the union of the
+    requested fields.
+
+    Methods:
+    - want(pk, fields): Queues a primary key.
+    - want_children(parent, parent_id, fields): Queues the rows of a parent, e.g. the roster of a session.
+    - dispatch(): Runs the queries.
+    - get(pk, fields) / children(parent, parent_id, fields): Return loaded rows projected to the fields.
+    """
+
+    def __init__(self, resource, user):
+        self.resource = resource
+        self.user = user
+        self.keys = set()
+        self.fields = set()
+        self.parent_keys = {}
+        self.parent_rows = {}
+        self.rows = {}
+
+    def want(self, pk, fields):
+        self.keys.add(pk)
+        self.fields.update(fields)
+
+    def want_children(self, parent, parent_id, fields):
+        self.parent_keys.setdefault(parent, set()).add(parent_id)
+        self.fields.update(fields)
+
+    def dispatch(self):
+        for parent, parent_ids in self.parent_keys.items():
+            self.parent_rows[parent] = self.resource.parents[parent](self.resource, parent_ids)
+            for pks in self.parent_rows[parent].values():
+                self.keys.update(pks)
+        if self.keys:
+            queryset = self.resource.visible(self.user).filter(pk__in=self.keys)
+            fields = [name for name in self.resource.parse_fields(None) if name in self.fields]
+            self.rows = {row['id']: row for row in self.resource.serialize(queryset, fields)}
+
+    def project(self, row, fields):
+        return {'id': row['id'], **{name: row[name] for name in fields}}
+
+    def get(self, pk, fields):
+        row = self.rows.get(pk)
+        return self.project(row, fields) if row is not None else None
+
+    def children(self, parent, parent_id, fields):
+        pks = self.parent_rows.get(parent, {}).get(parent_id, [])
+        return [self.project(self.rows[pk], fields) for pk in pks if pk in self.rows]
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class BatchApiView(View):
+    """
+    BatchApiView is a Django View class resolving many API lookups in one round trip.
+
+    The JSON body is {"requests": [...]} where every request is either {"resource": "sessions", "id": 1}
+    or a parent lookup such as {"resource": "characters", "session": 1}, optionally with "fields". Ids must be
+    JSON integers within the primary key range; anything else fails that request with 400.
+    Lookups are coalesced per resource by BatchLoader, so e.g. all requested characters are fetched with
+    a single IN query. The endpoint only reads data, so it is exempt from CSRF checks.
+
+    Methods:
+    - post(request): Handles HTTP POST requests and returns {"responses": [...]} in request order, each
+      with its own status.
+    """
+
+    def post(self, request):
+        if not request.user.is_authenticated:
+            return api_error(request, 'Authentication required', 401)
+        try:
+            requests = json.loads(request.body)['requests']
+            if not isinstance(requests, list) or len(requests) > MAX_BATCH_SIZE:
+                raise ValueError(f'Expected a list of at most {MAX_BATCH_SIZE} requests')
+        except (ValueError, KeyError, TypeError) as error:
+            return api_error(request, str(error), 400)
+        loaders = {}
+        planned = []
+        for item in requests:
+            planned.append(self.plan(item, loaders, request.user))
+        for loader in loaders.values():
+            loader.dispatch()
+        return api_response(request, {'responses': [resolve() for resolve in planned]})
+
+    def plan(self, item, loaders, user):
+        try:
+            name = item['resource']
+            resource = API_RESOURCES[name]
+            fields = resource.parse_fields(item.get('fields'))
+            loader = loaders.setdefault(name, BatchLoader(resource, user))
+            parent = next((key for key in resource.parents if key in item), None)
+            if parent is not None:
+                parent_id = parse_int(item[parent])
+                loader.want_children(parent, parent_id, fields)
+                return lambda: {'status': 200, 'data': loader.children(parent, parent_id, fields)}
+            pk = parse_int(item['id'])
+        except (KeyError, TypeError, ValueError) as error:
+            message = str(error)
+            return lambda: {'status': 400, 'error': message}
+        loader.want(pk, fields)
+
+        def resolve():
+            data = loader.get(pk, fields)
+            if data is None:
+                return {'status': 404, 'error': 'Not found'}
+            return {'status': 200, 'data': data}
+        return resolve
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ApiTokenView(View):
+    """
+    ApiTokenView is a Django View class issuing signed API bearer tokens.
+
+    Clients post "username" and "password" once and then send "Authorization: Bearer <token>" with every
+    API request. A user already logged in through the cookie session can post without credentials.
+    The view shares the rate limits of the login form.
+
+    Methods:
+    - post(request): Handles HTTP POST requests and returns {"token": ..., "expires_in": seconds}.
+    """
+
+    @method_decorator(rate_limit('login'))
+    def post(self, request):
+        user = request.user if request.user.is_authenticated else None
+        if request.POST.get('username'):
+            user = authenticate(request, username=request.POST['username'], password=request.POST.get('password'))
+        if user is None or not user.is_active:
+            return api_error(request, 'Nieprawidlowy login lub hasło', 401)
+        return api_response(request, {'token': issue_token(user), 'expires_in': settings.API_TOKEN_MAX_AGE})
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ApiTokenRevokeView(View):
+    """
+    ApiTokenRevokeView is a Django View class revoking the bearer token the request was made with.
+
+    Methods:
+    - post(request): Handles HTTP POST requests and adds the token to the revocation list.
+    """
+
+    def post(self, request):
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        if not header.startswith('Bearer '):
+            return api_error(request, 'Bearer token required', 401)
+        try:
+            revoke_token(header[len('Bearer '):].strip())
+        except TokenError as error:
+            return api_error(request, str(error), 401)
+        return api_response(request, {'revoked': True})
@@ -0,0 +1,20 @@
+from django.urls import path
+
+from .api import (ApiTokenRevokeView, ApiTokenView, ApiView, BatchApiView, CharacterResource, GameMasterResource,
+                  SessionResource, SheetResource, SystemResource)
+
+urlpatterns = [
+    path('sessions/', ApiView.as_view(resource=SessionResource()), name="api_sessions"),
+    path('sessions/<int:pk>/', ApiView.as_view(resource=SessionResource()), name="api_session"),
+    path('game_masters/', ApiView.as_view(resource=GameMasterResource()), name="api_game_masters"),
+    path('game_masters/<int:pk>/', ApiView.as_view(resource=GameMasterResource()), name="api_game_master"),
+    path('systems/', ApiView.as_view(resource=SystemResource()), name="api_systems"),
+    path('systems/<int:pk>/', ApiView.as_view(resource=SystemResource()), name="api_system"),
+    path('characters/', ApiView.as_view(resource=CharacterResource()), name="api_characters"),
+    path('characters/<int:pk>/', ApiView.as_view(resource=CharacterResource()), name="api_character"),
+    path('sheets/', ApiView.as_view(resource=SheetResource()), name="api_sheets"),
+    path('sheets/<int:pk>/', ApiView.as_view(resource=SheetResource()), name="api_sheet"),
+    path('batch/', BatchApiView.as_view(), name="api_batch"),
+    path('token/', ApiTokenView.as_view(), name="api_token"),
+    path('token/revoke/', ApiTokenRevokeView.as_view(), name="api_token_revoke"),
+]
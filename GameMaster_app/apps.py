@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GamemasterAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'GameMaster_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
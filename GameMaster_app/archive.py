@@ -0,0 +1,116 @@
+"""
+Archival of past game sessions.
+
+Sessions whose session_date is older than SESSION_ARCHIVE_AFTER_DAYS are moved, together with their
+GameSystem rows, PlayerCharacter.game_session_id links and SessionMessage log, into the Archived* tables. Every batch is
+copied and deleted in its own transaction, so an interrupted run leaves no half-moved session and
+simply continues with the remaining ones when started again.
+
+Read paths use get_session(), session_systems() and session_characters(), which fall back to the archive
+when a session is no longer in the hot tables.
+"""
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (ArchivedGameSession, ArchivedGameSystem, ArchivedSessionCharacter, ArchivedSessionMessage,
+                     GameSession, GameSystem, PlayerCharacter, SessionMessage)
+
+DEFAULT_BATCH_SIZE = 500
+SESSION_FIELDS = ['id', 'owner_id_id', 'creation_date', 'title', 'slots', 'session_date', 'is_public', 'is_open']
+MESSAGE_FIELDS = ['id', 'session_id_id', 'user_id_id', 'body', 'creation_date']
+
+
+def archive_cutoff(days=None):
+    days = settings.SESSION_ARCHIVE_AFTER_DAYS if days is None else days
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_batch(cutoff, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Moves up to `batch_size` sessions dated before `cutoff` into the archive tables.
+
+    The batch is locked with SKIP LOCKED where the database supports it, so several archivers, or an
+    archiver and a game master editing a session, do not block each other. Returns the number of
+    archived sessions, 0 once nothing is left.
+    """
+    with transaction.atomic():
+        sessions = list(
+            GameSession.objects
+            .filter(session_date__lt=cutoff)
+            .order_by('session_date', 'pk')
+            .select_for_update(skip_locked=True)
+            .values(*SESSION_FIELDS)[:batch_size]
+        )
+        if not sessions:
+            return 0
+        ids = [session['id'] for session in sessions]
+        now = timezone.now()
+        ArchivedGameSession.objects.bulk_create(
+            [ArchivedGameSession(archived_date=now, **session) for session in sessions],
+            ignore_conflicts=True,
+        )
+        ArchivedGameSystem.objects.bulk_create(
+            [ArchivedGameSystem(**system) for system in GameSystem.objects.filter(session_id__in=ids)
+             .order_by().values('id', 'session_id_id', 'system', 'creation_date')],
+            ignore_conflicts=True,
+        )
+        links = PlayerCharacter.game_session_id.through.objects.filter(gamesession_id__in=ids)
+        ArchivedSessionCharacter.objects.bulk_create(
+            [ArchivedSessionCharacter(session_id_id=session_id, character_id_id=character_id)
+             for session_id, character_id in links.values_list('gamesession_id', 'playercharacter_id')],
+            ignore_conflicts=True,
+        )
+        # The chat log of a session can be long, so it is copied in chunks rather than loaded at once.
+        messages = SessionMessage.objects.filter(session_id__in=ids).order_by('pk').values(*MESSAGE_FIELDS)
+        messages = messages.iterator(chunk_size=batch_size)
+        while True:
+            chunk = list(islice(messages, batch_size))
+            if not chunk:
+                break
+            ArchivedSessionMessage.objects.bulk_create([ArchivedSessionMessage(**message) for message in chunk],
+                                                       ignore_conflicts=True)
+        SessionMessage.objects.filter(session_id__in=ids).delete()
+        links.delete()
+        GameSystem.objects.filter(session_id__in=ids).delete()
+        GameSession.objects.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+def archive_sessions(cutoff, batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """
+    Archives sessions batch by batch until none older than `cutoff` remain or `max_batches` is reached.
+    Yields the size of every committed batch, so callers can report progress.
+    """
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        archived = archive_batch(cutoff, batch_size)
+        if not archived:
+            return
+        batches += 1
+        yield archived
+
+
+def get_session(pk):
+    """
+    Returns the GameSession with the given primary key, or its ArchivedGameSession, or None.
+    """
+    session = GameSession.objects.filter(pk=pk).first()
+    if session is None:
+        session = ArchivedGameSession.objects.filter(pk=pk).first()
+    return session
+
+
+def session_systems(session):
+    if isinstance(session, ArchivedGameSession):
+        return ArchivedGameSystem.objects.filter(session_id=session)
+    return GameSystem.objects.filter(session_id=session)
+
+
+def session_characters(session):
+    if isinstance(session, ArchivedGameSession):
+        return PlayerCharacter.objects.filter(archivedsessioncharacter__session_id=session)
+    return PlayerCharacter.objects.filter(game_session_id=session)
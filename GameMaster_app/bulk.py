@@ -0,0 +1,76 @@
+"""
+Validation-free bulk writes.
+
+The bounds of GameSession.slots and of the CharacterSheet attributes are enforced by check constraints,
+so bulk imports and game master batch updates skip the per-row full_clean() and let the database reject
+out of range values. A violated constraint is reported as a ValidationError naming the constraint, and the
+whole batch is rolled back.
+"""
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .models import CharacterSheet, CharacterSheetEvent
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def check_constraint_names(model):
+    return [constraint.name for constraint in model._meta.constraints if hasattr(constraint, 'check')]
+
+
+def _violated_constraint(model, error):
+    message = str(error)
+    for name in check_constraint_names(model):
+        if name in message:
+            return name
+    return None
+
+
+def _write(model, operation):
+    try:
+        with transaction.atomic():
+            return operation()
+    except IntegrityError as error:
+        name = _violated_constraint(model, error)
+        if name is None:
+            raise
+        raise ValidationError(f'{model.__name__} values violate {name}', code=name) from error
+
+
+def bulk_create(model, objects, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Inserts `objects` with bulk_create() without calling full_clean(). Returns the created objects.
+    Character sheets created this way get their first change log event and snapshot.
+    """
+    objects = list(objects)
+
+    def operation():
+        created = model.objects.bulk_create(objects, batch_size=batch_size)
+        if model is CharacterSheet:
+            CharacterSheetEvent.record_bulk({}, {sheet.pk: sheet.history_state() for sheet in created})
+        return created
+
+    return _write(model, operation)
+
+
+def bulk_update(model, objects, fields, batch_size=DEFAULT_BATCH_SIZE, changed_by=None):
+    """
+    Updates `fields` of `objects` with bulk_update() without calling full_clean(). Returns the number of
+    updated rows. Changes of character sheets are recorded in the change log against the values the
+    sheets had when they were loaded.
+    """
+    objects = list(objects)
+
+    def operation():
+        updated = model.objects.bulk_update(objects, fields, batch_size=batch_size)
+        if model is CharacterSheet:
+            CharacterSheetEvent.record_bulk(
+                {sheet.pk: getattr(sheet, '_history_state', None) for sheet in objects},
+                {sheet.pk: sheet.history_state() for sheet in objects},
+                changed_by,
+            )
+            for sheet in objects:
+                sheet._history_state = sheet.history_state()
+        return updated
+
+    return _write(model, operation)
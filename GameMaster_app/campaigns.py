@@ -0,0 +1,273 @@
+"""
+Campaign snapshots: export a game master's campaign as a tar.gz archive and restore it elsewhere.
+
+The archive holds a manifest.json followed by JSON Lines members of at most CAMPAIGN_EXPORT_CHUNK_SIZE rows
+each, in dependency order: sessions, systems, characters, session-character links and sheets. Archived
+sessions, their systems and links are exported along with the live ones. Rows are read with
+iterator(chunk_size=...) and the gzip stream is yielded as it is produced, so exporting takes the same memory
+whatever the size of the campaign. All members are read in one transaction, REPEATABLE READ on PostgreSQL, so
+the archive is a consistent snapshot even while the campaign is being played or archived.
+
+Restoring reads the archive as a stream too, member by member, and inserts every member with bulk_create,
+remapping the ids of the archive to the ids of the new rows. Members of more than CAMPAIGN_EXPORT_CHUNK_SIZE
+rows are refused. Systems, links and sheets referring to a session or character missing from the archive are
+skipped and counted as "skipped". Rows are built from the exported fields only, other keys are ignored.
+Sessions are restored for the game master of the restoring user, and characters for the player profile of the
+same user (created when missing): an archive cannot hand sessions or characters to other accounts. The
+usernames of the original owners stay in the archive for reference only. Restored past sessions are archived
+again by the next archive_sessions run.
+"""
+import io
+import json
+import tarfile
+from contextlib import contextmanager
+from itertools import chain, islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DataError, IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .bulk import bulk_create
+from .models import (ArchivedGameSession, ArchivedGameSystem, ArchivedSessionCharacter, CharacterSheet,
+                     GameSession, GameSystem, Player, PlayerCharacter)
+from .session_calendar import invalidate
+
+FORMAT_VERSION = 1
+MEMBERS = ['sessions', 'systems', 'characters', 'links', 'sheets']
+
+SESSION_FIELDS = ['id', 'title', 'slots', 'session_date', 'is_public', 'is_open', 'creation_date']
+SYSTEM_FIELDS = ['id', 'session_id', 'system', 'creation_date']
+CHARACTER_FIELDS = ['id', 'owner_id__user_id__username', 'name', 'description', 'character_status', 'death_date',
+                    'creation_date']
+SHEET_FIELDS = ['character_id'] + CharacterSheet.HISTORY_FIELDS
+
+
+class CampaignError(Exception):
+    """Raised when a campaign archive cannot be restored."""
+
+
+def campaign_rows(game_master):
+    """
+    Returns (member name, iterator of row dicts) pairs for the campaign of the game master, archived sessions
+    included.
+    """
+    chunk_size = settings.CAMPAIGN_EXPORT_CHUNK_SIZE
+    sessions = GameSession.objects.filter(owner_id=game_master)
+    archived = ArchivedGameSession.objects.filter(owner_id=game_master)
+    links = PlayerCharacter.game_session_id.through.objects.filter(gamesession_id__owner_id=game_master)
+    archived_links = ArchivedSessionCharacter.objects.filter(session_id__owner_id=game_master)
+    characters = PlayerCharacter.objects.filter(Q(pk__in=links.values('playercharacter_id'))
+                                                | Q(pk__in=archived_links.values('character_id')))
+    return [
+        ('sessions', chain(
+            sessions.order_by('pk').values(*SESSION_FIELDS).iterator(chunk_size=chunk_size),
+            archived.order_by('pk').values(*SESSION_FIELDS).iterator(chunk_size=chunk_size))),
+        ('systems', chain(
+            GameSystem.objects.filter(session_id__owner_id=game_master).order_by('pk')
+            .values(*SYSTEM_FIELDS).iterator(chunk_size=chunk_size),
+            ArchivedGameSystem.objects.filter(session_id__owner_id=game_master).order_by('pk')
+            .values(*SYSTEM_FIELDS).iterator(chunk_size=chunk_size))),
+        ('characters', characters.order_by('pk').values(*CHARACTER_FIELDS).iterator(chunk_size=chunk_size)),
+        ('links', chain(
+            links.order_by('pk').values('gamesession_id', 'playercharacter_id').iterator(chunk_size=chunk_size),
+            archived_links.order_by('pk').values(gamesession_id=F('session_id'), playercharacter_id=F('character_id'))
+            .iterator(chunk_size=chunk_size))),
+        ('sheets', CharacterSheet.objects.filter(character_id__in=characters).order_by('pk')
+         .values(*SHEET_FIELDS).iterator(chunk_size=chunk_size)),
+    ]
+
+
+class _StreamBuffer:
+    """
+    Write-only file object whose content is taken out after every write of the tar stream.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _add_member(archive, name, content):
+    info = tarfile.TarInfo(name)
+    info.size = len(content)
+    archive.addfile(info, io.BytesIO(content))
+
+
+@contextmanager
+def snapshot():
+    """
+    Runs the block in a transaction in which every query reads the same snapshot of the database. Under its
+    default READ COMMITTED level PostgreSQL takes a snapshot per query, so a new transaction is raised to
+    REPEATABLE READ.
+    """
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        if outermost and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+        yield
+
+
+def export_campaign(game_master):
+    """
+    Yields the bytes of the tar.gz archive of the campaign.
+    """
+    buffer = _StreamBuffer()
+    chunk_size = settings.CAMPAIGN_EXPORT_CHUNK_SIZE
+    with snapshot(), tarfile.open(fileobj=buffer, mode='w|gz') as archive:
+        manifest = {'version': FORMAT_VERSION, 'game_master': game_master.user_nickname}
+        _add_member(archive, 'manifest.json', json.dumps(manifest).encode())
+        for name, rows in campaign_rows(game_master):
+            part = 0
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                part += 1
+                content = ''.join(json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in chunk).encode()
+                _add_member(archive, f'{name}/{part:06}.jsonl', content)
+                yield buffer.take()
+    yield buffer.take()
+
+
+def _parse_dates(row, *names):
+    for name in names:
+        if row.get(name):
+            row[name] = parse_datetime(row[name])
+    return row
+
+
+def _pick(row, fields):
+    """
+    Returns the values of `fields` of an archive row. Other keys, such as foreign keys, are never passed on.
+    """
+    return {name: row[name] for name in fields}
+
+
+class CampaignRestorer:
+    """
+    Inserts the members of a campaign archive for `game_master`, remapping the ids of the archive.
+    """
+
+    def __init__(self, game_master):
+        self.game_master = game_master
+        self.sessions = {}
+        self.characters = {}
+        self.counts = dict.fromkeys(MEMBERS + ['skipped'], 0)
+
+    @cached_property
+    def player(self):
+        player, _ = Player.objects.get_or_create(
+            user_id=self.game_master.user_id, defaults={'player_nickname': self.game_master.user_nickname})
+        return player
+
+    def restore_sessions(self, rows):
+        sessions = [GameSession(owner_id=self.game_master, **_parse_dates(
+            _pick(row, SESSION_FIELDS[1:]), 'session_date', 'creation_date'))
+            for row in rows]
+        created = bulk_create(GameSession, sessions)
+        self.sessions.update((row['id'], session.pk) for row, session in zip(rows, created))
+        invalidate(*(session.session_date for session in created))
+        return len(rows)
+
+    def known(self, rows, **references):
+        """
+        Returns the rows whose references, e.g. session_id=self.sessions, all point to restored rows, and counts
+        the others as skipped.
+        """
+        known = [row for row in rows if all(row[key] in restored for key, restored in references.items())]
+        self.counts['skipped'] += len(rows) - len(known)
+        return known
+
+    def restore_systems(self, rows):
+        rows = self.known(rows, session_id=self.sessions)
+        bulk_create(GameSystem, [
+            GameSystem(session_id_id=self.sessions[row['session_id']], system=row['system'],
+                       creation_date=parse_datetime(row['creation_date']))
+            for row in rows
+        ])
+        return len(rows)
+
+    def restore_characters(self, rows):
+        characters = []
+        for row in rows:
+            row = _parse_dates(_pick(row, CHARACTER_FIELDS[2:]), 'death_date', 'creation_date')
+            characters.append(PlayerCharacter(owner_id=self.player, **row))
+        created = bulk_create(PlayerCharacter, characters)
+        self.characters.update((row['id'], character.pk) for row, character in zip(rows, created))
+        return len(rows)
+
+    def restore_links(self, rows):
+        rows = self.known(rows, gamesession_id=self.sessions, playercharacter_id=self.characters)
+        through = PlayerCharacter.game_session_id.through
+        bulk_create(through, [
+            through(gamesession_id=self.sessions[row['gamesession_id']],
+                    playercharacter_id=self.characters[row['playercharacter_id']])
+            for row in rows
+        ])
+        return len(rows)
+
+    def restore_sheets(self, rows):
+        sheets = []
+        for row in self.known(rows, character_id=self.characters):
+            character = self.characters[row['character_id']]
+            sheets.append(CharacterSheet(character_id_id=character, **_pick(row, CharacterSheet.HISTORY_FIELDS)))
+        bulk_create(CharacterSheet, sheets)
+        return len(sheets)
+
+    def restore(self, member, rows):
+        self.counts[member] += getattr(self, f'restore_{member}')(rows)
+
+
+def read_rows(content):
+    """
+    Returns the rows of a JSON Lines member, refusing members of more than CAMPAIGN_EXPORT_CHUNK_SIZE rows.
+    """
+    rows = []
+    for line in content:
+        if not line.strip():
+            continue
+        if len(rows) == settings.CAMPAIGN_EXPORT_CHUNK_SIZE:
+            raise CampaignError('Za duża część archiwum kampanii')
+        rows.append(json.loads(line))
+    return rows
+
+
+def restore_campaign(fileobj, game_master):
+    """
+    Restores a campaign archive read from `fileobj` for the game master in one transaction. Returns the number
+    of restored rows per member and the number of skipped orphaned rows.
+    """
+    restorer = CampaignRestorer(game_master)
+    try:
+        with transaction.atomic(), tarfile.open(fileobj=fileobj, mode='r|gz') as archive:
+            manifest = None
+            for info in archive:
+                content = archive.extractfile(info)
+                if content is None:
+                    continue
+                if info.name == 'manifest.json':
+                    manifest = json.loads(content.read())
+                    if manifest.get('version') != FORMAT_VERSION:
+                        raise CampaignError('Nieobsługiwana wersja archiwum')
+                    continue
+                member = info.name.split('/', 1)[0]
+                if manifest is None or member not in MEMBERS:
+                    raise CampaignError('Nieprawidłowe archiwum kampanii')
+                restorer.restore(member, read_rows(content))
+    except (tarfile.TarError, EOFError, OSError, ValueError, KeyError, TypeError, ValidationError,
+            DataError, IntegrityError) as error:
+        raise CampaignError('Nieprawidłowe archiwum kampanii') from error
+    return restorer.counts
@@ -0,0 +1,114 @@
+"""
+Per-session message log.
+
+Messages are read by keyset pagination on the (session_id, id) index: clients remember the id of the last
+message they have and ask for the messages after it, never for an OFFSET. Posting a message locks the session
+row, so the ids of one session are committed in increasing order and a reader can never skip a message that
+commits late with a lower id.
+
+Long polling waits on the id of the newest message of the session: waiting clients read MAX(id) of the session
+every CHAT_POLL_INTERVAL seconds, a single lookup at the end of the (session_id, id) index that every process
+answers alike, and load messages only when there is something new.
+
+Once a session is archived, its log is read from ArchivedSessionMessage, which keeps the original ids, so
+clients continue paginating where they were. Archived logs are read-only.
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+
+from .models import (ArchivedGameSession, ArchivedSessionCharacter, ArchivedSessionMessage, GameSession,
+                     PlayerCharacter, SessionMessage)
+
+
+def session_for_user(user, session_id):
+    """
+    Returns the session, live or archived, when the user runs it or plays in it with one of their characters,
+    or None.
+    """
+    joined = PlayerCharacter.game_session_id.through.objects.filter(
+        playercharacter_id__owner_id__user_id=user).values('gamesession_id')
+    session = GameSession.objects.filter(Q(owner_id__user_id=user) | Q(pk__in=joined), pk=session_id).first()
+    if session is None:
+        joined = ArchivedSessionCharacter.objects.filter(character_id__owner_id__user_id=user).values('session_id')
+        session = ArchivedGameSession.objects.filter(
+            Q(owner_id__user_id=user) | Q(pk__in=joined), pk=session_id).first()
+    return session
+
+
+def is_archived(session):
+    return isinstance(session, ArchivedGameSession)
+
+
+def session_messages(session):
+    model = ArchivedSessionMessage if is_archived(session) else SessionMessage
+    return model.objects.filter(session_id=session.pk)
+
+
+def post_message(session, user, body):
+    """
+    Appends a message to the log of the session and returns it.
+    """
+    if is_archived(session):
+        raise ValueError('Sesja jest zarchiwizowana')
+    body = body.strip()
+    if not body:
+        raise ValueError('Wiadomość jest pusta')
+    if len(body) > settings.CHAT_MESSAGE_MAX_LENGTH:
+        raise ValueError('Wiadomość jest za długa')
+    with transaction.atomic():
+        GameSession.objects.select_for_update().filter(pk=session.pk).values_list('pk').get()
+        message = SessionMessage.objects.create(session_id=session, user_id=user, body=body)
+    return message
+
+
+def last_message_id(session):
+    return session_messages(session).aggregate(last=Max('id'))['last'] or 0
+
+
+def messages_after(session, after=0, limit=None):
+    """
+    Returns up to `limit` messages with an id greater than `after`, oldest first.
+    """
+    return list(session_messages(session).filter(id__gt=after)
+                .select_related('user_id').order_by('id')[:limit or settings.CHAT_PAGE_SIZE])
+
+
+def messages_before(session, before=None, limit=None):
+    """
+    Returns up to `limit` messages with an id lower than `before`, or the newest ones, oldest first.
+    """
+    messages = session_messages(session)
+    if before is not None:
+        messages = messages.filter(id__lt=before)
+    messages = messages.select_related('user_id').order_by('-id')[:limit or settings.CHAT_PAGE_SIZE]
+    return list(reversed(messages))
+
+
+def wait_for_messages(session, after, timeout=None):
+    """
+    Returns the messages after `after` as soon as there are any, or an empty list after `timeout` seconds.
+    Archived sessions get no new messages, so they are answered at once.
+    """
+    if is_archived(session):
+        return messages_after(session, after)
+    deadline = time.monotonic() + (settings.CHAT_LONG_POLL_TIMEOUT if timeout is None else timeout)
+    while True:
+        if last_message_id(session) > after:
+            messages = messages_after(session, after)
+            if messages:
+                return messages
+        if time.monotonic() >= deadline:
+            return []
+        time.sleep(settings.CHAT_POLL_INTERVAL)
+
+
+def message_as_dict(message):
+    return {
+        'id': message.pk,
+        'user': message.user_id.username if message.user_id else None,
+        'body': message.body,
+        'creation_date': message.creation_date.isoformat(),
+    }
@@ -0,0 +1,51 @@
+"""
+Reading the CharacterSheet change log.
+
+The state of a sheet at a given moment is rebuilt from the nearest CharacterSheetSnapshot taken at or before
+that moment plus the events recorded after it, which are never more than CHARACTER_SHEET_SNAPSHOT_INTERVAL.
+"""
+from .models import CharacterSheetEvent, CharacterSheetSnapshot
+
+DEFAULT_HISTORY_LIMIT = 100
+
+
+def sheet_history(sheet, before=None, limit=DEFAULT_HISTORY_LIMIT):
+    """
+    Returns up to `limit` events of the sheet, newest first, optionally only those with a sequence
+    lower than `before` (keyset pagination).
+    """
+    events = CharacterSheetEvent.objects.filter(sheet_id=sheet)
+    if before is not None:
+        events = events.filter(sequence__lt=before)
+    return list(events.select_related('user_id').order_by('-sequence')[:limit])
+
+
+def sheet_state_as_of(sheet, moment):
+    """
+    Returns a dict with the tracked fields of the sheet as they were at `moment`, or None when the
+    log has no event recorded at or before that moment.
+    """
+    snapshot = (CharacterSheetSnapshot.objects
+                .filter(sheet_id=sheet, creation_date__lte=moment)
+                .order_by('-sequence')
+                .first())
+    if snapshot is None:
+        return None
+    state = dict(snapshot.state)
+    events = (CharacterSheetEvent.objects
+              .filter(sheet_id=sheet, sequence__gt=snapshot.sequence, creation_date__lte=moment)
+              .order_by('sequence')
+              .values_list('changes', flat=True))
+    for changes in events:
+        for name, (old, new) in changes.items():
+            state[name] = new
+    return state
+
+
+def event_as_dict(event):
+    return {
+        'sequence': event.sequence,
+        'date': event.creation_date.isoformat(),
+        'user': event.user_id.username if event.user_id else None,
+        'changes': event.changes,
+    }
@@ -0,0 +1,99 @@
+"""
+Signed invitation links to game sessions.
+
+An invitation token is a signed, timestamped payload with the session id, its title and date for display,
+and the id of an optional SlotReservation. Opening the link only verifies the signature and age, so the
+many clicks of people who never join cost no database queries; the database is used when an invitation
+is created and when it is accepted.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import GameSession, PlayerCharacter, SlotReservation
+
+INVITATION_SALT = 'GameMaster_app.invitations'
+
+
+class InvitationError(Exception):
+    """Raised when an invitation is invalid, expired or cannot be accepted."""
+
+
+def create_invitation(session, reserve_slot=False):
+    """
+    Returns a signed invitation token for the session, reserving a slot for it when requested.
+    """
+    reservation = None
+    if reserve_slot:
+        with transaction.atomic():
+            locked = GameSession.objects.select_for_update().get(pk=session.pk)
+            if free_slots(locked) < 1:
+                raise InvitationError('Brak wolnych miejsc')
+            reservation = SlotReservation.objects.create(
+                session_id=locked,
+                expiry_date=timezone.now() + timedelta(seconds=settings.INVITATION_MAX_AGE),
+            )
+    payload = {
+        's': session.pk,
+        't': session.title,
+        'd': session.session_date.isoformat(),
+        'r': reservation.pk if reservation else None,
+    }
+    return signing.dumps(payload, salt=INVITATION_SALT, compress=True)
+
+
+def read_invitation(token):
+    """
+    Verifies an invitation token cryptographically and returns its claims, without database access.
+    """
+    try:
+        claims = signing.loads(token, salt=INVITATION_SALT, max_age=settings.INVITATION_MAX_AGE)
+    except signing.SignatureExpired:
+        raise InvitationError('Zaproszenie wygasło')
+    except signing.BadSignature:
+        raise InvitationError('Nieprawidłowe zaproszenie')
+    claims['session_date'] = parse_datetime(claims['d'])
+    return claims
+
+
+def free_slots(session):
+    """
+    Returns the slots of a session not taken by characters or by unused, unexpired reservations.
+    """
+    joined = PlayerCharacter.game_session_id.through.objects.filter(gamesession_id=session.pk).count()
+    reserved = SlotReservation.objects.filter(
+        session_id=session, character_id__isnull=True, expiry_date__gt=timezone.now()).count()
+    return session.slots - joined - reserved
+
+
+def accept_invitation(claims, character):
+    """
+    Adds the character to the invited session. An invitation with a reservation uses its reserved slot,
+    otherwise the session has to be open and have a free slot.
+    """
+    with transaction.atomic():
+        try:
+            session = GameSession.objects.select_for_update().get(pk=claims['s'])
+        except GameSession.DoesNotExist:
+            raise InvitationError('Sesja nie istnieje')
+        if character.game_session_id.filter(pk=session.pk).exists():
+            return session
+        reservation = None
+        if claims.get('r'):
+            reservation = SlotReservation.objects.filter(
+                pk=claims['r'], session_id=session, character_id__isnull=True,
+                expiry_date__gt=timezone.now()).first()
+        if reservation is None:
+            if not session.is_open:
+                raise InvitationError('Sesja jest zamknięta')
+            if free_slots(session) < 1:
+                raise InvitationError('Brak wolnych miejsc')
+        else:
+            reservation.character_id = character
+            reservation.save(update_fields=['character_id'])
+        character.game_session_id.add(session)
+    return session
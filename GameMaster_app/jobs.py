@@ -0,0 +1,186 @@
+"""
+Database-backed background job queue.
+
+Tasks are plain functions registered with @task('name'). Request handlers call enqueue('name', **payload)
+and return immediately; the run_jobs command claims queued jobs and runs them in a thread pool. No broker
+is needed:
+
+- on databases supporting it (PostgreSQL) jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so many
+  workers poll the same table without blocking each other,
+- elsewhere (SQLite) every job is claimed with a conditional UPDATE of its status, which only one worker
+  can win.
+
+Failed jobs are retried with exponential backoff until max_attempts is reached. A worker renews the lease
+(locked_date) of its running jobs every JOB_HEARTBEAT_INTERVAL seconds, so only jobs of a worker that stopped
+are queued again after JOB_STALE_AFTER seconds; such requeues count as failed attempts.
+"""
+import logging
+import os
+import socket
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .accounts import run_deletion
+from .analytics import update_rollups
+from .archive import DEFAULT_BATCH_SIZE, archive_cutoff, archive_sessions
+from .models import AccountDeletion, Job
+from .recommendations import update_recommendations
+from .reminders import ReminderDispatcher
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+def task(name):
+    """
+    Registers a function as a background task under `name`.
+    """
+    def register(function):
+        TASKS[name] = function
+        return function
+    return register
+
+
+def enqueue(name, run_after=None, max_attempts=5, **payload):
+    if name not in TASKS:
+        raise ValueError(f'Unknown task: {name}')
+    return Job.objects.create(name=name, payload=payload, run_after=run_after or timezone.now(),
+                              max_attempts=max_attempts)
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim_jobs(worker, limit):
+    """
+    Claims up to `limit` due jobs for `worker` and returns them.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.Status.QUEUED, run_after__lte=now).order_by('run_after', 'id')
+    claim = {'status': Job.Status.RUNNING, 'locked_by': worker, 'locked_date': now}
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit])
+            Job.objects.filter(pk__in=ids).update(**claim)
+    else:
+        ids = [pk for pk in due.values_list('pk', flat=True)[:limit]
+               if Job.objects.filter(pk=pk, status=Job.Status.QUEUED).update(**claim)]
+    return list(Job.objects.filter(pk__in=ids).order_by('run_after', 'id'))
+
+
+def requeue_stale_jobs():
+    """
+    Queues again running jobs whose lease was not renewed within JOB_STALE_AFTER seconds, counting the lost run
+    as an attempt. Jobs without attempts left are marked as failed.
+    """
+    now = timezone.now()
+    expired = now - timedelta(seconds=settings.JOB_STALE_AFTER)
+    stale = Job.objects.filter(status=Job.Status.RUNNING, locked_date__lt=expired)
+    released = {'attempts': F('attempts') + 1, 'locked_by': '', 'locked_date': None,
+                'last_error': 'Worker stopped renewing the lease of the job'}
+    failed = stale.filter(attempts__gte=F('max_attempts') - 1).update(status=Job.Status.FAILED, finished_date=now,
+                                                                      **released)
+    return failed + stale.update(status=Job.Status.QUEUED, **released)
+
+
+def renew_leases(worker, jobs):
+    """
+    Moves the locked_date of the running jobs of `worker` to now, so they are not taken for stale.
+    """
+    return Job.objects.filter(pk__in=[job.pk for job in jobs], status=Job.Status.RUNNING, locked_by=worker).update(
+        locked_date=timezone.now())
+
+
+def run_job(job):
+    """
+    Runs a claimed job and records its outcome. Returns True when the job succeeded.
+    """
+    try:
+        TASKS[job.name](**job.payload)
+    except Exception:
+        attempts = job.attempts + 1
+        update = {'attempts': attempts, 'last_error': traceback.format_exc(), 'locked_by': '', 'locked_date': None}
+        if attempts >= job.max_attempts:
+            update.update(status=Job.Status.FAILED, finished_date=timezone.now())
+        else:
+            backoff = timedelta(seconds=settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1))
+            update.update(status=Job.Status.QUEUED, run_after=timezone.now() + backoff)
+        Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(**update)
+        logger.exception('Job %s failed (attempt %s)', job, attempts)
+        return False
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        status=Job.Status.DONE, attempts=job.attempts + 1, finished_date=timezone.now(), locked_by='', locked_date=None)
+    return True
+
+
+def _run_in_thread(job):
+    try:
+        return run_job(job)
+    finally:
+        close_old_connections()
+
+
+def work(threads=4, poll_interval=1.0, once=False):
+    """
+    Claims and runs jobs in a pool of `threads` threads until interrupted, or until the queue has no due
+    jobs when `once` is set. A job is claimed as soon as a thread is free, and the leases of running jobs are
+    renewed every JOB_HEARTBEAT_INTERVAL seconds. Returns the number of jobs run.
+    """
+    worker = worker_id()
+    processed = 0
+    running = {}
+    renewed = time.monotonic()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        while True:
+            requeue_stale_jobs()
+            claimed = claim_jobs(worker, threads - len(running)) if len(running) < threads else []
+            for job in claimed:
+                running[executor.submit(_run_in_thread, job)] = job
+            if time.monotonic() - renewed >= settings.JOB_HEARTBEAT_INTERVAL:
+                renew_leases(worker, running.values())
+                renewed = time.monotonic()
+            if running:
+                done, _ = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                processed += len(done)
+                continue
+            if once:
+                return processed
+            time.sleep(poll_interval)
+
+
+@task('archive_sessions')
+def archive_sessions_task(days=None, batch_size=None):
+    for _ in archive_sessions(archive_cutoff(days), batch_size or DEFAULT_BATCH_SIZE):
+        pass
+
+
+@task('send_reminders')
+def send_reminders_task(catch_up_minutes=15):
+    ReminderDispatcher(start=timezone.now() - timedelta(minutes=catch_up_minutes)).run_once()
+
+
+@task('update_rollups')
+def update_rollups_task():
+    update_rollups()
+
+
+@task('update_recommendations')
+def update_recommendations_task():
+    update_recommendations()
+
+
+@task('delete_account')
+def delete_account_task(deletion_id, batch_size=None):
+    for _ in run_deletion(AccountDeletion.objects.get(pk=deletion_id), batch_size):
+        pass
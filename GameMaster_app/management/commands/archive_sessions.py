@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from GameMaster_app.archive import DEFAULT_BATCH_SIZE, archive_cutoff, archive_sessions
+
+
+class Command(BaseCommand):
+    """
+    Moves past game sessions into the archive tables in committed batches.
+
+    Usage:
+        python manage.py archive_sessions [--days N] [--batch-size N] [--max-batches N]
+    """
+    help = 'Archives game sessions older than SESSION_ARCHIVE_AFTER_DAYS in resumable batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Archive sessions dated more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, default=None)
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['days'])
+        total = 0
+        for archived in archive_sessions(cutoff, options['batch_size'], options['max_batches']):
+            total += archived
+            self.stdout.write(f'Archived {total} sessions dated before {cutoff:%Y-%m-%d}')
+        self.stdout.write(self.style.SUCCESS(f'Done, {total} sessions archived'))
@@ -0,0 +1,33 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from GameMaster_app.accounts import request_deletion, run_deletion
+
+
+class Command(BaseCommand):
+    """
+    Disables a user account and deletes its data in committed batches, reporting progress.
+
+    Usage:
+        python manage.py delete_user <username> [--batch-size N] [--queue]
+    """
+    help = 'Deletes a user and everything it owns in small batches instead of one cascading transaction.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--queue', action='store_true',
+                            help='Only disable the account and leave the deletion to the run_jobs workers')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['username']).first()
+        if user is None:
+            raise CommandError(f'User {options["username"]} does not exist')
+        deletion = request_deletion(user, queue=options['queue'])
+        if options['queue']:
+            self.stdout.write(self.style.SUCCESS(f'Account disabled, deletion #{deletion.pk} queued'))
+            return
+        for _ in run_deletion(deletion, options['batch_size']):
+            deletion.refresh_from_db()
+            self.stdout.write(f'{deletion.step}: {deletion.deleted_rows}/{deletion.total_rows} rows')
+        self.stdout.write(self.style.SUCCESS(f'Done, user {deletion.username} deleted'))
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from GameMaster_app.reminders import ReminderDispatcher
+
+
+class Command(BaseCommand):
+    """
+    Runs the session reminder dispatcher.
+
+    Usage:
+        python manage.py dispatch_reminders [--once] [--catch-up MINUTES]
+    """
+    help = 'Emails reminders to game masters and players before their sessions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Send the reminders due now and exit')
+        parser.add_argument('--catch-up', type=int, default=15,
+                            help='Also send reminders that fell due this many minutes before the start')
+
+    def handle(self, *args, **options):
+        dispatcher = ReminderDispatcher(start=timezone.now() - timedelta(minutes=options['catch_up']))
+        if options['once']:
+            sent = dispatcher.run_once()
+            self.stdout.write(self.style.SUCCESS(f'Sent {sent} reminder emails'))
+            return
+        self.stdout.write('Reminder dispatcher started')
+        dispatcher.run_forever()
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from GameMaster_app.tokens import issue_token
+from GameMaster_app.traffic import ROLES, compare, read_traces, replay
+
+
+def _ms(value):
+    return '-' if value is None else f'{value:.1f}'
+
+
+class Command(BaseCommand):
+    """
+    Replays a traffic capture against a running instance and compares latencies and status codes per view.
+
+    Usage:
+        python manage.py replay_traffic <capture.jsonl> [--base-url URL] [--speed X] [--as ROLE=USERNAME ...]
+            [--skip-view NAME ...]
+    """
+    help = ('Replays captured traffic at the original pace (or --speed times faster) and reports latency and '
+            'status differences per URL name.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('capture')
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--speed', type=float, default=1.0,
+                            help='Replay this many times faster than captured, 0 sends without pauses')
+        parser.add_argument('--as', dest='users', action='append', default=[], metavar='ROLE=USERNAME',
+                            help='Local user whose API token authenticates the requests of a role')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--limit', type=int, default=None)
+        parser.add_argument('--skip-view', dest='skipped_views', action='append', default=[], metavar='NAME',
+                            help='URL name not to replay, in addition to TRAFFIC_REPLAY_SKIPPED_VIEWS')
+
+    def handle(self, *args, **options):
+        tokens = {}
+        for mapping in options['users']:
+            role, _, username = mapping.partition('=')
+            if role not in ROLES or not username:
+                raise CommandError(f'Expected ROLE=USERNAME with ROLE one of {", ".join(ROLES)}, got {mapping}')
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f'User {username} does not exist')
+            tokens[role] = issue_token(user)
+        traces = read_traces(options['capture'], options['limit'])
+        self.stdout.write(f'Replaying {len(traces)} requests against {options["base_url"]}')
+        results = replay(traces, options['base_url'], tokens, options['speed'], options['concurrency'],
+                         options['timeout'], [*settings.TRAFFIC_REPLAY_SKIPPED_VIEWS, *options['skipped_views']])
+        self.stdout.write(f'{"view":<24} {"requests":>8} {"skipped":>7} {"p50 before":>10} {"p50 after":>10} '
+                          f'{"p95 before":>10} {"p95 after":>10} {"status":>6} {"errors":>6}')
+        for row in compare(results):
+            self.stdout.write(
+                f'{row["view"]:<24} {row["requests"]:>8} {row["skipped"]:>7} {_ms(row["captured_p50"]):>10} '
+                f'{_ms(row["replayed_p50"]):>10} {_ms(row["captured_p95"]):>10} {_ms(row["replayed_p95"]):>10} '
+                f'{row["status_changes"]:>6} {row["errors"]:>6}')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from GameMaster_app.jobs import work
+
+
+class Command(BaseCommand):
+    """
+    Runs a background job worker.
+
+    Usage:
+        python manage.py run_jobs [--threads N] [--poll SECONDS] [--once]
+    """
+    help = 'Claims queued background jobs and runs them in a thread pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due')
+
+    def handle(self, *args, **options):
+        processed = work(threads=options['threads'], poll_interval=options['poll'], once=options['once'])
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs'))
@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from GameMaster_app.models import GameSession
+from GameMaster_app.simulation import (DEFAULT_CHUNK_SIZE, DEFAULT_FIGHTS, DEFAULT_TOLERANCE, EncounterError,
+                                       parse_encounter, session_party, simulate_encounter)
+
+
+class Command(BaseCommand):
+    """
+    Estimates win and survival probabilities of a session's party against an encounter.
+
+    Usage:
+        python manage.py simulate_encounter <session_id> encounter.json [--fights N] [--workers N]
+    """
+    help = "Runs a Monte Carlo simulation of a session's party against an encounter definition."
+
+    def add_arguments(self, parser):
+        parser.add_argument('session_id', type=int)
+        parser.add_argument('encounter', help='Path to a JSON encounter definition')
+        parser.add_argument('--fights', type=int, default=DEFAULT_FIGHTS)
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes, 0 runs in the current process')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            session = GameSession.objects.get(pk=options['session_id'])
+        except GameSession.DoesNotExist:
+            raise CommandError(f"Session {options['session_id']} does not exist")
+        try:
+            with open(options['encounter'], encoding='utf-8') as encounter_file:
+                definition = json.load(encounter_file)
+        except (OSError, json.JSONDecodeError) as error:
+            raise CommandError(f'Cannot read encounter: {error}')
+        try:
+            enemies, max_rounds = parse_encounter(definition)
+            result = simulate_encounter(
+                session_party(session), enemies,
+                fights=options['fights'],
+                max_rounds=max_rounds,
+                chunk_size=options['chunk_size'],
+                tolerance=options['tolerance'],
+                workers=options['workers'],
+                seed=options['seed'],
+            )
+        except EncounterError as error:
+            raise CommandError(str(error))
+        self.stdout.write(json.dumps(result.as_dict(), indent=2, ensure_ascii=False))
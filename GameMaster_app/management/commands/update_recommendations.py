@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from GameMaster_app.recommendations import update_recommendations
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the session recommendations of all players.
+
+    Usage:
+        python manage.py update_recommendations
+    """
+    help = 'Scores upcoming open sessions for every player and stores the top RECOMMENDATIONS_TOP_K.'
+
+    def handle(self, *args, **options):
+        stored = update_recommendations()
+        self.stdout.write(self.style.SUCCESS(f'Done, {stored} recommendations stored'))
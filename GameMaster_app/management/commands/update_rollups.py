@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from GameMaster_app.analytics import update_rollups
+
+
+class Command(BaseCommand):
+    """
+    Computes the daily activity rollups of the days completed since the last run.
+
+    Usage:
+        python manage.py update_rollups
+    """
+    help = 'Updates the DailyActivity rollups incrementally from their watermark.'
+
+    def handle(self, *args, **options):
+        rows = update_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Done, {rows} rollup rows stored'))
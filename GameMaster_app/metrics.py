@@ -0,0 +1,147 @@
+"""
+Request metrics in Prometheus text format.
+
+MetricsMiddleware records, per URL name, request counts, a latency histogram, the number of SQL queries and
+response sizes. Every thread writes to its own dictionary, so recording takes no lock. Each process writes a
+snapshot of its counters to METRICS_DIR every METRICS_FLUSH_INTERVAL seconds (atomically, via rename), and
+the /metrics endpoint sums the snapshots of all gunicorn/uvicorn workers. Without METRICS_DIR only the
+counters of the serving process are exported.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS = {
+    'requests': ('mastergame_requests_total', 'counter', 'Requests by URL name, method and status.'),
+    'duration': ('mastergame_request_duration_seconds', 'histogram', 'Request latency by URL name.'),
+    'queries': ('mastergame_db_queries_total', 'counter', 'SQL queries run by requests, by URL name.'),
+    'bytes': ('mastergame_response_bytes_total', 'counter', 'Response body bytes by URL name.'),
+}
+
+
+class Registry:
+    """
+    Per-process metric registry made of one counter dictionary per thread.
+
+    Keys are tuples (metric, label values...) and values are numbers. Histogram buckets are stored
+    non-cumulatively as ('duration_bucket', view, upper bound) and made cumulative on export.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.shards = []
+        self.shards_lock = threading.Lock()
+        self.flushed_at = 0.0
+
+    def shard(self):
+        counters = getattr(self.local, 'counters', None)
+        if counters is None:
+            counters = self.local.counters = {}
+            with self.shards_lock:
+                self.shards.append(counters)
+        return counters
+
+    def inc(self, key, amount=1):
+        counters = self.shard()
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe_request(self, view, method, status, duration, queries, size):
+        self.inc(('requests', view, method, str(status)))
+        bucket = next((bound for bound in LATENCY_BUCKETS if duration <= bound), '+Inf')
+        self.inc(('duration_bucket', view, str(bucket)))
+        self.inc(('duration_sum', view), duration)
+        self.inc(('duration_count', view))
+        self.inc(('queries', view), queries)
+        self.inc(('bytes', view), size)
+
+    def snapshot(self):
+        totals = {}
+        with self.shards_lock:
+            shards = list(self.shards)
+        for counters in shards:
+            for key, value in counters.copy().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def flush(self, directory):
+        """
+        Writes the counters of this process to <directory>/<pid>.json.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}.json'
+        temporary = directory / f'.{os.getpid()}.tmp'
+        temporary.write_text(json.dumps([[list(key), value] for key, value in self.snapshot().items()]))
+        os.replace(temporary, path)
+        self.flushed_at = time.monotonic()
+
+    def maybe_flush(self):
+        directory = settings.METRICS_DIR
+        if directory and time.monotonic() - self.flushed_at > settings.METRICS_FLUSH_INTERVAL:
+            self.flush(directory)
+
+
+registry = Registry()
+
+
+def collect():
+    """
+    Returns the counters of all processes sharing METRICS_DIR, or of this process only.
+    """
+    directory = settings.METRICS_DIR
+    if not directory:
+        return registry.snapshot()
+    registry.flush(directory)
+    totals = {}
+    for path in Path(directory).glob('*.json'):
+        try:
+            entries = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        for key, value in entries:
+            key = tuple(key)
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{value}"' for name, value in labels.items())
+
+
+def render(totals):
+    """
+    Renders counters in the Prometheus text exposition format.
+    """
+    lines = []
+    grouped = {}
+    for key, value in totals.items():
+        grouped.setdefault(key[0], []).append((key[1:], value))
+    for metric, (name, kind, description) in METRICS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        if metric == 'requests':
+            for (view, method, status), value in sorted(grouped.get('requests', [])):
+                lines.append(f'{name}{{{_labels(view=view, method=method, status=status)}}} {value}')
+        elif metric == 'duration':
+            buckets = {}
+            for (view, bound), value in grouped.get('duration_bucket', []):
+                buckets.setdefault(view, {})[bound] = value
+            sums = dict((labels[0], value) for labels, value in grouped.get('duration_sum', []))
+            counts = dict((labels[0], value) for labels, value in grouped.get('duration_count', []))
+            for view in sorted(buckets):
+                cumulative = 0
+                for bound in [str(bound) for bound in LATENCY_BUCKETS] + ['+Inf']:
+                    cumulative += buckets[view].get(bound, 0)
+                    lines.append(f'{name}_bucket{{{_labels(view=view, le=bound)}}} {cumulative}')
+                lines.append(f'{name}_sum{{{_labels(view=view)}}} {sums.get(view, 0)}')
+                lines.append(f'{name}_count{{{_labels(view=view)}}} {counts.get(view, 0)}')
+        else:
+            for (view,), value in sorted(grouped.get(metric, [])):
+                lines.append(f'{name}{{{_labels(view=view)}}} {value}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,118 @@
+import time
+
+from django.db import connection
+from django.http import JsonResponse
+
+from .metrics import registry
+from .profiling import profile_request, requested_mode
+from .slowqueries import QueryTimer
+from .tokens import TokenError, read_token, token_user
+from .traffic import request_trace, should_capture, user_role, write_trace
+
+
+class MetricsMiddleware:
+    """
+    Records latency, SQL query count and response size of every request under its URL name.
+
+    The middleware should be listed first, so the measured time includes all other middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        view = match.url_name if match and match.url_name else 'unmatched'
+        size = 0 if response.streaming else len(response.content)
+        registry.observe_request(view, request.method, response.status_code, duration, queries, size)
+        registry.maybe_flush()
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Runs staff requests asking for it with the X-Profile header or _profile parameter under a profiler, see
+    profiling.py. Other requests pass straight through.
+
+    The middleware must be listed after the authentication middleware, which set request.user.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = requested_mode(request)
+        if mode is None:
+            return self.get_response(request)
+        return profile_request(mode, self.get_response, request)
+
+
+class SlowQueryMiddleware:
+    """
+    Records SQL statements slower than SLOW_QUERY_THRESHOLD_MS in the slow-query log, see slowqueries.py.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with connection.execute_wrapper(QueryTimer(request)):
+            return self.get_response(request)
+
+
+class TrafficCaptureMiddleware:
+    """
+    Records a TRAFFIC_CAPTURE_RATE sample of requests as anonymized traces in TRAFFIC_CAPTURE_FILE, see
+    traffic.py.
+
+    The middleware should be listed after the authentication middleware, so the role recorded is the one the
+    request was made with, also for requests logging in or out.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not should_capture():
+            return self.get_response(request)
+        role = user_role(request.user)
+        started = time.time()
+        timer = time.perf_counter()
+        response = self.get_response(request)
+        write_trace(request_trace(request, response, role, started, time.perf_counter() - timer))
+        return response
+
+
+class TokenAuthenticationMiddleware:
+    """
+    Authenticates requests carrying an "Authorization: Bearer <token>" header from the signed token alone.
+
+    The middleware replaces request.user with the user described by the token, so neither the session nor
+    the User table is read. Bearer tokens are not sent by browsers automatically, so such requests are
+    exempt from CSRF checks. Invalid, expired or revoked tokens are answered with 401.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        if header.startswith('Bearer '):
+            try:
+                claims = read_token(header[len('Bearer '):].strip())
+            except TokenError as error:
+                return JsonResponse({'error': str(error)}, status=401)
+            request.user = token_user(claims)
+            request._dont_enforce_csrf_checks = True
+        return self.get_response(request)
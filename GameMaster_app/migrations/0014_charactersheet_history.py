@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('GameMaster_app', '0013_alter_gamemaster_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CharacterSheetEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.PositiveIntegerField()),
+                ('changes', models.JSONField(default=dict)),
+                ('creation_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sheet_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='GameMaster_app.charactersheet')),
+                ('user_id', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['sheet_id', 'sequence'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CharacterSheetSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.PositiveIntegerField()),
+                ('state', models.JSONField(default=dict)),
+                ('creation_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sheet_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='GameMaster_app.charactersheet')),
+            ],
+            options={
+                'ordering': ['sheet_id', 'sequence'],
+                'indexes': [models.Index(fields=['sheet_id', 'creation_date'], name='sheet_snapshot_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='charactersheetsnapshot',
+            constraint=models.UniqueConstraint(fields=('sheet_id', 'sequence'), name='unique_sheet_snapshot_sequence'),
+        ),
+        migrations.AddIndex(
+            model_name='charactersheetevent',
+            index=models.Index(fields=['sheet_id', 'creation_date'], name='sheet_event_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='charactersheetevent',
+            constraint=models.UniqueConstraint(fields=('sheet_id', 'sequence'), name='unique_sheet_event_sequence'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:44
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GameMaster_app', '0014_charactersheet_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedGameSession',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('creation_date', models.DateTimeField()),
+                ('title', models.CharField(max_length=256)),
+                ('slots', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(6)])),
+                ('session_date', models.DateTimeField(db_index=True)),
+                ('is_public', models.BooleanField()),
+                ('is_open', models.BooleanField()),
+                ('archived_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('owner_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='GameMaster_app.gamemaster')),
+            ],
+            options={
+                'ordering': ['-creation_date', 'owner_id', 'session_date'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='gamesession',
+            name='session_date',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedSessionCharacter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('character_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='GameMaster_app.playercharacter')),
+                ('session_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='GameMaster_app.archivedgamesession')),
+            ],
+            options={
+                'ordering': ['session_id', 'character_id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedGameSystem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('system', models.CharField(choices=[('Rpg1', 'Fajny system'), ('Rpg2', 'Dobry system'), ('Rpg3', 'Taki sobie system'), ('NN', 'Inny system')], max_length=4)),
+                ('creation_date', models.DateTimeField()),
+                ('session_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='GameMaster_app.archivedgamesession')),
+            ],
+            options={
+                'ordering': ['-creation_date', 'session_id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='archivedsessioncharacter',
+            constraint=models.UniqueConstraint(fields=('session_id', 'character_id'), name='unique_archived_session_character'),
+        ),
+    ]
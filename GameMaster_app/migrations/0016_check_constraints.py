@@ -0,0 +1,72 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:45
+
+from django.db import migrations, models
+
+ATTRIBUTES = ['strength', 'condition', 'dexterity', 'intelligence', 'wisdom', 'charisma']
+
+
+def validate_existing_data(apps, schema_editor):
+    """
+    Fails with a readable message listing the offending rows before any constraint is added,
+    instead of a bare constraint violation from the database.
+    """
+    GameSession = apps.get_model('GameMaster_app', 'GameSession')
+    CharacterSheet = apps.get_model('GameMaster_app', 'CharacterSheet')
+    sheet_violations = models.Q(life_points__gt=100) | models.Q(age__lt=18) | models.Q(age__gt=999)
+    for name in ATTRIBUTES:
+        sheet_violations |= models.Q(**{f'{name}__lt': 1}) | models.Q(**{f'{name}__gt': 30})
+    sessions = list(GameSession.objects.filter(models.Q(slots__lt=1) | models.Q(slots__gt=6))
+                    .values_list('pk', flat=True)[:20])
+    sheets = list(CharacterSheet.objects.filter(sheet_violations).values_list('pk', flat=True)[:20])
+    if sessions or sheets:
+        raise ValueError(
+            f'Fix out of range data before adding check constraints: '
+            f'GameSession {sessions}, CharacterSheet {sheets}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GameMaster_app', '0015_session_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(validate_existing_data, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='charactersheet',
+            constraint=models.CheckConstraint(check=models.Q(('strength__gte', 1), ('strength__lte', 30)), name='charactersheet_strength_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='charactersheet',
+            constraint=models.CheckConstraint(check=models.Q(('condition__gte', 1), ('condition__lte', 30)), name='charactersheet_condition_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='charactersheet',
+            constraint=models.CheckConstraint(check=models.Q(('dexterity__gte', 1), ('dexterity__lte', 30)), name='charactersheet_dexterity_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='charactersheet',
+            constraint=models.CheckConstraint(check=models.Q(('intelligence__gte', 1), ('intelligence__lte', 30)), name='charactersheet_intelligence_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='charactersheet',
+            constraint=models.CheckConstraint(check=models.Q(('wisdom__gte', 1), ('wisdom__lte', 30)), name='charactersheet_wisdom_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='charactersheet',
+            constraint=models.CheckConstraint(check=models.Q(('charisma__gte', 1), ('charisma__lte', 30)), name='charactersheet_charisma_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='charactersheet',
+            constraint=models.CheckConstraint(check=models.Q(('life_points__lte', 100)), name='charactersheet_life_points_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='charactersheet',
+            constraint=models.CheckConstraint(check=models.Q(('age__gte', 18), ('age__lte', 999)), name='charactersheet_age_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='gamesession',
+            constraint=models.CheckConstraint(check=models.Q(('slots__gte', 1), ('slots__lte', 6)), name='gamesession_slots_range'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:48
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GameMaster_app', '0016_check_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('token_id', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('expiry_date', models.DateTimeField(db_index=True)),
+                ('creation_date', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-creation_date'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GameMaster_app', '0017_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offset_minutes', models.PositiveIntegerField()),
+                ('creation_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('session_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='GameMaster_app.gamesession')),
+            ],
+            options={
+                'ordering': ['-creation_date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sentreminder',
+            constraint=models.UniqueConstraint(fields=('session_id', 'offset_minutes'), name='unique_sent_reminder'),
+        ),
+    ]
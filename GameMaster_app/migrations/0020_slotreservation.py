@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GameMaster_app', '0019_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('expiry_date', models.DateTimeField()),
+                ('creation_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('character_id', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='GameMaster_app.playercharacter')),
+                ('session_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='GameMaster_app.gamesession')),
+            ],
+            options={
+                'ordering': ['-creation_date'],
+                'indexes': [models.Index(fields=['session_id', 'expiry_date'], name='reservation_session_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:03
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GameMaster_app', '0020_slotreservation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderedText',
+            fields=[
+                ('content_hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('renderer_version', models.PositiveIntegerField()),
+                ('html', models.TextField()),
+                ('creation_date', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-creation_date'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('GameMaster_app', '0021_renderedtext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('body', models.TextField()),
+                ('creation_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('session_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='GameMaster_app.gamesession')),
+                ('user_id', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['session_id', 'id'],
+                'indexes': [models.Index(fields=['session_id', 'id'], name='message_session_idx')],
+            },
+        ),
+    ]
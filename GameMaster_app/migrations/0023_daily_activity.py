@@ -0,0 +1,65 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GameMaster_app', '0022_sessionmessage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='playercharacter',
+            name='death_date',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='gamesession',
+            name='creation_date',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='playercharacter',
+            name='creation_date',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('sessions_created', models.PositiveIntegerField(default=0)),
+                ('slots_offered', models.PositiveIntegerField(default=0)),
+                ('slots_filled', models.PositiveIntegerField(default=0)),
+                ('active_players', models.PositiveIntegerField(default=0)),
+                ('characters_created', models.PositiveIntegerField(default=0)),
+                ('characters_died', models.PositiveIntegerField(default=0)),
+                ('owner_id', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='GameMaster_app.gamemaster')),
+            ],
+            options={
+                'ordering': ['day', 'owner_id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyactivity',
+            constraint=models.UniqueConstraint(fields=('owner_id', 'day'), name='unique_daily_activity'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyactivity',
+            constraint=models.UniqueConstraint(condition=models.Q(('owner_id__isnull', True)), fields=('day',), name='unique_daily_activity_total'),
+        ),
+    ]
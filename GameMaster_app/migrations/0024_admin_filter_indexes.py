@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GameMaster_app', '0023_daily_activity'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gamesession',
+            name='is_open',
+            field=models.BooleanField(db_index=True, default=True),
+        ),
+        migrations.AlterField(
+            model_name='gamesession',
+            name='is_public',
+            field=models.BooleanField(db_index=True, default=True),
+        ),
+        migrations.AlterField(
+            model_name='gamesystem',
+            name='system',
+            field=models.CharField(choices=[('Rpg1', 'Fajny system'), ('Rpg2', 'Dobry system'), ('Rpg3', 'Taki sobie system'), ('NN', 'Inny system')], db_index=True, default='NN', max_length=4),
+        ),
+        migrations.AlterField(
+            model_name='playercharacter',
+            name='character_status',
+            field=models.CharField(choices=[('Dead', 'Martwy'), ('Alive', 'Żyje')], db_index=True, default='Alive', max_length=5),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GameMaster_app', '0024_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField()),
+                ('score', models.FloatField()),
+                ('creation_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('player_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='GameMaster_app.player')),
+                ('session_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='GameMaster_app.gamesession')),
+            ],
+            options={
+                'ordering': ['player_id', 'rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sessionrecommendation',
+            constraint=models.UniqueConstraint(fields=('player_id', 'rank'), name='unique_recommendation_rank'),
+        ),
+    ]
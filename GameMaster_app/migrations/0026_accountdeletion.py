@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('GameMaster_app', '0025_sessionrecommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=150)),
+                ('status', models.CharField(choices=[('Queued', 'W kolejce'), ('Running', 'W trakcie'), ('Done', 'Zakończone')], default='Queued', max_length=7)),
+                ('step', models.CharField(blank=True, default='', max_length=64)),
+                ('total_rows', models.PositiveIntegerField(default=0)),
+                ('deleted_rows', models.PositiveIntegerField(default=0)),
+                ('creation_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_date', models.DateTimeField(blank=True, null=True)),
+                ('user_id', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-creation_date', 'id'],
+            },
+        ),
+    ]
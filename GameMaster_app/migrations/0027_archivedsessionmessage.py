@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('GameMaster_app', '0026_accountdeletion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSessionMessage',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('body', models.TextField()),
+                ('creation_date', models.DateTimeField()),
+                ('session_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='GameMaster_app.archivedgamesession')),
+                ('user_id', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['session_id', 'id'],
+            },
+        ),
+    ]
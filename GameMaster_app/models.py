@@ -1,4 +1,5 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.validators import MaxValueValidator, MinValueValidator
@@ -88,36 +89,52 @@ class GameSession(models.Model):
     - owner_id (ForeignKey): A many-to-one relationship with the GameMaster model, representing
       the owner / game master of the session.
     - creation_date (DateTimeField): A datetime field recording the date and time when
-      the GameSession instance was created.
+      the GameSession instance was created, indexed for the daily activity rollups.
     - title (CharField): A character field to store the title or name of the gaming session.
     - slots (PositiveIntegerField): An integer field representing the number of available slots
       for players, with validation to ensure a minimum of 1 and a maximum of 6 slots.
-    - session_date (DateTimeField): A datetime field representing the date and time of the gaming session.
-    - is_public (BooleanField): A boolean field indicating whether the session is public or private.
-    - is_open (BooleanField): A boolean field indicating whether the session is open or closed to players.
+    - session_date (DateTimeField): A datetime field representing the date and time of the gaming session,
+      indexed for date range queries such as archival of past sessions.
+    - is_public (BooleanField): A boolean field indicating whether the session is public or private,
+      indexed for admin filters.
+    - is_open (BooleanField): A boolean field indicating whether the session is open or closed to players,
+      indexed for admin filters.
 
     Meta:
     - ordering (list): Specifies the default ordering for instances of this model. The list
       contains three elements: '-creation_date' for descending order by creation date,
       'owner_id' for ascending order by owner ID, and 'session_date' for ascending order by session date.
+    - constraints (list): A check constraint mirroring the validators of 'slots', so bulk writes that skip
+      full_clean() are still bounded by the database.
 
     Methods:
     - __str__(): Returns the title of the gaming session as the string representation of this model.
+    - from_db(): Remembers the loaded session date, so a moved session invalidates the cached calendar
+      of its former month as well.
     """
     owner_id = models.ForeignKey(GameMaster, on_delete=models.CASCADE)
-    creation_date = models.DateTimeField(default=timezone.now)
+    creation_date = models.DateTimeField(default=timezone.now, db_index=True)
     title = models.CharField(max_length=256)
     slots = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1), MaxValueValidator(6)])
-    session_date = models.DateTimeField()
-    is_public = models.BooleanField(default=True)
-    is_open = models.BooleanField(default=True)
+    session_date = models.DateTimeField(db_index=True)
+    is_public = models.BooleanField(default=True, db_index=True)
+    is_open = models.BooleanField(default=True, db_index=True)
 
     class Meta:
         ordering = ['-creation_date', 'owner_id', 'session_date']
+        constraints = [
+            models.CheckConstraint(check=models.Q(slots__gte=1, slots__lte=6), name='gamesession_slots_range'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_session_date = instance.__dict__.get('session_date')
+        return instance
+
 
 class GameSystem(models.Model):
     """
@@ -129,7 +146,7 @@ class GameSystem(models.Model):
         - session_id (ForeignKey): A many-to-one relationship with the GameSession model, indicating
           the gaming session associated with this gaming system choice.
         - system (CharField with choices): A character field representing the gaming system choice,
-          with predefined choices provided by the GameSystemChoices class.
+          with predefined choices provided by the GameSystemChoices class, indexed for admin filters.
         - creation_date (DateTimeField): A datetime field recording the date and time when
           the GameSystem instance was created.
 
@@ -148,7 +165,7 @@ class GameSystem(models.Model):
         NONAME = 'NN', 'Inny system'
 
     session_id = models.ForeignKey(GameSession, on_delete=models.CASCADE)
-    system = models.CharField(max_length=4, choices=GameSystem.choices, default=GameSystem.NONAME)
+    system = models.CharField(max_length=4, choices=GameSystem.choices, default=GameSystem.NONAME, db_index=True)
     creation_date = models.DateTimeField(default=timezone.now)
 
     class Meta:
@@ -171,9 +188,12 @@ class PlayerCharacter(models.Model):
         - description (TextField): A text field for providing a description or background story
           for the character.
         - creation_date (DateTimeField): A datetime field recording the date and time when
-          the PlayerCharacter instance was created.
+          the PlayerCharacter instance was created, indexed for the daily activity rollups.
         - character_status (CharField with choices): A character field representing the status
-          of the character, with predefined choices provided by the CharacterStatusChoices class.
+          of the character, with predefined choices provided by the CharacterStatusChoices class,
+          indexed for admin filters.
+        - death_date (DateTimeField): The date and time when the character was marked dead, indexed for
+          the daily activity rollups; empty for living characters.
         - game_session_id (ManyToManyField): A many-to-many relationship with the GameSession model,
           allowing the character to be associated with multiple gaming sessions.
 
@@ -184,6 +204,7 @@ class PlayerCharacter(models.Model):
 
         Methods:
         - __str__(): Returns the name of the character as the string representation of this model.
+        - save(): Sets or clears death_date when the character status changes.
         """
     class CharacterStatus(models.TextChoices):
         DEAD = 'Dead', 'Martwy'
@@ -192,8 +213,10 @@ class PlayerCharacter(models.Model):
     owner_id = models.ForeignKey(Player, on_delete=models.CASCADE)
     name = models.CharField(max_length=128)
     description = models.TextField()
-    creation_date = models.DateTimeField(default=timezone.now)
-    character_status = models.CharField(max_length=5, choices=CharacterStatus.choices, default=CharacterStatus.ALIVE)
+    creation_date = models.DateTimeField(default=timezone.now, db_index=True)
+    character_status = models.CharField(max_length=5, choices=CharacterStatus.choices, default=CharacterStatus.ALIVE,
+                                        db_index=True)
+    death_date = models.DateTimeField(null=True, blank=True, db_index=True)
     game_session_id = models.ManyToManyField('GameSession')
 
     class Meta:
@@ -202,6 +225,13 @@ class PlayerCharacter(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if self.character_status == self.CharacterStatus.DEAD and self.death_date is None:
+            self.death_date = timezone.now()
+        elif self.character_status != self.CharacterStatus.DEAD:
+            self.death_date = None
+        super().save(*args, **kwargs)
+
 
 class CharacterSheet(models.Model):
     """
@@ -237,10 +267,17 @@ class CharacterSheet(models.Model):
     Meta:
     - ordering (list): Specifies the default ordering for instances of this model. The list contains one element:
       '-character_id' for descending order by associated character ID.
+    - constraints (list): Check constraints mirroring the validators of the attributes, life points and age,
+      so bulk writes that skip full_clean() are still bounded by the database.
 
     Methods:
     - __str__(): Returns the string representation of the associated player character.
+    - history_state(): Returns the current values of the fields tracked in the change log.
+    - save(changed_by=None): Saves the sheet and appends a CharacterSheetEvent with the changed fields.
     """
+    HISTORY_FIELDS = ['strength', 'condition', 'dexterity', 'intelligence', 'wisdom', 'charisma',
+                      'reputation', 'wealth', 'life_points', 'age']
+
     character_id = models.OneToOneField(PlayerCharacter, on_delete=models.CASCADE, primary_key=True)
     strength = models.PositiveIntegerField(default=8, validators=[MinValueValidator(1), MaxValueValidator(30)])
     condition = models.PositiveIntegerField(default=8, validators=[MinValueValidator(1), MaxValueValidator(30)])
@@ -255,6 +292,596 @@ class CharacterSheet(models.Model):
 
     class Meta:
         ordering = ['-character_id']
+        constraints = [
+            models.CheckConstraint(check=models.Q(**{f'{name}__gte': 1, f'{name}__lte': 30}),
+                                   name=f'charactersheet_{name}_range')
+            for name in ['strength', 'condition', 'dexterity', 'intelligence', 'wisdom', 'charisma']
+        ] + [
+            models.CheckConstraint(check=models.Q(life_points__lte=100), name='charactersheet_life_points_range'),
+            models.CheckConstraint(check=models.Q(age__gte=18, age__lte=999), name='charactersheet_age_range'),
+        ]
+
+    def __str__(self):
+        return str(self.character_id)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._history_state = {name: instance.__dict__.get(name) for name in cls.HISTORY_FIELDS}
+        return instance
+
+    def history_state(self):
+        return {name: getattr(self, name) for name in self.HISTORY_FIELDS}
+
+    def save(self, *args, changed_by=None, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            CharacterSheetEvent.record(self, changed_by)
+
+
+class CharacterSheetEvent(models.Model):
+    """
+    CharacterSheetEvent is a Django model representing a single change of a character sheet.
+
+    Events form an append-only log: they are created by CharacterSheet.save() and are never updated
+    or deleted. Every CHARACTER_SHEET_SNAPSHOT_INTERVAL events a CharacterSheetSnapshot is stored, so
+    the state of a sheet at any moment is rebuilt from at most that many events.
+
+    Fields:
+    - sheet_id (ForeignKey): A many-to-one relationship with the CharacterSheet model, indicating the
+      changed character sheet.
+    - sequence (PositiveIntegerField): Position of the event in the log of the sheet, starting at 1.
+    - changes (JSONField): The changed fields mapped to [old value, new value] pairs.
+    - user_id (ForeignKey): The user who made the change, if known.
+    - creation_date (DateTimeField): A datetime field recording when the change was made.
+
+    Meta:
+    - ordering (list): Events are ordered by sheet and sequence.
+    - constraints (list): The sequence is unique per sheet.
+
+    Methods:
+    - record(sheet, changed_by): Appends an event for the fields changed since the sheet was loaded.
+    - record_bulk(before, after, changed_by): Appends events for many sheets in one batch.
+    """
+    sheet_id = models.ForeignKey(CharacterSheet, on_delete=models.CASCADE)
+    sequence = models.PositiveIntegerField()
+    changes = models.JSONField(default=dict)
+    user_id = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    creation_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['sheet_id', 'sequence']
+        constraints = [
+            models.UniqueConstraint(fields=['sheet_id', 'sequence'], name='unique_sheet_event_sequence'),
+        ]
+        indexes = [
+            models.Index(fields=['sheet_id', 'creation_date'], name='sheet_event_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.sheet_id_id} #{self.sequence}'
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Character sheet events are append-only')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('Character sheet events are append-only')
+
+    @classmethod
+    def record(cls, sheet, changed_by=None):
+        previous = getattr(sheet, '_history_state', None) or {}
+        state = sheet.history_state()
+        sheet._history_state = state
+        events = cls.record_bulk({sheet.pk: previous}, {sheet.pk: state}, changed_by)
+        return events[0] if events else None
+
+    @classmethod
+    def record_bulk(cls, before, after, changed_by=None):
+        """
+        Appends events for many sheets at once, used by set-based updates.
+
+        `before` and `after` map sheet primary keys to dicts of tracked field values; `after` has to
+        contain every field of CharacterSheet.HISTORY_FIELDS so snapshots can be taken.
+        """
+        changes = {}
+        for pk, state in after.items():
+            previous = before.get(pk) or {}
+            changed = {name: [previous.get(name), value] for name, value in state.items()
+                       if previous.get(name) != value}
+            if changed:
+                changes[pk] = changed
+        if not changes:
+            return []
+        last = dict(cls.objects.filter(sheet_id__in=changes).values('sheet_id')
+                    .annotate(last=models.Max('sequence')).values_list('sheet_id', 'last'))
+        now = timezone.now()
+        events = cls.objects.bulk_create([
+            cls(sheet_id_id=pk, sequence=last.get(pk, 0) + 1, changes=changed, user_id=changed_by,
+                creation_date=now)
+            for pk, changed in changes.items()
+        ])
+        interval = settings.CHARACTER_SHEET_SNAPSHOT_INTERVAL
+        CharacterSheetSnapshot.objects.bulk_create([
+            CharacterSheetSnapshot(sheet_id_id=event.sheet_id_id, sequence=event.sequence,
+                                   state=after[event.sheet_id_id], creation_date=now)
+            for event in events if event.sequence == 1 or event.sequence % interval == 0
+        ])
+        return events
+
+
+class CharacterSheetSnapshot(models.Model):
+    """
+    CharacterSheetSnapshot is a Django model storing the full state of a character sheet after an event.
+
+    Fields:
+    - sheet_id (ForeignKey): A many-to-one relationship with the CharacterSheet model.
+    - sequence (PositiveIntegerField): Sequence of the last event included in the snapshot.
+    - state (JSONField): Values of all CharacterSheet.HISTORY_FIELDS after that event.
+    - creation_date (DateTimeField): Date of the last event included in the snapshot.
+
+    Meta:
+    - ordering (list): Snapshots are ordered by sheet and sequence.
+    - constraints (list): The sequence is unique per sheet.
+    """
+    sheet_id = models.ForeignKey(CharacterSheet, on_delete=models.CASCADE)
+    sequence = models.PositiveIntegerField()
+    state = models.JSONField(default=dict)
+    creation_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['sheet_id', 'sequence']
+        constraints = [
+            models.UniqueConstraint(fields=['sheet_id', 'sequence'], name='unique_sheet_snapshot_sequence'),
+        ]
+        indexes = [
+            models.Index(fields=['sheet_id', 'creation_date'], name='sheet_snapshot_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.sheet_id_id} @{self.sequence}'
+
+
+class ArchivedGameSession(models.Model):
+    """
+    ArchivedGameSession is a Django model storing game sessions moved out of the GameSession table.
+
+    Past sessions are moved here in batches by the archive_sessions command, keeping their primary keys,
+    so the hot GameSession table and its indexes stay small. The fields mirror GameSession.
+
+    Fields:
+    - id (BigIntegerField): The primary key the session had in the GameSession table.
+    - owner_id, creation_date, title, slots, session_date, is_public, is_open: Copied from GameSession.
+    - archived_date (DateTimeField): A datetime field recording when the session was archived.
+
+    Meta:
+    - ordering (list): Same default ordering as GameSession.
+
+    Methods:
+    - __str__(): Returns the title of the gaming session as the string representation of this model.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    owner_id = models.ForeignKey(GameMaster, on_delete=models.CASCADE)
+    creation_date = models.DateTimeField()
+    title = models.CharField(max_length=256)
+    slots = models.PositiveIntegerField(validators=[MinValueValidator(1), MaxValueValidator(6)])
+    session_date = models.DateTimeField(db_index=True)
+    is_public = models.BooleanField()
+    is_open = models.BooleanField()
+    archived_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-creation_date', 'owner_id', 'session_date']
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedGameSystem(models.Model):
+    """
+    ArchivedGameSystem is a Django model storing the GameSystem rows of archived sessions.
+
+    Fields:
+    - id (BigIntegerField): The primary key the row had in the GameSystem table.
+    - session_id (ForeignKey): A many-to-one relationship with the ArchivedGameSession model.
+    - system, creation_date: Copied from GameSystem.
+
+    Meta:
+    - ordering (list): Same default ordering as GameSystem.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    session_id = models.ForeignKey(ArchivedGameSession, on_delete=models.CASCADE)
+    system = models.CharField(max_length=4, choices=GameSystem.GameSystem.choices)
+    creation_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-creation_date', 'session_id']
+
+    def __str__(self):
+        return self.system
+
+
+class ArchivedSessionCharacter(models.Model):
+    """
+    ArchivedSessionCharacter is a Django model storing the PlayerCharacter.game_session_id links
+    of archived sessions.
+
+    Fields:
+    - session_id (ForeignKey): A many-to-one relationship with the ArchivedGameSession model.
+    - character_id (ForeignKey): A many-to-one relationship with the PlayerCharacter model.
+
+    Meta:
+    - constraints (list): A character is linked to an archived session at most once.
+    """
+    session_id = models.ForeignKey(ArchivedGameSession, on_delete=models.CASCADE)
+    character_id = models.ForeignKey(PlayerCharacter, on_delete=models.CASCADE)
+
+    class Meta:
+        ordering = ['session_id', 'character_id']
+        constraints = [
+            models.UniqueConstraint(fields=['session_id', 'character_id'], name='unique_archived_session_character'),
+        ]
+
+    def __str__(self):
+        return f'{self.session_id_id}: {self.character_id_id}'
+
+
+class ArchivedSessionMessage(models.Model):
+    """
+    ArchivedSessionMessage is a Django model storing the SessionMessage log of archived sessions.
+
+    Fields:
+    - id (BigIntegerField): The primary key the message had in the SessionMessage table.
+    - session_id (ForeignKey): A many-to-one relationship with the ArchivedGameSession model.
+    - user_id (ForeignKey): The author of the message, empty once the user is deleted.
+    - body, creation_date: Copied from SessionMessage.
+
+    Meta:
+    - ordering (list): Same default ordering as SessionMessage.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    session_id = models.ForeignKey(ArchivedGameSession, on_delete=models.CASCADE)
+    user_id = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    body = models.TextField()
+    creation_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ['session_id', 'id']
+
+    def __str__(self):
+        return f'{self.session_id_id} #{self.pk}'
+
+
+class RevokedToken(models.Model):
+    """
+    RevokedToken is a Django model listing API tokens revoked before their expiry.
+
+    Tokens are validated without database access; this small list is loaded into memory by
+    GameMaster_app.tokens and refreshed every API_TOKEN_REVOCATION_REFRESH seconds.
+
+    Fields:
+    - token_id (CharField): The unique id ("jti") carried by the revoked token, or "user:<id>" revoking every
+      token of a disabled user, used as the primary key.
+    - expiry_date (DateTimeField): When the token expires anyway; expired entries are no longer loaded.
+    - creation_date (DateTimeField): A datetime field recording when the token was revoked.
+    """
+    token_id = models.CharField(max_length=32, primary_key=True)
+    expiry_date = models.DateTimeField(db_index=True)
+    creation_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-creation_date']
+
+    def __str__(self):
+        return self.token_id
+
+
+class SentReminder(models.Model):
+    """
+    SentReminder is a Django model recording reminder emails already sent for a game session.
+
+    Fields:
+    - session_id (ForeignKey): A many-to-one relationship with the GameSession model.
+    - offset_minutes (PositiveIntegerField): How many minutes before the session the reminder was due.
+    - creation_date (DateTimeField): A datetime field recording when the reminder was sent.
+
+    Meta:
+    - constraints (list): Every reminder offset is sent at most once per session.
+    """
+    session_id = models.ForeignKey(GameSession, on_delete=models.CASCADE)
+    offset_minutes = models.PositiveIntegerField()
+    creation_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-creation_date']
+        constraints = [
+            models.UniqueConstraint(fields=['session_id', 'offset_minutes'], name='unique_sent_reminder'),
+        ]
+
+    def __str__(self):
+        return f'{self.session_id_id} -{self.offset_minutes}min'
+
+
+class Job(models.Model):
+    """
+    Job is a Django model representing a unit of background work in the database-backed job queue.
+
+    Jobs are enqueued by GameMaster_app.jobs.enqueue() and claimed by the run_jobs worker command with
+    SELECT ... FOR UPDATE SKIP LOCKED, so slow work does not run inside request handlers.
+
+    Fields:
+    - name (CharField): Name of the registered task to run.
+    - payload (JSONField): Keyword arguments passed to the task.
+    - status (CharField with choices): Queued, running, done or failed.
+    - attempts (PositiveIntegerField): How many times the job was started.
+    - max_attempts (PositiveIntegerField): After this many failed attempts the job is marked as failed.
+    - run_after (DateTimeField): The job is not claimed before this date, used for retry backoff.
+    - locked_by (CharField): Id of the worker running the job.
+    - locked_date (DateTimeField): When the job was claimed.
+    - last_error (TextField): Traceback of the last failed attempt.
+    - creation_date (DateTimeField): A datetime field recording when the job was enqueued.
+    - finished_date (DateTimeField): When the job finished or finally failed.
+
+    Meta:
+    - indexes (list): An index on (status, run_after) serving the claim query.
+    """
+    class Status(models.TextChoices):
+        QUEUED = 'Queued', 'W kolejce'
+        RUNNING = 'Running', 'W trakcie'
+        DONE = 'Done', 'Zakończone'
+        FAILED = 'Failed', 'Błąd'
+
+    name = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=7, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True, default='')
+    locked_date = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    creation_date = models.DateTimeField(default=timezone.now)
+    finished_date = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+
+class SlotReservation(models.Model):
+    """
+    SlotReservation is a Django model holding a session slot for the recipient of an invitation link.
+
+    Fields:
+    - session_id (ForeignKey): A many-to-one relationship with the GameSession model.
+    - expiry_date (DateTimeField): The reservation stops counting against free slots after this date,
+      which is also when the invitation link expires.
+    - character_id (ForeignKey): The character that used the reservation, empty while it is unused.
+    - creation_date (DateTimeField): A datetime field recording when the invitation was created.
+    """
+    session_id = models.ForeignKey(GameSession, on_delete=models.CASCADE)
+    expiry_date = models.DateTimeField()
+    character_id = models.ForeignKey(PlayerCharacter, on_delete=models.SET_NULL, null=True, blank=True)
+    creation_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-creation_date']
+        indexes = [
+            models.Index(fields=['session_id', 'expiry_date'], name='reservation_session_idx'),
+        ]
 
     def __str__(self):
-        return self.character_id
+        return f'{self.session_id_id}: {self.pk}'
+
+
+class RenderedText(models.Model):
+    """
+    RenderedText is a Django model caching the sanitized HTML rendered from Markdown text, such as
+    PlayerCharacter.description.
+
+    Rows are keyed by the hash of the source text, so every version of a text is rendered once and texts shared
+    by many characters are stored once. Rows rendered by an older renderer are rendered again when read.
+
+    Fields:
+    - content_hash (CharField): The SHA-256 hex digest of the source text, used as the primary key.
+    - renderer_version (PositiveIntegerField): The GameMaster_app.richtext.RENDERER_VERSION that produced the html.
+    - html (TextField): The rendered and sanitized HTML.
+    - creation_date (DateTimeField): A datetime field recording when the text was rendered.
+    """
+    content_hash = models.CharField(max_length=64, primary_key=True)
+    renderer_version = models.PositiveIntegerField()
+    html = models.TextField()
+    creation_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-creation_date']
+
+    def __str__(self):
+        return self.content_hash
+
+
+class SessionMessage(models.Model):
+    """
+    SessionMessage is a Django model representing a chat message posted in a game session.
+
+    Messages form an append-only log per session: they are never updated or deleted one by one. They are
+    read by keyset pagination on (session_id, id), so loading the messages after a known id costs the same
+    whatever the length of the log.
+
+    Fields:
+    - session_id (ForeignKey): A many-to-one relationship with the GameSession model.
+    - user_id (ForeignKey): The author of the message, empty once the user is deleted.
+    - body (TextField): The text of the message.
+    - creation_date (DateTimeField): A datetime field recording when the message was posted.
+
+    Meta:
+    - ordering (list): Messages are ordered by session and id, which is also the posting order.
+    - indexes (list): An index on (session_id, id) serving the keyset queries.
+    """
+    session_id = models.ForeignKey(GameSession, on_delete=models.CASCADE)
+    user_id = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    body = models.TextField()
+    creation_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['session_id', 'id']
+        indexes = [
+            models.Index(fields=['session_id', 'id'], name='message_session_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.session_id_id} #{self.pk}'
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Session messages are append-only')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('Session messages are append-only')
+
+
+class DailyActivity(models.Model):
+    """
+    DailyActivity is a Django model holding the activity of one day, for the whole platform or for one
+    game master, computed by GameMaster_app.analytics from the raw tables once the day is over.
+
+    Session figures are counted per game master and in total. Characters belong to players rather than game
+    masters, so the character counts are only filled in the platform rows.
+
+    Fields:
+    - day (DateField): The day, in the TIME_ZONE of the project.
+    - owner_id (ForeignKey): The game master the row belongs to, empty for the platform total.
+    - sessions_created (PositiveIntegerField): Sessions created on the day.
+    - slots_offered (PositiveIntegerField): Slots of the sessions played on the day.
+    - slots_filled (PositiveIntegerField): Characters that joined the sessions played on the day.
+    - active_players (PositiveIntegerField): Distinct players with a character in a session played on the day.
+    - characters_created (PositiveIntegerField): Characters created on the day.
+    - characters_died (PositiveIntegerField): Characters marked dead on the day.
+
+    Meta:
+    - constraints (list): One row per day and game master, and one platform row per day.
+    """
+    day = models.DateField()
+    owner_id = models.ForeignKey(GameMaster, on_delete=models.CASCADE, null=True, blank=True)
+    sessions_created = models.PositiveIntegerField(default=0)
+    slots_offered = models.PositiveIntegerField(default=0)
+    slots_filled = models.PositiveIntegerField(default=0)
+    active_players = models.PositiveIntegerField(default=0)
+    characters_created = models.PositiveIntegerField(default=0)
+    characters_died = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['day', 'owner_id']
+        constraints = [
+            models.UniqueConstraint(fields=['owner_id', 'day'], name='unique_daily_activity'),
+            models.UniqueConstraint(fields=['day'], condition=models.Q(owner_id__isnull=True),
+                                    name='unique_daily_activity_total'),
+        ]
+
+    def __str__(self):
+        return f'{self.day} {self.owner_id_id or "total"}'
+
+
+class RollupWatermark(models.Model):
+    """
+    RollupWatermark is a Django model recording up to which day a rollup has been computed.
+
+    Fields:
+    - name (CharField): The name of the rollup, used as the primary key.
+    - day (DateField): The last day included in the rollup.
+    """
+    name = models.CharField(max_length=64, primary_key=True)
+    day = models.DateField()
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f'{self.name}: {self.day}'
+
+
+class SessionRecommendation(models.Model):
+    """
+    SessionRecommendation is a Django model holding the precomputed top upcoming sessions for a player.
+
+    Rows are rebuilt by GameMaster_app.recommendations in a periodic batch job and read with one lookup on
+    the (player_id, rank) index.
+
+    Fields:
+    - player_id (ForeignKey): A many-to-one relationship with the Player model.
+    - session_id (ForeignKey): The recommended game session.
+    - rank (PositiveIntegerField): Position of the recommendation, starting at 1.
+    - score (FloatField): Similarity of the session to the sessions the player joined before.
+    - creation_date (DateTimeField): A datetime field recording when the recommendation was computed.
+
+    Meta:
+    - constraints (list): One session per rank and player, which also indexes the lookup.
+    """
+    player_id = models.ForeignKey(Player, on_delete=models.CASCADE)
+    session_id = models.ForeignKey(GameSession, on_delete=models.CASCADE)
+    rank = models.PositiveIntegerField()
+    score = models.FloatField()
+    creation_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['player_id', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['player_id', 'rank'], name='unique_recommendation_rank'),
+        ]
+
+    def __str__(self):
+        return f'{self.player_id_id} #{self.rank}: {self.session_id_id}'
+
+
+class AccountDeletion(models.Model):
+    """
+    AccountDeletion is a Django model tracking the background deletion of a user account.
+
+    The account is disabled when the deletion is requested. GameMaster_app.accounts then deletes the rows of
+    the user from the leaves of the cascade up, in small committed batches, and deletes the user last, when
+    nothing heavy is left to cascade.
+
+    Fields:
+    - user_id (ForeignKey): The user being deleted, empty once the deletion is done.
+    - username (CharField): The username of the deleted user, kept for reference.
+    - status (CharField with choices): Queued, running or done.
+    - step (CharField): Name of the step currently being run.
+    - total_rows (PositiveIntegerField): Number of rows to delete or detach, counted when the deletion starts.
+    - deleted_rows (PositiveIntegerField): Number of rows deleted or detached so far.
+    - creation_date (DateTimeField): A datetime field recording when the deletion was requested.
+    - finished_date (DateTimeField): When the last row was deleted.
+
+    Methods:
+    - progress(): Returns the share of deleted rows, from 0 to 1.
+    """
+    class Status(models.TextChoices):
+        QUEUED = 'Queued', 'W kolejce'
+        RUNNING = 'Running', 'W trakcie'
+        DONE = 'Done', 'Zakończone'
+
+    user_id = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    username = models.CharField(max_length=150)
+    status = models.CharField(max_length=7, choices=Status.choices, default=Status.QUEUED)
+    step = models.CharField(max_length=64, blank=True, default='')
+    total_rows = models.PositiveIntegerField(default=0)
+    deleted_rows = models.PositiveIntegerField(default=0)
+    creation_date = models.DateTimeField(default=timezone.now)
+    finished_date = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-creation_date', 'id']
+
+    def __str__(self):
+        return f'{self.username}: {self.status}'
+
+    def progress(self):
+        if self.status == self.Status.DONE:
+            return 1.0
+        return min(self.deleted_rows / self.total_rows, 1.0) if self.total_rows else 0.0
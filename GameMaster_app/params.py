@@ -0,0 +1,31 @@
+"""
+Strict parsing of integer request parameters.
+
+int() accepts more than a URL or JSON client should send: Unicode digits pass str.isdigit() yet may fail int(),
+floats are truncated, and unbounded numbers reach the database, which raises OverflowError or DataError on
+its integer columns. parse_int() accepts an optional minus sign and ASCII digits (or a JSON integer) within
+bounds only, and raises ValueError for everything else, so views answer such input with 400.
+"""
+import re
+
+# Ranges of the BigAutoField primary keys and of the IntegerField / PositiveIntegerField columns.
+MAX_ID = 2 ** 63 - 1
+MAX_INTEGER = 2 ** 31 - 1
+
+INTEGER = re.compile(r'-?[0-9]+')
+
+
+def parse_int(value, minimum=0, maximum=MAX_ID):
+    """
+    Returns `value`, a string of ASCII digits or an int, as an int between `minimum` and `maximum`.
+    Raises ValueError otherwise.
+    """
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        raise ValueError(f'Expected an integer, got {value!r}')
+    if isinstance(value, str):
+        if not INTEGER.fullmatch(value):
+            raise ValueError(f'Expected an integer, got {value!r}')
+        value = int(value)
+    if not minimum <= value <= maximum:
+        raise ValueError('Value out of range')
+    return value
@@ -0,0 +1,87 @@
+"""
+Party-wide game master actions.
+
+Effects such as damage, healing, gold or reputation are applied to every living character of a session
+with one set-based UPDATE statement. Every value is clamped to the bounds of its model field, i.e.
+LEAST(GREATEST(x + delta, lo), hi), so the validators of CharacterSheet hold without per-object save() calls.
+"""
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, transaction
+from django.db.backends.base.operations import BaseDatabaseOperations
+from django.db.models import F, Value
+from django.db.models.functions import Cast, Greatest, Least
+
+from .models import CharacterSheet, CharacterSheetEvent, PlayerCharacter
+
+PARTY_EFFECT_FIELDS = ['life_points', 'wealth', 'reputation']
+
+
+def field_bounds(model, name):
+    """
+    Returns the (lowest, highest) value allowed by the column type and the validators of an integer field.
+    """
+    field = model._meta.get_field(name)
+    low, high = BaseDatabaseOperations.integer_field_ranges[field.get_internal_type()]
+    for validator in field.validators:
+        if isinstance(validator, MinValueValidator):
+            low = max(low, validator.limit_value)
+        elif isinstance(validator, MaxValueValidator):
+            high = min(high, validator.limit_value)
+    return low, high
+
+
+def max_delta(model, name):
+    """
+    Returns the largest meaningful change of a field: any larger delta is clamped to the same bound anyway.
+    """
+    low, high = field_bounds(model, name)
+    return high - low
+
+
+def clamped_increment(model, name, delta):
+    """
+    Builds the LEAST(GREATEST(x + delta, lo), hi) expression for a field. The addition is done on a
+    bigint so that it cannot overflow the column type before clamping.
+    """
+    low, high = field_bounds(model, name)
+    expression = Cast(F(name), models.BigIntegerField()) + Value(int(delta))
+    return Least(Greatest(expression, Value(low)), Value(high))
+
+
+def party_sheets(session):
+    return CharacterSheet.objects.filter(
+        character_id__game_session_id=session,
+        character_id__character_status=PlayerCharacter.CharacterStatus.ALIVE,
+    )
+
+
+def apply_party_effect(session, changed_by=None, **deltas):
+    """
+    Adds the given deltas, e.g. life_points=-5, wealth=100, to all living characters of the session.
+
+    The affected rows are locked and read once for the change log, updated with a single UPDATE and read
+    again to log the clamped results. Returns the number of updated character sheets.
+    """
+    unknown = set(deltas) - set(PARTY_EFFECT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported party effect: {', '.join(sorted(unknown))}")
+    deltas = {name: int(delta) for name, delta in deltas.items() if delta}
+    if not deltas:
+        return 0
+    fields = CharacterSheet.HISTORY_FIELDS
+    with transaction.atomic():
+        before = {
+            row['pk']: row for row in party_sheets(session)
+            .select_for_update(of=('self',)).order_by('pk').values('pk', *fields)
+        }
+        if not before:
+            return 0
+        updated = CharacterSheet.objects.filter(pk__in=before).update(**{
+            name: clamped_increment(CharacterSheet, name, delta) for name, delta in deltas.items()
+        })
+        after = {
+            row.pop('pk'): row for row in CharacterSheet.objects.filter(pk__in=before)
+            .order_by().values('pk', *fields)
+        }
+        CharacterSheetEvent.record_bulk(before, after, changed_by)
+    return updated
@@ -0,0 +1,93 @@
+"""
+Personal data export: everything tied to a user account, as one JSON document.
+
+The document is an object with the account, the game master and player profiles, and one array per kind of
+row: owned sessions and their systems, characters and their sheets, session memberships of the characters,
+posted messages, the same rows of archived sessions, and the sheet changes made by the user. Arrays are read
+with iterator(chunk_size=PERSONAL_DATA_CHUNK_SIZE) and written as they are read, so the export takes the same
+memory whatever the number of rows of the user.
+"""
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import (ArchivedGameSession, ArchivedGameSystem, ArchivedSessionCharacter, ArchivedSessionMessage,
+                     CharacterSheet, CharacterSheetEvent, GameMaster, GameSession, GameSystem, Player, PlayerCharacter,
+                     SessionMessage)
+
+USER_FIELDS = ['username', 'email', 'first_name', 'last_name', 'date_joined', 'last_login']
+GAME_MASTER_FIELDS = ['user_nickname', 'is_game_master', 'creation_date']
+PLAYER_FIELDS = ['player_nickname', 'is_player', 'creation_date']
+SESSION_FIELDS = ['id', 'title', 'slots', 'session_date', 'is_public', 'is_open', 'creation_date']
+SYSTEM_FIELDS = ['id', 'session_id', 'system', 'creation_date']
+CHARACTER_FIELDS = ['id', 'name', 'description', 'character_status', 'death_date', 'creation_date']
+SHEET_FIELDS = ['character_id'] + CharacterSheet.HISTORY_FIELDS
+MEMBERSHIP_FIELDS = ['playercharacter_id', 'gamesession_id', 'gamesession_id__title', 'gamesession_id__session_date']
+MESSAGE_FIELDS = ['id', 'session_id', 'body', 'creation_date']
+ARCHIVED_MEMBERSHIP_FIELDS = ['character_id', 'session_id', 'session_id__title', 'session_id__session_date']
+SHEET_EVENT_FIELDS = ['id', 'sheet_id', 'sequence', 'changes', 'creation_date']
+
+
+def _dumps(value):
+    return json.dumps(value, cls=DjangoJSONEncoder)
+
+
+def personal_data_rows(user):
+    """
+    Returns (array name, iterator of row dicts) pairs with the rows tied to the user.
+    """
+    chunk_size = settings.PERSONAL_DATA_CHUNK_SIZE
+    characters = PlayerCharacter.objects.filter(owner_id__user_id=user)
+    links = PlayerCharacter.game_session_id.through.objects.filter(playercharacter_id__owner_id__user_id=user)
+    return [
+        ('sessions', GameSession.objects.filter(owner_id__user_id=user).order_by('pk')
+         .values(*SESSION_FIELDS).iterator(chunk_size=chunk_size)),
+        ('systems', GameSystem.objects.filter(session_id__owner_id__user_id=user).order_by('pk')
+         .values(*SYSTEM_FIELDS).iterator(chunk_size=chunk_size)),
+        ('characters', characters.order_by('pk').values(*CHARACTER_FIELDS).iterator(chunk_size=chunk_size)),
+        ('sheets', CharacterSheet.objects.filter(character_id__owner_id__user_id=user).order_by('pk')
+         .values(*SHEET_FIELDS).iterator(chunk_size=chunk_size)),
+        ('memberships', links.order_by('pk').values(*MEMBERSHIP_FIELDS).iterator(chunk_size=chunk_size)),
+        ('messages', SessionMessage.objects.filter(user_id=user).order_by('pk')
+         .values(*MESSAGE_FIELDS).iterator(chunk_size=chunk_size)),
+        ('archived_sessions', ArchivedGameSession.objects.filter(owner_id__user_id=user).order_by('pk')
+         .values(*SESSION_FIELDS).iterator(chunk_size=chunk_size)),
+        ('archived_systems', ArchivedGameSystem.objects.filter(session_id__owner_id__user_id=user).order_by('pk')
+         .values(*SYSTEM_FIELDS).iterator(chunk_size=chunk_size)),
+        ('archived_memberships', ArchivedSessionCharacter.objects.filter(character_id__owner_id__user_id=user)
+         .order_by('pk').values(*ARCHIVED_MEMBERSHIP_FIELDS).iterator(chunk_size=chunk_size)),
+        ('archived_messages', ArchivedSessionMessage.objects.filter(user_id=user).order_by('pk')
+         .values(*MESSAGE_FIELDS).iterator(chunk_size=chunk_size)),
+        ('sheet_events', CharacterSheetEvent.objects.filter(user_id=user).order_by('pk')
+         .values(*SHEET_EVENT_FIELDS).iterator(chunk_size=chunk_size)),
+    ]
+
+
+def _json_array(rows):
+    """
+    Yields a JSON array of the rows, one string per PERSONAL_DATA_CHUNK_SIZE rows.
+    """
+    separator = '['
+    while True:
+        chunk = list(islice(rows, settings.PERSONAL_DATA_CHUNK_SIZE))
+        if not chunk:
+            break
+        yield separator + ','.join(_dumps(row) for row in chunk)
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+def export_personal_data(user):
+    """
+    Yields the JSON document with the personal data of the user, piece by piece.
+    """
+    account = {field: getattr(user, field) for field in USER_FIELDS}
+    game_master = GameMaster.objects.filter(user_id=user).values(*GAME_MASTER_FIELDS).first()
+    player = Player.objects.filter(user_id=user).values(*PLAYER_FIELDS).first()
+    yield f'{{"user":{_dumps(account)},"game_master":{_dumps(game_master)},"player":{_dumps(player)}'
+    for name, rows in personal_data_rows(user):
+        yield f',"{name}":'
+        yield from _json_array(rows)
+    yield '}'
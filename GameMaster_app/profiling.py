@@ -0,0 +1,205 @@
+"""
+On-demand request profiling for staff.
+
+A staff request carrying the X-Profile header or the _profile query parameter is run under a profiler by
+ProfilingMiddleware, listed right after the authentication middleware so the profile covers the remaining
+middleware, the view and template rendering. The value selects the profiler:
+- 'cprofile' (default): deterministic cProfile, stored as a pstats dump (.prof) for snakeviz or flameprof,
+- 'sample': a sampling thread recording the stack every PROFILE_SAMPLE_INTERVAL seconds, stored as folded
+  stacks (.folded) for flamegraph.pl or speedscope.
+
+Profiles are kept in a ring of the last PROFILE_RING_SIZE profiles, in memory or, with PROFILE_DIR set, in a
+directory shared by all worker processes. Requests of other users are never profiled, so they cannot hold the
+profiler, and requests without the header or parameter only pay for one dictionary lookup and one substring test.
+"""
+import cProfile
+import io
+import json
+import marshal
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_PARAM = '_profile'
+MODES = ('cprofile', 'sample')
+EXTENSIONS = {'cprofile': 'prof', 'sample': 'folded'}
+
+# cProfile hooks are process-wide from Python 3.12 on, so one request is profiled at a time per process.
+_profiling = threading.Lock()
+
+
+def requested_mode(request):
+    """
+    Returns the profiler requested by the header or query parameter of a staff user, or None.
+    """
+    mode = request.META.get(PROFILE_HEADER)
+    if mode is None and PROFILE_PARAM in request.META.get('QUERY_STRING', ''):
+        mode = request.GET.get(PROFILE_PARAM)
+    user = getattr(request, 'user', None)
+    if mode is None or user is None or not user.is_staff:
+        return None
+    return mode if mode in MODES else MODES[0]
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread from a background thread and counts the folded stacks.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if frames:
+                self.stacks[';'.join(reversed(frames))] += 1
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def folded(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def run_profiled(mode, get_response, request):
+    """
+    Runs the request under the profiler and returns (response, profile data, text summary).
+    """
+    if mode == 'sample':
+        with StackSampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL) as sampler:
+            response = get_response(request)
+        summary = ''.join(f'{count:6} {stack.rsplit(";", 1)[-1]}\n'
+                          for stack, count in sampler.stacks.most_common(40))
+        return response, sampler.folded().encode(), summary
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        response = get_response(request)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    # Dumped before pstats.Stats(), which takes the stats over from the profiler.
+    data = marshal.dumps(profiler.stats)
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(40)
+    return response, data, output.getvalue()
+
+
+class ProfileStore:
+    """
+    Ring of the last PROFILE_RING_SIZE profiles, kept in memory or in PROFILE_DIR as <id>.json metadata and
+    data files.
+    """
+
+    def __init__(self):
+        self.profiles = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, meta, data):
+        size = settings.PROFILE_RING_SIZE
+        directory = settings.PROFILE_DIR
+        if directory:
+            directory = Path(directory)
+            directory.mkdir(parents=True, exist_ok=True)
+            (directory / meta['filename']).write_bytes(data)
+            (directory / f"{meta['id']}.json").write_text(json.dumps(meta, default=str))
+            for old in self.list()[size:]:
+                for path in directory.glob(f"{old['id']}.*"):
+                    path.unlink(missing_ok=True)
+            return
+        with self.lock:
+            self.profiles[meta['id']] = (meta, data)
+            while len(self.profiles) > size:
+                self.profiles.popitem(last=False)
+
+    def list(self):
+        """
+        Returns the metadata of stored profiles, newest first.
+        """
+        directory = settings.PROFILE_DIR
+        if not directory:
+            with self.lock:
+                return [meta for meta, _ in reversed(self.profiles.values())]
+        profiles = []
+        for path in Path(directory).glob('*.json'):
+            try:
+                meta = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            meta['date'] = parse_datetime(meta['date'])
+            profiles.append(meta)
+        return sorted(profiles, key=lambda meta: meta['date'], reverse=True)
+
+    def get(self, profile_id):
+        """
+        Returns (metadata, data) of a profile, or None.
+        """
+        directory = settings.PROFILE_DIR
+        if not directory:
+            with self.lock:
+                return self.profiles.get(profile_id)
+        meta = next((meta for meta in self.list() if meta['id'] == profile_id), None)
+        if meta is None:
+            return None
+        try:
+            return meta, (Path(directory) / meta['filename']).read_bytes()
+        except OSError:
+            return None
+
+
+profile_store = ProfileStore()
+
+
+def profile_request(mode, get_response, request):
+    """
+    Profiles the request of a staff user and stores the profile.
+    """
+    if not _profiling.acquire(blocking=False):
+        return get_response(request)
+    try:
+        started = time.perf_counter()
+        response, data, summary = run_profiled(mode, get_response, request)
+        duration = time.perf_counter() - started
+    finally:
+        _profiling.release()
+    profile_id = uuid.uuid4().hex
+    match = getattr(request, 'resolver_match', None)
+    profile_store.add({
+        'id': profile_id,
+        'date': timezone.now(),
+        'mode': mode,
+        'method': request.method,
+        'path': request.path,
+        'view': match.url_name if match else None,
+        'user': request.user.get_username(),
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 1),
+        'filename': f'{profile_id}.{EXTENSIONS[mode]}',
+        'summary': summary,
+    }, data)
+    response['X-Profile-Id'] = profile_id
+    return response
@@ -0,0 +1,93 @@
+"""
+Cache-backed rate limiting.
+
+Limits are configured per scope in the RATE_LIMITS setting as {key: (limit, period in seconds)}, where the key
+says what is counted:
+- 'ip': the client address,
+- 'user': the logged-in user, or the address for anonymous requests,
+- 'username': the username posted to a login form, so credential stuffing against one account is slowed
+  down whatever addresses it comes from.
+
+Requests are counted with a sliding window approximated from two fixed-window counters in the cache, so
+limits are shared by all workers when the cache is (Memcached, Redis). Rejected requests get 429 with a
+Retry-After header before the view does any expensive work, such as password hashing.
+"""
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+KEY_PREFIX = 'ratelimit'
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def identifier(request, key):
+    if key == 'ip':
+        return client_ip(request)
+    if key == 'user':
+        if request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return client_ip(request)
+    if key == 'username':
+        return request.POST.get('username', '').strip().lower()
+    raise ValueError(f'Unknown rate limit key: {key}')
+
+
+def hit(scope, key, value, limit, period, now=None):
+    """
+    Counts one request and returns 0 when it is allowed, or the number of seconds to wait otherwise.
+
+    The estimate is previous_window * (time left in the current window / period) + current_window.
+    """
+    now = time.time() if now is None else now
+    window = int(now // period)
+    digest = hashlib.sha256(value.encode()).hexdigest()[:32]
+    current_key = f'{KEY_PREFIX}:{scope}:{key}:{digest}:{window}'
+    previous_key = f'{KEY_PREFIX}:{scope}:{key}:{digest}:{window - 1}'
+    cache.add(current_key, 0, timeout=2 * period)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:
+        cache.set(current_key, 1, timeout=2 * period)
+        current = 1
+    previous = cache.get(previous_key, 0)
+    elapsed = now - window * period
+    estimate = previous * (period - elapsed) / period + current
+    if estimate <= limit:
+        return 0
+    # Wait until one more request fits, i.e. until the weighted older counter has decayed enough.
+    if current >= limit:
+        return max(1, math.ceil(period - elapsed + period * (1 - (limit - 1) / current)))
+    return max(1, math.ceil(period * (1 - (limit - current - 1) / previous) - elapsed))
+
+
+def rate_limited_response(retry_after):
+    response = HttpResponse('Zbyt wiele prób, spróbuj ponownie później', status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limit(scope):
+    """
+    Decorates a view function, or with method_decorator a view method, with the limits of RATE_LIMITS[scope].
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            retry_after = 0
+            for key, (limit, period) in settings.RATE_LIMITS.get(scope, {}).items():
+                value = identifier(request, key)
+                if value:
+                    retry_after = max(retry_after, hit(scope, key, value, limit, period))
+            if retry_after:
+                return rate_limited_response(retry_after)
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -0,0 +1,212 @@
+"""
+Precomputed session recommendations for players.
+
+The features are the game systems and the game masters of the upcoming open public sessions (the candidates).
+Every player is described by how often they joined past sessions with each feature, through the characters
+in PlayerCharacter.game_session_id and in the ArchivedSessionCharacter links of archived sessions, and every
+candidate by its own features. The score of a candidate for a
+player is the product of the L2-normalized player row and the candidate row.
+
+The history is aggregated by the database into (player, feature, count) triples, held in three NumPy integer
+arrays sorted by player once, so every block of RECOMMENDATIONS_PLAYER_CHUNK players is a slice of them. Game
+system features are scored with a small dense product; a game master feature adds its count to the candidates
+of that game master only, so no matrix ever has a column per game master. Memory grows with the number of
+distinct (player, feature) pairs of the history, and with one block of players × candidates scores. The top
+RECOMMENDATIONS_TOP_K candidates of each player are stored in SessionRecommendation and served with a single
+indexed query.
+"""
+from itertools import chain
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .bulk import bulk_create
+from .models import ArchivedSessionCharacter, GameSession, GameSystem, PlayerCharacter, SessionRecommendation
+
+LINKS = PlayerCharacter.game_session_id.through
+
+
+def candidate_sessions(now=None):
+    now = timezone.now() if now is None else now
+    return GameSession.objects.filter(is_open=True, is_public=True, session_date__gt=now)
+
+
+SYSTEMS = [choice for choice, _ in GameSystem.GameSystem.choices]
+
+
+def build_candidates(candidates):
+    """
+    Returns (session ids, game master ids, index of the game master of every session, session × system matrix)
+    for the candidate sessions.
+    """
+    sessions = np.array(list(candidates.order_by('pk').values_list('pk', 'owner_id')), dtype=np.int64).reshape(-1, 2)
+    session_ids = sessions[:, 0]
+    gm_ids, session_gms = np.unique(sessions[:, 1], return_inverse=True)
+    systems = np.zeros((len(session_ids), len(SYSTEMS)), dtype=np.float32)
+    columns = {system: column for column, system in enumerate(SYSTEMS)}
+    for session, system in GameSystem.objects.filter(session_id__in=candidates).values_list('session_id', 'system'):
+        systems[np.searchsorted(session_ids, session), columns[system]] = 1
+    return session_ids, gm_ids, session_gms, systems
+
+
+def link_pairs(links, player, session, system, gm_ids, now):
+    """
+    Returns a (player id, feature column, count) array of the past sessions of the `links` queryset, whose
+    `player`, `session` and `system` lookups lead to the player, the session and its game systems.
+    """
+    chunk_size = settings.RECOMMENDATIONS_PLAYER_CHUNK
+    past = links.filter(**{f'{session}__session_date__lte': now}).order_by()
+    by_gm = (past.filter(**{f'{session}__owner_id__in': gm_ids.tolist()})
+             .values(player, f'{session}__owner_id').annotate(count=Count('pk'))
+             .values_list(player, f'{session}__owner_id', 'count'))
+    gms = np.fromiter(chain.from_iterable(by_gm.iterator(chunk_size=chunk_size)), dtype=np.int64).reshape(-1, 3)
+    gms[:, 1] = len(SYSTEMS) + np.searchsorted(gm_ids, gms[:, 1])
+    columns = {system: column for column, system in enumerate(SYSTEMS)}
+    by_system = (past.filter(**{f'{system}__isnull': False})
+                 .values(player, system).annotate(count=Count('pk'))
+                 .values_list(player, system, 'count'))
+    systems = np.fromiter(chain.from_iterable((player, columns[system], count) for player, system, count
+                                              in by_system.iterator(chunk_size=chunk_size)),
+                          dtype=np.int64).reshape(-1, 3)
+    return np.concatenate([gms, systems])
+
+
+def history_pairs(gm_ids, now=None):
+    """
+    Returns arrays (player ids, feature columns, counts), sorted by player, with how many past sessions of every
+    feature each player joined, archived sessions included. Columns below len(SYSTEMS) are game systems, the
+    others index `gm_ids`.
+    """
+    now = timezone.now() if now is None else now
+    pairs = np.concatenate([
+        link_pairs(LINKS.objects, 'playercharacter_id__owner_id', 'gamesession_id',
+                   'gamesession_id__gamesystem__system', gm_ids, now),
+        link_pairs(ArchivedSessionCharacter.objects, 'character_id__owner_id', 'session_id',
+                   'session_id__archivedgamesystem__system', gm_ids, now),
+    ])
+    # A player with live and archived sessions of a feature gets one pair with the summed count.
+    keys, inverse = np.unique(pairs[:, :2], axis=0, return_inverse=True)
+    counts = np.zeros(len(keys), dtype=np.int64)
+    np.add.at(counts, inverse.reshape(-1), pairs[:, 2])
+    return keys[:, 0], keys[:, 1], counts
+
+
+def joined_pairs(candidates):
+    """
+    Returns (player ids, candidate session ids), sorted by player, of candidates the players have already joined.
+    """
+    pairs = LINKS.objects.filter(gamesession_id__in=candidates).values_list('playercharacter_id__owner_id',
+                                                                             'gamesession_id')
+    pairs = np.array(list(pairs), dtype=np.int64).reshape(-1, 2)
+    pairs = pairs[np.argsort(pairs[:, 0], kind='stable')]
+    return pairs[:, 0], pairs[:, 1]
+
+
+def top_k(scores, k):
+    """
+    Returns, for every row of scores, the column indexes of its k highest scores in descending order.
+    """
+    k = min(k, scores.shape[1])
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, best, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(best, order, axis=1)
+
+
+def gm_sessions(session_gms):
+    """
+    Returns (candidate columns grouped by game master, start of every group, size of every group).
+    """
+    order = np.argsort(session_gms, kind='stable')
+    sizes = np.bincount(session_gms)
+    return order, np.cumsum(sizes) - sizes, sizes
+
+
+def add_gm_scores(scores, rows, gms, counts, grouped):
+    """
+    Adds the count of every (row, game master) pair to the scores of the candidates of that game master.
+    """
+    order, starts, sizes = grouped
+    repeats = sizes[gms]
+    offsets = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    columns = order[np.repeat(starts[gms], repeats) + offsets]
+    np.add.at(scores, (np.repeat(rows, repeats), columns), np.repeat(counts, repeats).astype(np.float32))
+
+
+def score_players(now=None):
+    """
+    Yields (player id, [(session id, score), ...]) with the best positive-scored candidates of every player.
+    """
+    candidates = candidate_sessions(now)
+    session_ids, gm_ids, session_gms, systems = build_candidates(candidates)
+    if not len(session_ids):
+        return
+    players, columns, counts = history_pairs(gm_ids, now)
+    if not len(players):
+        return
+    player_ids, first_pairs = np.unique(players, return_index=True)
+    first_pairs = np.append(first_pairs, len(players))
+    joined_players, joined_sessions = joined_pairs(candidates)
+    known = np.isin(joined_players, player_ids)
+    joined_players, joined_sessions = joined_players[known], joined_sessions[known]
+    grouped = gm_sessions(session_gms)
+    chunk = settings.RECOMMENDATIONS_PLAYER_CHUNK
+    top = settings.RECOMMENDATIONS_TOP_K
+    for start in range(0, len(player_ids), chunk):
+        stop = min(start + chunk, len(player_ids))
+        pairs = slice(first_pairs[start], first_pairs[stop])
+        rows = np.repeat(np.arange(stop - start), np.diff(first_pairs[start:stop + 1]))
+        block_columns, block_counts = columns[pairs], counts[pairs]
+        norms = np.zeros(stop - start, dtype=np.float32)
+        np.add.at(norms, rows, block_counts.astype(np.float32) ** 2)
+        is_system = block_columns < len(SYSTEMS)
+        block = np.zeros((stop - start, len(SYSTEMS)), dtype=np.float32)
+        np.add.at(block, (rows[is_system], block_columns[is_system]), block_counts[is_system])
+        scores = block @ systems.T
+        add_gm_scores(scores, rows[~is_system], block_columns[~is_system] - len(SYSTEMS), block_counts[~is_system],
+                      grouped)
+        scores /= np.maximum(np.sqrt(norms), 1e-9)[:, None]
+        in_block = slice(np.searchsorted(joined_players, player_ids[start]),
+                         np.searchsorted(joined_players, player_ids[stop - 1], side='right'))
+        scores[np.searchsorted(player_ids[start:stop], joined_players[in_block]),
+               np.searchsorted(session_ids, joined_sessions[in_block])] = -np.inf
+        best = top_k(scores, top)
+        for offset, player in enumerate(player_ids[start:stop].tolist()):
+            picks = [(int(session_ids[column]), float(scores[offset, column])) for column in best[offset]
+                     if scores[offset, column] > 0]
+            if picks:
+                yield player, picks
+
+
+def update_recommendations(now=None):
+    """
+    Replaces all stored recommendations with freshly computed ones. Returns the number of stored rows.
+    """
+    created = timezone.now()
+    stored = 0
+    with transaction.atomic():
+        SessionRecommendation.objects.all().delete()
+        batch = []
+        for player, picks in score_players(now):
+            batch.extend(SessionRecommendation(player_id_id=player, session_id_id=session, rank=rank, score=score,
+                                               creation_date=created)
+                         for rank, (session, score) in enumerate(picks, start=1))
+            if len(batch) >= settings.RECOMMENDATIONS_PLAYER_CHUNK:
+                stored += len(bulk_create(SessionRecommendation, batch))
+                batch = []
+        stored += len(bulk_create(SessionRecommendation, batch))
+    return stored
+
+
+def recommended_sessions(user, limit=None):
+    """
+    Returns the recommended sessions of the user's player profile, still open and public, best first.
+    """
+    # Player profiles share the primary key of their user, so the lookup needs no join with Player.
+    recommendations = (SessionRecommendation.objects
+                       .filter(player_id=user.pk, session_id__is_open=True, session_id__is_public=True,
+                               session_id__session_date__gt=timezone.now())
+                       .select_related('session_id').order_by('rank'))[:limit or settings.RECOMMENDATIONS_TOP_K]
+    return [recommendation.session_id for recommendation in recommendations]
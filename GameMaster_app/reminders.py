@@ -0,0 +1,177 @@
+"""
+Session reminder dispatcher.
+
+A long-running ReminderDispatcher keeps a min-heap of (due date, session, offset) entries. Every load runs
+one indexed session_date range query per reminder offset over the next stretch of time, from the previous
+run on, so sessions created or moved into an already loaded stretch by other processes are picked up on the
+next run. Due reminders are popped together and their emails are sent in batches of REMINDER_EMAIL_BATCH_SIZE
+over a single email connection, so any Django email backend (SMTP, console or locmem in tests) can be used.
+When a batch cannot be sent its reminders go back into the heap and are retried after REMINDER_RETRY_DELAY
+seconds; SentReminder rows are stored for delivered batches only.
+"""
+import heapq
+import logging
+import smtplib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import GameSession, PlayerCharacter, SentReminder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOOKAHEAD = timedelta(minutes=10)
+MAX_SLEEP = 60
+
+
+class ReminderDispatcher:
+    """
+    Schedules and sends session reminders.
+
+    Attributes:
+    - offsets (list): Reminder offsets in minutes before session_date.
+    - lookahead (timedelta): How far ahead of now reminders are loaded into the heap.
+    - heap (list): Min-heap of (due date, session id, offset in minutes) entries.
+    - scanned_from (datetime): Reminders due before this date are already in the heap or sent.
+    - loaded_until (datetime): Reminders due before this date have been loaded at least once.
+    - retry_after (datetime): After a failed delivery, no reminder is sent before this date.
+
+    Methods:
+    - load(now): Loads reminders due after the previous run up to now + lookahead, one range query per offset.
+    - pop_due(now): Removes and returns the entries that are due.
+    - send(entries, now): Emails the game masters and players of the due reminders in batches and puts the
+      entries of failed batches back.
+    - run_once(now): Loads, pops and sends; returns the number of sent emails.
+    - run_forever(): Calls run_once() and sleeps until the next reminder or load.
+    """
+
+    def __init__(self, offsets=None, lookahead=DEFAULT_LOOKAHEAD, start=None):
+        self.offsets = sorted(set(offsets if offsets is not None else settings.SESSION_REMINDER_OFFSETS))
+        self.lookahead = lookahead
+        self.heap = []
+        self.queued = set()
+        self.scanned_from = self.loaded_until = start or timezone.now()
+        self.retry_after = None
+
+    def push(self, entry):
+        if entry not in self.queued:
+            self.queued.add(entry)
+            heapq.heappush(self.heap, entry)
+            return True
+        return False
+
+    def load(self, now):
+        until = now + self.lookahead
+        loaded = 0
+        for offset in self.offsets:
+            delta = timedelta(minutes=offset)
+            sessions = GameSession.objects.filter(
+                session_date__gt=self.scanned_from + delta,
+                session_date__lte=until + delta,
+            ).order_by().values_list('pk', 'session_date')
+            # Entries of moved sessions stay in the heap and are skipped by build_messages().
+            loaded += sum(self.push((session_date - delta, pk, offset)) for pk, session_date in sessions)
+        self.scanned_from = max(self.scanned_from, now)
+        self.loaded_until = max(self.loaded_until, until)
+        return loaded
+
+    def pop_due(self, now):
+        due = []
+        if self.retry_after is not None and now < self.retry_after:
+            return due
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            self.queued.discard(entry)
+            due.append(entry)
+        return due
+
+    def next_wakeup(self, now):
+        wakeup = self.loaded_until
+        if self.heap:
+            wakeup = min(wakeup, max(self.heap[0][0], self.retry_after or self.heap[0][0]))
+        return max(0.0, min((wakeup - now).total_seconds(), MAX_SLEEP))
+
+    def build_messages(self, entries):
+        """
+        Builds the reminder emails for due entries with three queries: the sessions, the reminders already
+        sent, and the emails of all players of these sessions. Entries whose session was moved or deleted
+        since they were loaded are skipped.
+
+        Returns (messages, delivered): (entry, EmailMessage) pairs, and SentReminder rows of the entries
+        without recipients, which are done without sending anything.
+        """
+        session_ids = {pk for _, pk, _ in entries}
+        sessions = {
+            session['pk']: session for session in GameSession.objects.filter(pk__in=session_ids)
+            .order_by().values('pk', 'title', 'session_date', email=F('owner_id__user_id__email'))
+        }
+        sent = set(SentReminder.objects.filter(session_id__in=session_ids)
+                   .values_list('session_id', 'offset_minutes'))
+        players = {}
+        links = PlayerCharacter.game_session_id.through.objects.filter(gamesession_id__in=session_ids)
+        for session_id, email in links.values_list('gamesession_id', 'playercharacter__owner_id__user_id__email'):
+            players.setdefault(session_id, set()).add(email)
+        messages, delivered = [], []
+        for due, pk, offset in entries:
+            session = sessions.get(pk)
+            if session is None or (pk, offset) in sent:
+                continue
+            if session['session_date'] - timedelta(minutes=offset) != due:
+                continue
+            recipients = sorted(email for email in {session['email'], *players.get(pk, ())} if email)
+            if not recipients:
+                delivered.append(SentReminder(session_id_id=pk, offset_minutes=offset))
+                continue
+            local_date = timezone.localtime(session['session_date'])
+            messages.append(((due, pk, offset), EmailMessage(
+                subject=f"Przypomnienie: {session['title']}",
+                body=f"Sesja {session['title']} rozpocznie się {local_date:%Y-%m-%d %H:%M}.",
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                bcc=recipients,
+            )))
+        return messages, delivered
+
+    def send(self, entries, now=None):
+        messages, delivered = self.build_messages(entries)
+        sent = 0
+        failed = []
+        pending = messages
+        batch_size = settings.REMINDER_EMAIL_BATCH_SIZE
+        try:
+            if pending:
+                with get_connection() as connection:
+                    while pending:
+                        batch, pending = pending[:batch_size], pending[batch_size:]
+                        try:
+                            sent += connection.send_messages([message for _, message in batch]) or 0
+                        except (smtplib.SMTPException, OSError):
+                            logger.exception('Sending %s reminders failed', len(batch))
+                            failed.extend(batch)
+                            continue
+                        delivered.extend(SentReminder(session_id_id=pk, offset_minutes=offset)
+                                         for (_, pk, offset), _ in batch)
+        except (smtplib.SMTPException, OSError):
+            # The connection could not be opened: nothing left in pending was sent.
+            logger.exception('Cannot connect to send %s reminders', len(pending))
+            failed.extend(pending)
+        SentReminder.objects.bulk_create(delivered, ignore_conflicts=True)
+        for entry, _ in failed:
+            self.push(entry)
+        if failed:
+            self.retry_after = (now or timezone.now()) + timedelta(seconds=settings.REMINDER_RETRY_DELAY)
+        return sent
+
+    def run_once(self, now=None):
+        now = now or timezone.now()
+        self.load(now)
+        due = self.pop_due(now)
+        return self.send(due, now) if due else 0
+
+    def run_forever(self, sleep=time.sleep):
+        while True:
+            self.run_once()
+            sleep(self.next_wakeup(timezone.now()))
@@ -0,0 +1,63 @@
+"""
+Markdown rendering of user-written texts, such as character backstories.
+
+Markdown is rendered with python-markdown and sanitized with nh3, which keeps only the tags and attributes
+listed below. The HTML is stored in RenderedText under the SHA-256 hash of the source text, so a text is
+rendered once per version instead of on every page view, and pages listing many characters load all their
+descriptions with one query. Bump RENDERER_VERSION when the rendering changes; stored HTML of older versions
+is rendered again when it is next read.
+"""
+import hashlib
+
+import markdown
+import nh3
+from django.utils.safestring import mark_safe
+
+from .models import RenderedText
+
+RENDERER_VERSION = 1
+
+ALLOWED_TAGS = {
+    'p', 'br', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'strong', 'em', 'del', 'blockquote', 'code', 'pre',
+    'ul', 'ol', 'li', 'dl', 'dt', 'dd', 'a', 'table', 'thead', 'tbody', 'tr', 'th', 'td', 'abbr', 'sup', 'sub',
+}
+ALLOWED_ATTRIBUTES = {'a': {'href', 'title'}, 'abbr': {'title'}, 'th': {'align'}, 'td': {'align'}}
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def render_markdown(text):
+    """
+    Renders Markdown text to sanitized HTML, without caching.
+    """
+    html = markdown.markdown(text, extensions=['extra', 'sane_lists'], output_format='html')
+    return nh3.clean(html, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES,
+                     url_schemes={'http', 'https', 'mailto'}, link_rel='noopener noreferrer nofollow')
+
+
+def rendered_html_many(texts):
+    """
+    Returns {text: safe HTML} for the texts, loading stored renderings with one query and rendering the
+    missing or outdated ones.
+    """
+    hashes = {content_hash(text): text for text in texts}
+    stored = RenderedText.objects.filter(pk__in=hashes).values_list('pk', 'renderer_version', 'html')
+    html = {hashes[pk]: rendered for pk, version, rendered in stored if version == RENDERER_VERSION}
+    for digest, text in hashes.items():
+        if text in html:
+            continue
+        html[text] = render_markdown(text)
+        RenderedText.objects.update_or_create(
+            pk=digest, defaults={'renderer_version': RENDERER_VERSION, 'html': html[text]})
+    return {text: mark_safe(rendered) for text, rendered in html.items()}
+
+
+def rendered_html(text):
+    """
+    Returns the safe HTML of one text.
+    """
+    if not text:
+        return mark_safe('')
+    return rendered_html_many([text])[text]
@@ -0,0 +1,165 @@
+"""
+Month and week calendars of game sessions.
+
+A calendar grid is built from one query over the indexed session_date column for the whole range shown, plus
+one over the archived sessions when the range starts before the newest archived session, and the sessions
+are bucketed by their date in the user's timezone in memory. Rendered grids are cached under
+the versions of the UTC months they cover; saving, deleting or joining a session bumps the version of its
+month (see signals.py), so only the grids showing that month are rendered again.
+"""
+import calendar
+import time
+import zoneinfo
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from .models import ArchivedGameSession, ArchivedSessionCharacter, GameSession, PlayerCharacter
+
+CACHE_PREFIX = 'calendar'
+# Years the calendar can show; navigation links stop at the edges, far from the limits of datetime.
+CALENDAR_YEARS = range(1900, 2101)
+WEEKDAYS = ['Pon', 'Wt', 'Śr', 'Czw', 'Pt', 'Sob', 'Nd']
+
+
+def user_timezone(request):
+    """
+    Returns the timezone chosen with the ?tz= parameter, remembered in the session, or the default one.
+    """
+    name = request.GET.get('tz') or request.session.get('timezone')
+    if name:
+        try:
+            zone = zoneinfo.ZoneInfo(name)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            zone = None
+        if zone is not None:
+            request.session['timezone'] = name
+            return zone
+    return timezone.get_default_timezone()
+
+
+def month_days(year, month):
+    """
+    Returns the weeks (Monday first) of the month grid as lists of dates, including adjacent days.
+    """
+    return calendar.Calendar().monthdatescalendar(year, month)
+
+
+def week_days(year, week):
+    monday = datetime.fromisocalendar(year, week, 1).date()
+    return [[monday + timedelta(days=offset) for offset in range(7)]]
+
+
+def utc_months(start, end):
+    """
+    Returns the (year, month) pairs in UTC overlapped by the range [start, end).
+    """
+    current = start.astimezone(dt_timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = end.astimezone(dt_timezone.utc)
+    months = []
+    while current < end:
+        months.append((current.year, current.month))
+        current = (current + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def version_key(year, month):
+    return f'{CACHE_PREFIX}:version:{year}-{month:02}'
+
+
+def month_versions(months):
+    keys = [version_key(year, month) for year, month in months]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # A time based start keeps an evicted version from matching grids cached before the eviction.
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*moments):
+    """
+    Bumps the cache versions of the UTC months of the given session dates; None values are skipped.
+    """
+    field = GameSession._meta.get_field('session_date')
+    months = set()
+    for moment in moments:
+        # Sessions created from form data may still hold the submitted string.
+        moment = field.to_python(moment)
+        if moment is None:
+            continue
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        moment = moment.astimezone(dt_timezone.utc)
+        months.add((moment.year, moment.month))
+    for year, month in months:
+        key = version_key(year, month)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def grid_range(weeks, zone):
+    """
+    Returns the aware datetimes bounding the days of the grid in the timezone.
+    """
+    start = datetime.combine(weeks[0][0], datetime.min.time(), tzinfo=zone)
+    end = datetime.combine(weeks[-1][-1] + timedelta(days=1), datetime.min.time(), tzinfo=zone)
+    return start, end
+
+
+def user_sessions(user, start, end):
+    """
+    Returns the sessions owned by the user or joined by their characters between start and end, archived
+    sessions included.
+    """
+    joined = PlayerCharacter.game_session_id.through.objects.filter(
+        playercharacter_id__owner_id__user_id=user).values('gamesession_id')
+    sessions = list(GameSession.objects.filter(
+        Q(owner_id__user_id=user) | Q(pk__in=joined), session_date__gte=start, session_date__lt=end,
+    ).values('pk', 'title', 'session_date', 'is_open'))
+    # Ranges after the newest archived session skip the archive, whatever cutoff the archiver was run with.
+    newest = ArchivedGameSession.objects.aggregate(newest=Max('session_date'))['newest']
+    if newest is not None and start <= newest:
+        joined = ArchivedSessionCharacter.objects.filter(
+            character_id__owner_id__user_id=user).values('session_id')
+        sessions += ArchivedGameSession.objects.filter(
+            Q(owner_id__user_id=user) | Q(pk__in=joined), session_date__gte=start, session_date__lt=end,
+        ).values('pk', 'title', 'session_date', 'is_open')
+    return sorted(sessions, key=lambda session: (session['session_date'], session['pk']))
+
+
+def build_grid(user, weeks, zone, month=None):
+    """
+    Returns the weeks of the grid as lists of {'date', 'in_month', 'sessions'} days.
+    """
+    start, end = grid_range(weeks, zone)
+    by_day = {}
+    for session in user_sessions(user, start, end):
+        session['session_date'] = session['session_date'].astimezone(zone)
+        by_day.setdefault(session['session_date'].date(), []).append(session)
+    return [[{'date': day, 'in_month': month is None or day.month == month, 'sessions': by_day.get(day, [])}
+             for day in week] for week in weeks]
+
+
+def render_grid(user, weeks, zone, month=None):
+    """
+    Returns the rendered grid HTML from the cache, or builds, renders and caches it.
+    """
+    start, end = grid_range(weeks, zone)
+    versions = '.'.join(str(version) for version in month_versions(utc_months(start, end)))
+    key = f'{CACHE_PREFIX}:grid:{user.pk}:{zone.key}:{weeks[0][0]}:{weeks[-1][-1]}:{month}:{versions}'
+    html = cache.get(key)
+    if html is None:
+        grid = build_grid(user, weeks, zone, month)
+        with timezone.override(zone):
+            html = render_to_string('calendar_grid.html', {'weeks': grid, 'weekdays': WEEKDAYS})
+        cache.set(key, html, timeout=settings.CALENDAR_CACHE_TIMEOUT)
+    return mark_safe(html)
@@ -0,0 +1,30 @@
+"""
+Signal receivers keeping caches in step with the models, connected in GamemasterAppConfig.ready().
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import GameSession, PlayerCharacter
+from .session_calendar import invalidate
+
+
+@receiver(post_save, sender=GameSession)
+def invalidate_calendar_on_save(sender, instance, **kwargs):
+    invalidate(instance.session_date, getattr(instance, '_loaded_session_date', None))
+
+
+@receiver(post_delete, sender=GameSession)
+def invalidate_calendar_on_delete(sender, instance, **kwargs):
+    invalidate(instance.session_date)
+
+
+@receiver(m2m_changed, sender=PlayerCharacter.game_session_id.through)
+def invalidate_calendar_on_join(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        invalidate(instance.session_date)
+    elif action == 'pre_clear':
+        invalidate(*instance.game_session_id.values_list('session_date', flat=True))
+    else:
+        invalidate(*GameSession.objects.filter(pk__in=pk_set).values_list('session_date', flat=True))
@@ -0,0 +1,364 @@
+"""
+Monte Carlo encounter simulator.
+
+The simulator estimates how a session's party fares against an encounter defined by the game master.
+Fights are evaluated in chunks: every chunk plays thousands of fights at once on NumPy arrays, one round
+at a time. Chunks are fanned out over one ProcessPoolExecutor per process, shared by all requests, and the run
+stops early as soon as the confidence interval of the win probability is narrower than the requested
+tolerance. Runs of a single chunk are played in the calling process.
+
+Encounter definition (JSON compatible):
+    {
+        "enemies": [
+            {"name": "Goblin", "count": 3, "life_points": 7, "attack": 4, "defense": 12, "damage": 6}
+        ],
+        "max_rounds": 50
+    }
+
+Definitions are bounded: at most MAX_ENEMIES enemies and MAX_ROUNDS rounds, and every statistic within
+STAT_RANGES, so a single request cannot keep the workers busy for long.
+"""
+import math
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .models import CharacterSheet, PlayerCharacter
+
+DEFAULT_FIGHTS = 100_000
+MAX_FIGHTS = 1_000_000
+DEFAULT_CHUNK_SIZE = 10_000
+DEFAULT_TOLERANCE = 0.005
+DEFAULT_MAX_ROUNDS = 50
+MAX_ROUNDS = 200
+MAX_ENEMIES = 100
+DEFAULT_WORKERS = 4
+STAT_RANGES = {
+    'life_points': (1, 1000),
+    'attack': (-10, 30),
+    'defense': (0, 40),
+    'damage': (1, 100),
+    'damage_bonus': (0, 50),
+}
+Z_95 = 1.959963984540054
+
+
+class EncounterError(ValueError):
+    """Raised when an encounter definition or a party cannot be simulated."""
+
+
+@dataclass
+class Combatant:
+    """
+    Combat statistics of a single party member or enemy.
+
+    Fields:
+    - name (str): Display name.
+    - life_points (int): Starting life points.
+    - attack (int): Bonus added to the d20 attack roll.
+    - defense (int): Target number an attack roll has to reach to hit.
+    - damage (int): Size of the damage die.
+    - damage_bonus (int): Flat bonus added to the damage roll.
+    - key (int): Primary key of the character, None for enemies and ad hoc combatants.
+    """
+    name: str
+    life_points: int
+    attack: int
+    defense: int
+    damage: int = 6
+    damage_bonus: int = 0
+    key: int = None
+
+
+@dataclass
+class SimulationResult:
+    """
+    Aggregated outcome of a simulation run.
+
+    Fields:
+    - fights (int): Number of simulated fights.
+    - wins (int): Fights in which all enemies were defeated.
+    - party_survived (int): Fights won without losing any party member.
+    - survivors (list): Per party member count of fights they survived.
+    - names (list): Party member names, aligned with survivors.
+    - keys (list): Party member keys, aligned with survivors; survival is reported per key, so members
+      sharing a name stay apart.
+    - rounds (int): Total number of rounds played, used for the average fight length.
+    - stopped_early (bool): Whether the confidence interval was reached before the requested fight count.
+    """
+    fights: int = 0
+    wins: int = 0
+    party_survived: int = 0
+    survivors: list = field(default_factory=list)
+    names: list = field(default_factory=list)
+    keys: list = field(default_factory=list)
+    rounds: int = 0
+    stopped_early: bool = False
+
+    def add(self, chunk):
+        fights, wins, party_survived, survivors, rounds = chunk
+        self.fights += fights
+        self.wins += wins
+        self.party_survived += party_survived
+        self.rounds += rounds
+        if not self.survivors:
+            self.survivors = [0] * len(survivors)
+        self.survivors = [total + count for total, count in zip(self.survivors, survivors)]
+
+    def as_dict(self):
+        low, high = wilson_interval(self.wins, self.fights)
+        return {
+            'fights': self.fights,
+            'win_probability': self.wins / self.fights if self.fights else 0.0,
+            'win_interval': [low, high],
+            'party_survival_probability': self.party_survived / self.fights if self.fights else 0.0,
+            'survival': {
+                key: count / self.fights if self.fights else 0.0
+                for key, count in zip(self.keys, self.survivors)
+            },
+            'names': dict(zip(self.keys, self.names)),
+            'average_rounds': self.rounds / self.fights if self.fights else 0.0,
+            'stopped_early': self.stopped_early,
+        }
+
+
+def modifier(stat):
+    return (stat - 10) // 2
+
+
+def character_combatant(sheet):
+    """
+    Builds a Combatant from a CharacterSheet, using the usual (stat - 10) // 2 attribute modifiers.
+    """
+    strength = modifier(sheet.strength)
+    dexterity = modifier(sheet.dexterity)
+    return Combatant(
+        name=sheet.character_id.name,
+        life_points=sheet.life_points,
+        attack=max(strength, dexterity) + 2,
+        defense=10 + dexterity + max(modifier(sheet.condition), 0),
+        damage=8,
+        damage_bonus=max(strength, 0),
+        key=sheet.pk,
+    )
+
+
+def session_party(session):
+    """
+    Returns the living characters of a session as combatants.
+    """
+    sheets = CharacterSheet.objects.filter(
+        character_id__game_session_id=session,
+        character_id__character_status=PlayerCharacter.CharacterStatus.ALIVE,
+        life_points__gt=0,
+    ).select_related('character_id').order_by('pk')
+    return [character_combatant(sheet) for sheet in sheets]
+
+
+def parse_encounter(definition):
+    """
+    Validates an encounter definition and expands it into a list of enemy combatants.
+
+    Returns a tuple (enemies, max_rounds). Raises EncounterError on invalid input.
+    """
+    if not isinstance(definition, dict) or not isinstance(definition.get('enemies'), list):
+        raise EncounterError('Encounter needs a list of enemies')
+    enemies = []
+    try:
+        for entry in definition['enemies']:
+            count = int(entry.get('count', 1))
+            if count < 1 or len(enemies) + count > MAX_ENEMIES:
+                raise EncounterError(f'Encounter needs between 1 and {MAX_ENEMIES} enemies')
+            stats = {
+                'life_points': int(entry['life_points']),
+                'attack': int(entry.get('attack', 0)),
+                'defense': int(entry.get('defense', 10)),
+                'damage': int(entry.get('damage', 6)),
+                'damage_bonus': int(entry.get('damage_bonus', 0)),
+            }
+            for name, (low, high) in STAT_RANGES.items():
+                if not low <= stats[name] <= high:
+                    raise EncounterError(f'Enemy {name} must be between {low} and {high}')
+            for number in range(count):
+                enemies.append(Combatant(name=f"{entry.get('name', 'Enemy')} {number + 1}", **stats))
+        max_rounds = int(definition.get('max_rounds', DEFAULT_MAX_ROUNDS))
+    except EncounterError:
+        raise
+    except (KeyError, TypeError, ValueError, AttributeError) as error:
+        raise EncounterError(f'Invalid encounter definition: {error}') from error
+    if not enemies:
+        raise EncounterError('Encounter needs at least one enemy')
+    if not 1 <= max_rounds <= MAX_ROUNDS:
+        raise EncounterError(f'max_rounds must be between 1 and {MAX_ROUNDS}')
+    return enemies, max_rounds
+
+
+def _columns(combatants):
+    return np.array([
+        [c.life_points, c.attack, c.defense, c.damage, c.damage_bonus] for c in combatants
+    ], dtype=np.int64)
+
+
+def _attack(rng, attackers_alive, attackers, targets, target_alive):
+    """
+    One side attacks for a whole chunk of fights.
+
+    Every living attacker picks a random living target and rolls d20 + attack against the target's
+    defense; a hit deals 1d(damage) + damage_bonus. Returns the damage matrix to subtract from targets.
+    """
+    fights, n_attackers = attackers_alive.shape
+    n_targets = target_alive.shape[1]
+    # Random scores masked by target_alive: argmax picks a uniformly random living target.
+    scores = rng.random((fights, n_attackers, n_targets)) * target_alive[:, None, :]
+    chosen = scores.argmax(axis=2)
+    rolls = rng.integers(1, 21, size=(fights, n_attackers)) + attackers[:, 1]
+    hits = (rolls >= targets[chosen, 2]) & attackers_alive & target_alive.any(axis=1)[:, None]
+    dealt = (rng.integers(1, attackers[:, 3] + 1, size=(fights, n_attackers)) + attackers[:, 4]) * hits
+    damage = np.zeros((fights, n_targets), dtype=np.int64)
+    rows = np.broadcast_to(np.arange(fights)[:, None], chosen.shape)
+    np.add.at(damage, (rows, chosen), dealt)
+    return damage
+
+
+def simulate_chunk(party, enemies, fights, max_rounds, seed):
+    """
+    Plays `fights` fights in one vectorized pass.
+
+    `party` and `enemies` are (n, 5) integer arrays of life_points, attack, defense, damage and
+    damage_bonus. Both sides act simultaneously each round. Returns a picklable tuple
+    (fights, wins, party_survived, survivors, rounds).
+    """
+    rng = np.random.default_rng(seed)
+    party = np.asarray(party, dtype=np.int64)
+    enemies = np.asarray(enemies, dtype=np.int64)
+    party_hp = np.tile(party[:, 0], (fights, 1))
+    enemy_hp = np.tile(enemies[:, 0], (fights, 1))
+    rounds = np.zeros(fights, dtype=np.int64)
+    for _ in range(max_rounds):
+        party_alive = party_hp > 0
+        enemy_alive = enemy_hp > 0
+        ongoing = party_alive.any(axis=1) & enemy_alive.any(axis=1)
+        if not ongoing.any():
+            break
+        rounds += ongoing
+        to_enemies = _attack(rng, party_alive & ongoing[:, None], party, enemies, enemy_alive)
+        to_party = _attack(rng, enemy_alive & ongoing[:, None], enemies, party, party_alive)
+        enemy_hp -= to_enemies
+        party_hp -= to_party
+    party_alive = party_hp > 0
+    wins = ~(enemy_hp > 0).any(axis=1) & party_alive.any(axis=1)
+    return (
+        fights,
+        int(wins.sum()),
+        int((wins & party_alive.all(axis=1)).sum()),
+        party_alive.sum(axis=0).tolist(),
+        int(rounds.sum()),
+    )
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    """
+    Wilson score interval for a binomial proportion.
+    """
+    if not trials:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _converged(result, tolerance):
+    low, high = wilson_interval(result.wins, result.fights)
+    return (high - low) / 2 <= tolerance
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def shared_pool(workers):
+    """
+    Returns the process pool of this process, started with `workers` processes on first use, so requests
+    queue their chunks on the same processes instead of starting new ones.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool
+
+
+def _reset_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def simulate_encounter(party, enemies, fights=DEFAULT_FIGHTS, max_rounds=DEFAULT_MAX_ROUNDS,
+                       chunk_size=DEFAULT_CHUNK_SIZE, tolerance=DEFAULT_TOLERANCE, workers=None, seed=None):
+    """
+    Runs up to `fights` simulated fights of `party` against `enemies` (lists of Combatant).
+
+    Chunks are submitted to the shared process pool with at most two chunks in flight per worker, so an
+    early stop wastes little work. With workers=None the pool has DEFAULT_WORKERS processes; with workers=0,
+    or when the run fits in one chunk, the chunks run in the current process. Returns a SimulationResult.
+    """
+    if not party:
+        raise EncounterError('Party has no living characters with a character sheet')
+    if not enemies:
+        raise EncounterError('Encounter needs at least one enemy')
+    fights = max(1, min(int(fights), MAX_FIGHTS))
+    max_rounds = max(1, min(int(max_rounds), MAX_ROUNDS))
+    chunk_size = max(1, min(int(chunk_size), fights))
+    party_columns = _columns(party)
+    enemy_columns = _columns(enemies)
+    sizes = [chunk_size] * (fights // chunk_size)
+    if fights % chunk_size:
+        sizes.append(fights % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    result = SimulationResult(names=[member.name for member in party],
+                              keys=[index if member.key is None else member.key for index, member in enumerate(party)])
+
+    if workers == 0 or len(sizes) == 1:
+        for size, chunk_seed in zip(sizes, seeds):
+            result.add(simulate_chunk(party_columns, enemy_columns, size, max_rounds, chunk_seed))
+            if result.fights < fights and _converged(result, tolerance):
+                result.stopped_early = True
+                break
+        return result
+
+    workers = workers or min(DEFAULT_WORKERS, os.cpu_count() or 1)
+    executor = shared_pool(workers)
+    pending = set()
+    jobs = iter(zip(sizes, seeds))
+    try:
+        while True:
+            for size, chunk_seed in jobs:
+                pending.add(executor.submit(
+                    simulate_chunk, party_columns, enemy_columns, size, max_rounds, chunk_seed))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result.add(future.result())
+            if result.fights < fights and _converged(result, tolerance):
+                result.stopped_early = True
+                break
+    except BrokenProcessPool:
+        # A worker died (killed or out of memory): the next run starts a fresh pool.
+        _reset_pool(executor)
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+    return result
@@ -0,0 +1,121 @@
+"""
+Slow-query log.
+
+SlowQueryMiddleware times every SQL statement of a request with connection.execute_wrapper(). Statements
+slower than SLOW_QUERY_THRESHOLD_MS are recorded with their normalized SQL, the URL name of the request, the
+line in GameMaster_app that issued them and, for SELECT statements, the database's EXPLAIN plan. Entries go to
+a per-process ring buffer of SLOW_QUERY_LOG_SIZE entries, browsable by staff, and to the
+'GameMaster_app.slowqueries' logger.
+"""
+import logging
+import re
+import threading
+import time
+import traceback
+from collections import deque
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = str(Path(__file__).resolve().parent)
+IGNORED_FILES = {str(Path(__file__).resolve()), str(Path(__file__).resolve().parent / 'middleware.py')}
+
+IN_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+STRING = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """
+    Collapses literals, parameter lists and whitespace, so the same ORM call always gives the same text.
+    """
+    sql = NUMBER.sub('%s', STRING.sub('%s', sql))
+    sql = IN_LIST.sub('(...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def calling_line():
+    """
+    Returns "path:line in function" of the innermost GameMaster_app frame outside this module.
+    """
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(APP_DIR) and frame.filename not in IGNORED_FILES:
+            return f'{Path(frame.filename).relative_to(Path(APP_DIR).parent)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+class SlowQueryLog:
+    """
+    Bounded ring buffer of slow query entries; the oldest entries are dropped first.
+    """
+
+    def __init__(self, size):
+        self.entries = deque(maxlen=size)
+
+    def add(self, entry):
+        self.entries.append(entry)
+
+    def recent(self):
+        return list(reversed(self.entries))
+
+    def resize(self, size):
+        if self.entries.maxlen != size:
+            self.entries = deque(self.entries, maxlen=size)
+
+
+slow_query_log = SlowQueryLog(100)
+_explaining = threading.local()
+
+
+def explain(sql, params):
+    if not sql.lstrip().upper().startswith('SELECT') or connection.needs_rollback:
+        return None
+    _explaining.active = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+    except Exception as error:
+        return f'EXPLAIN failed: {error}'
+    finally:
+        _explaining.active = False
+
+
+class QueryTimer:
+    """
+    execute_wrapper callable timing the statements of one request.
+    """
+
+    def __init__(self, request):
+        self.request = request
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_explaining, 'active', False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+                self.record(sql, params, many, duration_ms)
+
+    def record(self, sql, params, many, duration_ms):
+        match = getattr(self.request, 'resolver_match', None)
+        entry = {
+            'date': timezone.now(),
+            'duration_ms': round(duration_ms, 2),
+            'sql': normalize_sql(sql),
+            'view': match.url_name if match else None,
+            'path': self.request.path,
+            'caller': calling_line(),
+            'plan': None if many or not settings.SLOW_QUERY_EXPLAIN else explain(sql, params),
+        }
+        slow_query_log.resize(settings.SLOW_QUERY_LOG_SIZE)
+        slow_query_log.add(entry)
+        logger.warning('Slow query %.1f ms in %s at %s: %s', duration_ms, entry['view'], entry['caller'], entry['sql'])
@@ -0,0 +1,126 @@
+"""
+Stateless signed API tokens.
+
+A token is a signed, timestamped payload carrying the user id, the role flags GameMaster.is_game_master and
+Player.is_player, and a unique token id. Validation only checks the signature, the age and an in-memory
+copy of the RevokedToken list, so authenticated API requests do not read the session or User tables. The list
+holds single token ids and 'user:<id>' entries, which revoke every token of a user whose account was disabled.
+"""
+import secrets
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.utils import timezone
+
+from .models import GameMaster, Player, RevokedToken
+
+TOKEN_SALT = 'GameMaster_app.tokens'
+
+
+class TokenError(Exception):
+    """Raised when an API token is malformed, expired or revoked."""
+
+
+class RevocationList:
+    """
+    Per-process copy of the ids of revoked, not yet expired tokens.
+
+    The list is reloaded at most every API_TOKEN_REVOCATION_REFRESH seconds, and immediately in the
+    process that revokes a token.
+    """
+
+    def __init__(self):
+        self.token_ids = frozenset()
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        token_ids = RevokedToken.objects.filter(expiry_date__gt=timezone.now()).values_list('token_id', flat=True)
+        self.token_ids = frozenset(token_ids)
+        self.loaded_at = time.monotonic()
+
+    def __contains__(self, token_id):
+        stale = (self.loaded_at is None
+                 or time.monotonic() - self.loaded_at > settings.API_TOKEN_REVOCATION_REFRESH)
+        if stale and self.lock.acquire(blocking=False):
+            try:
+                self.refresh()
+            finally:
+                self.lock.release()
+        return token_id in self.token_ids
+
+
+revoked_tokens = RevocationList()
+
+
+def issue_token(user):
+    """
+    Returns a new signed token for the user, with the role flags looked up once here.
+    """
+    payload = {
+        'u': user.pk,
+        'gm': GameMaster.objects.filter(user_id=user, is_game_master=True).exists(),
+        'p': Player.objects.filter(user_id=user, is_player=True).exists(),
+        'j': secrets.token_urlsafe(12),
+    }
+    return signing.dumps(payload, salt=TOKEN_SALT, compress=True)
+
+
+def read_token(token):
+    """
+    Verifies the signature, age and revocation of a token and returns its claims.
+    """
+    try:
+        claims = signing.loads(token, salt=TOKEN_SALT, max_age=settings.API_TOKEN_MAX_AGE)
+    except signing.SignatureExpired:
+        raise TokenError('Token expired')
+    except signing.BadSignature:
+        raise TokenError('Invalid token')
+    if claims.get('j') in revoked_tokens or user_revocation_id(claims.get('u')) in revoked_tokens:
+        raise TokenError('Token revoked')
+    return claims
+
+
+def user_revocation_id(user_id):
+    return f'user:{user_id}'
+
+
+def token_user(claims):
+    """
+    Builds an unsaved User carrying only the primary key and the role flags of the token. It is enough
+    for permission checks and ORM filters such as owner_id__user_id=request.user.
+    """
+    user = User(pk=claims['u'])
+    user.is_game_master = claims['gm']
+    user.is_player = claims['p']
+    user.token_claims = claims
+    return user
+
+
+def revoke_token(token):
+    """
+    Adds the token to the revocation list. The entry is kept for API_TOKEN_MAX_AGE, after which the
+    token would be rejected as expired anyway.
+    """
+    claims = read_token(token)
+    RevokedToken.objects.get_or_create(
+        token_id=claims['j'],
+        defaults={'expiry_date': timezone.now() + timedelta(seconds=settings.API_TOKEN_MAX_AGE)},
+    )
+    revoked_tokens.refresh()
+
+
+def revoke_user_tokens(user):
+    """
+    Revokes every token issued to the user so far. The entry is kept for API_TOKEN_MAX_AGE, after which those
+    tokens are expired anyway; the user must not be able to obtain new tokens meanwhile.
+    """
+    RevokedToken.objects.update_or_create(
+        token_id=user_revocation_id(user.pk),
+        defaults={'expiry_date': timezone.now() + timedelta(seconds=settings.API_TOKEN_MAX_AGE)},
+    )
+    revoked_tokens.refresh()
@@ -0,0 +1,257 @@
+"""
+Capture and replay of production traffic.
+
+With TRAFFIC_CAPTURE_FILE set, TrafficCaptureMiddleware records a TRAFFIC_CAPTURE_RATE share of the requests
+as one JSON line each:
+
+    {"ts": 1760000000.123, "m": "POST", "v": "add_session", "k": {}, "q": {}, "f": {"title": ["xxxx"]},
+     "r": "game_master", "s": 302, "d": 41.7}
+
+that is the time, method, URL name and URL kwargs, query and form parameters, role of the user, status code
+and duration in milliseconds. JSON request bodies, such as those of the batch API and the encounter simulation,
+are recorded under "j". Traces are anonymized when written: numbers, dates and checkbox values of the
+parameters and JSON keys listed in TRAFFIC_KEPT_PARAMETERS (ids, pages, filters) are kept, so they replay as
+they were, and every other value is replaced by as many 'x' as it has characters, or by 0 for JSON numbers.
+Passwords, CSRF and API tokens, invitation tokens, usernames and texts therefore never reach the file,
+whatever they look like, but payload sizes do. Users are recorded by role only.
+
+The replay_traffic command sends a capture to a local instance at the original pace or faster, with the
+requests of every role authenticated by an API token of a local user, and compares the latencies and status
+codes with the captured ones per URL name. Requests of the views in TRAFFIC_REPLAY_SKIPPED_VIEWS, which change
+state irreversibly (account deletion, token revocation, campaign restore, logout), are not sent.
+"""
+import json
+import random
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.http.request import RawPostDataException
+from django.urls import NoReverseMatch, reverse
+
+from .models import GameMaster, Player
+
+KEPT_VALUE = re.compile(r'-?\d+(\.\d+)?|\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2})?)?|on|true|false')
+ROLES = ('anonymous', 'staff', 'game_master', 'player', 'user')
+
+_write_lock = threading.Lock()
+
+
+def anonymize(name, value):
+    value = str(value)
+    if name in settings.TRAFFIC_KEPT_PARAMETERS and KEPT_VALUE.fullmatch(value):
+        return value
+    return 'x' * len(value)
+
+
+def anonymize_parameters(parameters):
+    return {name: [anonymize(name, value) for value in values] for name, values in parameters.lists()}
+
+
+def anonymize_json(value, name=None):
+    """
+    Anonymizes a decoded JSON value like form parameters, by the key each value is found under. Objects and
+    lists keep their shape, and numbers, booleans and nulls their type, so the body still replays.
+    """
+    if isinstance(value, dict):
+        return {key: anonymize_json(item, key) for key, item in value.items()}
+    if isinstance(value, list):
+        return [anonymize_json(item, name) for item in value]
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value if name in settings.TRAFFIC_KEPT_PARAMETERS else 0
+    return anonymize(name, value)
+
+
+def json_body(request):
+    """
+    Returns the anonymized JSON body of the request, the masked raw body when it is not valid JSON, or None
+    when the request has no JSON body.
+    """
+    if request.method not in ('POST', 'PUT', 'PATCH') or request.content_type != 'application/json':
+        return None
+    try:
+        body = request.body
+    except (RawPostDataException, RequestDataTooBig):
+        return None
+    try:
+        return anonymize_json(json.loads(body))
+    except (ValueError, RecursionError):
+        return anonymize(None, body.decode(errors='replace'))
+
+
+def user_role(user):
+    """
+    Returns the role of the user. Token users carry their role flags, session users are looked up.
+    """
+    if not user.is_authenticated:
+        return 'anonymous'
+    if user.is_staff:
+        return 'staff'
+    is_game_master = getattr(user, 'is_game_master', None)
+    if is_game_master is None:
+        is_game_master = GameMaster.objects.filter(user_id=user, is_game_master=True).exists()
+    if is_game_master:
+        return 'game_master'
+    is_player = getattr(user, 'is_player', None)
+    if is_player is None:
+        is_player = Player.objects.filter(user_id=user, is_player=True).exists()
+    return 'player' if is_player else 'user'
+
+
+def request_trace(request, response, role, started, duration):
+    match = getattr(request, 'resolver_match', None)
+    trace = {
+        'ts': round(started, 3),
+        'm': request.method,
+        'v': match.view_name if match else None,
+        'k': {name: anonymize(name, value) for name, value in match.kwargs.items()} if match else {},
+        'q': anonymize_parameters(request.GET),
+        'f': anonymize_parameters(request.POST) if request.method == 'POST' else {},
+        'r': role,
+        's': response.status_code,
+        'd': round(duration * 1000, 1),
+    }
+    body = json_body(request)
+    if body is not None:
+        trace['j'] = body
+    return trace
+
+
+def should_capture():
+    return bool(settings.TRAFFIC_CAPTURE_FILE) and random.random() < settings.TRAFFIC_CAPTURE_RATE
+
+
+def write_trace(trace):
+    line = json.dumps(trace, separators=(',', ':')) + '\n'
+    with _write_lock, open(settings.TRAFFIC_CAPTURE_FILE, 'a', encoding='utf-8') as capture:
+        capture.write(line)
+
+
+def read_traces(path, limit=None):
+    """
+    Returns the traces of a capture file ordered by time.
+    """
+    with open(path, encoding='utf-8') as capture:
+        traces = [json.loads(line) for line in capture if line.strip()]
+    traces.sort(key=lambda trace: trace['ts'])
+    return traces[:limit] if limit else traces
+
+
+def trace_request(trace, base_url, token=None):
+    """
+    Builds the urllib request replaying a trace, or returns None when its URL no longer exists.
+    """
+    if not trace['v']:
+        return None
+    try:
+        path = reverse(trace['v'], kwargs=trace['k'])
+    except NoReverseMatch:
+        return None
+    url = base_url.rstrip('/') + path
+    if trace['q']:
+        url += '?' + urlencode(trace['q'], doseq=True)
+    if 'j' in trace:
+        data, content_type = json.dumps(trace['j']).encode(), 'application/json'
+    elif trace['m'] == 'POST':
+        data, content_type = urlencode(trace['f'], doseq=True).encode(), 'application/x-www-form-urlencoded'
+    else:
+        data = content_type = None
+    request = urllib.request.Request(url, data=data, method=trace['m'])
+    if content_type is not None:
+        request.add_header('Content-Type', content_type)
+    if token:
+        request.add_header('Authorization', f'Bearer {token}')
+    return request
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def send(request, timeout):
+    """
+    Sends a request and returns (status code or None, duration in milliseconds, error message or None).
+    """
+    started = time.perf_counter()
+    try:
+        with _opener.open(request, timeout=timeout) as response:
+            response.read()
+            status, error = response.status, None
+    except urllib.error.HTTPError as http_error:
+        status, error = http_error.code, None
+    except (urllib.error.URLError, OSError) as failure:
+        status, error = None, str(getattr(failure, 'reason', failure))
+    return status, (time.perf_counter() - started) * 1000, error
+
+
+def replay(traces, base_url, tokens=None, speed=1.0, concurrency=8, timeout=30, skipped_views=None):
+    """
+    Replays the traces against `base_url`, `speed` times faster than captured (0 for no pauses), and returns
+    (trace, status, duration, error) results in trace order. Traces of roles without a token in `tokens`,
+    other than anonymous ones, traces of `skipped_views` (TRAFFIC_REPLAY_SKIPPED_VIEWS by default) and traces
+    whose URL no longer exists are skipped and reported with status 'skipped'.
+    """
+    tokens = tokens or {}
+    skipped_views = set(settings.TRAFFIC_REPLAY_SKIPPED_VIEWS if skipped_views is None else skipped_views)
+    results = []
+    start = time.monotonic()
+    first = traces[0]['ts'] if traces else 0
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for trace in traces:
+            token = tokens.get(trace['r'])
+            request = None
+            if trace['v'] not in skipped_views and (trace['r'] == 'anonymous' or token):
+                request = trace_request(trace, base_url, token)
+            if request is None:
+                results.append((trace, None))
+                continue
+            if speed:
+                time.sleep(max(0.0, (trace['ts'] - first) / speed - (time.monotonic() - start)))
+            results.append((trace, executor.submit(send, request, timeout)))
+    return [(trace, 'skipped', None, None) if future is None else (trace, *future.result())
+            for trace, future in results]
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(share * len(values)))] if values else None
+
+
+def compare(results):
+    """
+    Returns one row per URL name comparing replayed latencies and statuses with the captured ones.
+    """
+    groups = defaultdict(list)
+    for result in results:
+        groups[result[0]['v'] or 'unmatched'].append(result)
+    rows = []
+    for view, group in sorted(groups.items()):
+        sent = [(trace, status, duration, error) for trace, status, duration, error in group if status != 'skipped']
+        captured = [trace['d'] for trace, *_ in sent]
+        replayed = [duration for _, status, duration, _ in sent if status is not None]
+        rows.append({
+            'view': view,
+            'requests': len(group),
+            'skipped': len(group) - len(sent),
+            'captured_p50': statistics.median(captured) if captured else None,
+            'replayed_p50': statistics.median(replayed) if replayed else None,
+            'captured_p95': percentile(captured, 0.95),
+            'replayed_p95': percentile(replayed, 0.95),
+            'status_changes': sum(1 for trace, status, _, _ in sent if status != trace['s']),
+            'errors': sum(1 for _, status, _, error in sent if error or (status or 0) >= 500),
+        })
+    return rows
@@ -1,12 +1,39 @@
-from django.contrib.auth import authenticate, login
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpResponse
-from django.shortcuts import render, redirect
+from django.db.models import Q
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.decorators import method_decorator
 from django.views import View
+from .accounts import request_deletion
+from .analytics import activity_series, last_complete_day
+from .archive import get_session, session_characters, session_systems
+from .campaigns import CampaignError, export_campaign, restore_campaign
+from .chat import (message_as_dict, messages_after, messages_before, post_message, session_for_user,
+                   wait_for_messages)
 from .forms import LoginForm, UserRegistrationForm
-from .models import GameSession, GameMaster
+from .history import event_as_dict, sheet_history, sheet_state_as_of
+from .invitations import InvitationError, accept_invitation, create_invitation, read_invitation
+from .metrics import collect, render as render_metrics
+from .models import ArchivedGameSession, CharacterSheet, GameSession, GameMaster, PlayerCharacter
+from .params import MAX_INTEGER, parse_int
+from .party import PARTY_EFFECT_FIELDS, apply_party_effect, max_delta
+from .personal_data import export_personal_data
+from .profiling import profile_store
+from .ratelimit import rate_limit
+from .recommendations import recommended_sessions
+from .session_calendar import CALENDAR_YEARS, month_days, render_grid, user_timezone, week_days
+from .simulation import DEFAULT_FIGHTS, parse_encounter, session_party, simulate_encounter
+from .slowqueries import slow_query_log
 
 
 class IndexView(View):
@@ -19,13 +46,14 @@ class IndexView(View):
        Methods:
        - get(request): Handles HTTP GET requests for displaying the login form.
        - post(request): Handles HTTP POST requests for processing the submitted form data and
-         authenticating the user if the data is valid.
+         authenticating the user if the data is valid. Rate limited per address and per username.
        """
 
     def get(self, request):
         login_form = LoginForm()
         return render(request, 'index.html', {'login_form': login_form})
 
+    @method_decorator(rate_limit('login'))
     def post(self, request):
         login_form = LoginForm(request.POST)
         if login_form.is_valid():
@@ -57,13 +85,14 @@ class RegisterView(View):
     Methods:
     - get(request): Handles HTTP GET requests for displaying the user registration form.
     - post(request): Handles HTTP POST requests for processing the submitted form data and
-      creating a new user account if the data is valid.
+      creating a new user account if the data is valid. Rate limited per address.
     """
 
     def get(self, request):
         usr_form = UserRegistrationForm()
         return render(request, 'register.html', {'usr_form': usr_form})
 
+    @method_decorator(rate_limit('register'))
     def post(self, request):
         usr_form = UserRegistrationForm(request.POST)
         if usr_form.is_valid():
@@ -84,11 +113,12 @@ class DashboardView(LoginRequiredMixin, View):
     or relevant information.
 
     Methods:
-    - get(request): Handles HTTP GET requests for rendering and displaying the user's dashboard.
+    - get(request): Handles HTTP GET requests for rendering and displaying the user's dashboard, with the
+      precomputed session recommendations of the player.
     """
 
     def get(self, request):
-        return render(request, 'dashboard.html')
+        return render(request, 'dashboard.html', {'recommendations': recommended_sessions(request.user)})
 
 
 class UserSettingsView(LoginRequiredMixin, View):
@@ -126,6 +156,24 @@ class UserSettingsView(LoginRequiredMixin, View):
         return redirect('settings')
 
 
+class AccountDeletionView(LoginRequiredMixin, View):
+    """
+    AccountDeletionView is a Django View class deleting the account of the logged-in user.
+
+    The account is disabled and the user logged out at once; its data is deleted in the background in small
+    batches by the 'delete_account' job.
+
+    Methods:
+    - post(request): Handles HTTP POST requests, requests the deletion and redirects to the index page.
+    """
+
+    def post(self, request):
+        request_deletion(request.user)
+        logout(request)
+        messages.info(request, 'Konto zostało wyłączone i zostanie usunięte')
+        return redirect('index')
+
+
 class AddSessionView(LoginRequiredMixin, View):
     """
       AddSessionView is a Django View class for adding a game session.
@@ -136,7 +184,7 @@ class AddSessionView(LoginRequiredMixin, View):
       Methods:
       - get(request): Handles HTTP GET requests for displaying the game session creation form.
       - post(request): Handles HTTP POST requests for processing the submitted form data and
-        creating a new game session if the data is valid.
+        creating a new game session if the data is valid. Rate limited per user.
 
        Notes:
        - is_open=True: Temporary solution, will be changed in the next phase of development.
@@ -146,6 +194,7 @@ class AddSessionView(LoginRequiredMixin, View):
     def get(self, request):
         return render(request, 'add_session.html')
 
+    @method_decorator(rate_limit('add_session'))
     def post(self, request):
         owner_id = request.user.id
         owner = GameMaster.objects.get(user_id=owner_id)
@@ -166,3 +215,510 @@ class AddSessionView(LoginRequiredMixin, View):
             return redirect('dashboard')
         messages.error(request, f"Wypełnij poprawnie wszystkie pola")
         return redirect('add_session')
+
+
+class SessionDetailView(LoginRequiredMixin, View):
+    """
+    SessionDetailView is a Django View class showing a game session, also after it has been archived.
+
+    This view requires authentication. The owner of the session, the players whose characters joined it and,
+    for public sessions, every user can access it.
+
+    Methods:
+    - get(request, session_id): Handles HTTP GET requests and returns the session with its systems and
+      characters as JSON, read from the archive tables for archived sessions.
+    """
+
+    def get(self, request, session_id):
+        session = get_session(session_id)
+        if session is None:
+            raise Http404
+        characters = session_characters(session).order_by('pk')
+        if not (session.is_public or session.owner_id.user_id_id == request.user.pk
+                or characters.filter(owner_id__user_id=request.user).exists()):
+            raise Http404
+        return JsonResponse({
+            'id': session.pk,
+            'title': session.title,
+            'session_date': session.session_date.isoformat(),
+            'slots': session.slots,
+            'is_public': session.is_public,
+            'is_open': session.is_open,
+            'archived': isinstance(session, ArchivedGameSession),
+            'game_master': session.owner_id.user_nickname,
+            'systems': list(session_systems(session).values_list('system', flat=True)),
+            'characters': [{'id': character.pk, 'name': character.name} for character in characters],
+        })
+
+
+class EncounterSimulationView(LoginRequiredMixin, View):
+    """
+    EncounterSimulationView is a Django View class for balancing encounters.
+
+    This view requires authentication, and only the game master owning the session can access it.
+    The game master posts a JSON encounter definition and receives the estimated win and survival
+    probabilities of the session's party.
+
+    Methods:
+    - post(request, session_id): Handles HTTP POST requests with a JSON body
+      {"encounter": {...}, "fights": N} and returns the simulation result as JSON.
+
+    Notes:
+    - The size of the process pool shared by all requests of a server process is taken from the
+      ENCOUNTER_SIMULATION_WORKERS setting.
+    """
+
+    def post(self, request, session_id):
+        session = get_object_or_404(GameSession, pk=session_id, owner_id__user_id=request.user)
+        try:
+            payload = json.loads(request.body)
+            enemies, max_rounds = parse_encounter(payload.get('encounter'))
+            result = simulate_encounter(
+                session_party(session), enemies,
+                fights=int(payload.get('fights', DEFAULT_FIGHTS)),
+                max_rounds=max_rounds,
+                workers=settings.ENCOUNTER_SIMULATION_WORKERS,
+            )
+        except (ValueError, TypeError, AttributeError, OverflowError) as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        return JsonResponse(result.as_dict())
+
+
+class CharacterSheetHistoryView(LoginRequiredMixin, View):
+    """
+    CharacterSheetHistoryView is a Django View class for browsing the change log of a character sheet.
+
+    This view requires authentication. The owner of the character and the game masters of the sessions
+    the character joined, archived sessions included, can access it.
+
+    Methods:
+    - get(request, character_id): Handles HTTP GET requests. Returns the newest events as JSON, older pages
+      are requested with ?before=<sequence>. With ?as_of=<ISO datetime> it returns the state of the sheet
+      at that moment instead.
+    """
+
+    def get(self, request, character_id):
+        sheet = get_object_or_404(
+            CharacterSheet.objects.filter(
+                Q(character_id__owner_id__user_id=request.user)
+                | Q(character_id__game_session_id__owner_id__user_id=request.user)
+                | Q(character_id__archivedsessioncharacter__session_id__owner_id__user_id=request.user)
+            ).distinct(),
+            pk=character_id,
+        )
+        as_of = request.GET.get('as_of')
+        if as_of:
+            try:
+                moment = parse_datetime(as_of)
+            except ValueError:
+                moment = None
+            if moment is None:
+                return JsonResponse({'error': 'Invalid as_of date'}, status=400)
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            return JsonResponse({'as_of': moment.isoformat(), 'state': sheet_state_as_of(sheet, moment)})
+        before = request.GET.get('before')
+        if before is not None:
+            try:
+                before = parse_int(before, maximum=MAX_INTEGER)
+            except ValueError:
+                return JsonResponse({'error': 'Invalid before sequence'}, status=400)
+        events = sheet_history(sheet, before=before)
+        return JsonResponse({'events': [event_as_dict(event) for event in events]})
+
+
+class PartyEffectView(LoginRequiredMixin, View):
+    """
+    PartyEffectView is a Django View class for party-wide game master actions.
+
+    This view requires authentication, and only the game master owning the session can access it.
+    The posted deltas of life_points (damage or healing), wealth and reputation are applied to all
+    living characters of the session in a single UPDATE statement, clamped to the field bounds.
+    Deltas that are not integers or exceed the range of their field are answered with 400.
+
+    Methods:
+    - post(request, session_id): Handles HTTP POST requests and returns the number of updated
+      character sheets as JSON.
+    """
+
+    def post(self, request, session_id):
+        session = get_object_or_404(GameSession, pk=session_id, owner_id__user_id=request.user)
+        try:
+            deltas = {
+                name: parse_int(request.POST[name], -max_delta(CharacterSheet, name), max_delta(CharacterSheet, name))
+                for name in PARTY_EFFECT_FIELDS if request.POST.get(name)
+            }
+        except ValueError:
+            return JsonResponse({'error': 'Wartości muszą być liczbami całkowitymi'}, status=400)
+        updated = apply_party_effect(session, changed_by=request.user, **deltas)
+        return JsonResponse({'updated': updated})
+
+
+class CreateInvitationView(LoginRequiredMixin, View):
+    """
+    CreateInvitationView is a Django View class for inviting players to a session.
+
+    This view requires authentication, and only the game master owning the session can access it.
+
+    Methods:
+    - post(request, session_id): Handles HTTP POST requests and returns a signed invitation link as JSON.
+      With reserve_slot set, one slot of the session is held for the invitee until the link expires.
+    """
+
+    def post(self, request, session_id):
+        session = get_object_or_404(GameSession, pk=session_id, owner_id__user_id=request.user)
+        try:
+            token = create_invitation(session, reserve_slot=bool(request.POST.get('reserve_slot')))
+        except InvitationError as error:
+            return JsonResponse({'error': str(error)}, status=409)
+        return JsonResponse({'url': request.build_absolute_uri(reverse('invitation', args=[token]))})
+
+
+class InvitationView(View):
+    """
+    InvitationView is a Django View class for opening and accepting invitation links.
+
+    Methods:
+    - get(request, token): Handles HTTP GET requests. Verifies the signed token and renders the invitation
+      without any database query.
+    - post(request, token): Handles HTTP POST requests of logged-in users. Adds the chosen character, or the
+      only living character of the user, to the session and redirects to the dashboard.
+    """
+
+    def get(self, request, token):
+        try:
+            invitation = read_invitation(token)
+        except InvitationError as error:
+            return render(request, 'invitation.html', {'error': error}, status=400)
+        return render(request, 'invitation.html', {'invitation': invitation})
+
+    def post(self, request, token):
+        try:
+            invitation = read_invitation(token)
+        except InvitationError as error:
+            return render(request, 'invitation.html', {'error': error}, status=400)
+        if not request.user.is_authenticated:
+            messages.error(request, 'Zaloguj się, aby przyjąć zaproszenie')
+            return redirect('index')
+        characters = PlayerCharacter.objects.filter(
+            owner_id__user_id=request.user, character_status=PlayerCharacter.CharacterStatus.ALIVE)
+        character_id = request.POST.get('character')
+        if character_id:
+            try:
+                character_id = parse_int(character_id)
+            except ValueError:
+                return render(request, 'invitation.html',
+                              {'invitation': invitation, 'error': 'Nieprawidłowa postać'}, status=400)
+            characters = characters.filter(pk=character_id)
+        characters = list(characters[:20])
+        if not characters:
+            return render(request, 'invitation.html',
+                          {'invitation': invitation, 'error': 'Nie masz żywej postaci'}, status=400)
+        if len(characters) > 1:
+            return render(request, 'invitation.html', {'invitation': invitation, 'characters': characters})
+        try:
+            accept_invitation(invitation, characters[0])
+        except InvitationError as error:
+            return render(request, 'invitation.html', {'invitation': invitation, 'error': error}, status=409)
+        messages.success(request, f"Dołączono do sesji {invitation['t']}")
+        return redirect('dashboard')
+
+
+class MetricsView(View):
+    """
+    MetricsView is a Django View class exposing request metrics in Prometheus text format.
+
+    Only addresses listed in METRICS_ALLOWED_IPS, such as the local Prometheus scraper, and staff users
+    can access it.
+
+    Methods:
+    - get(request): Handles HTTP GET requests and returns the metrics of all worker processes.
+    """
+
+    def get(self, request):
+        if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS and not request.user.is_staff:
+            return HttpResponse('Brak dostępu', status=403)
+        return HttpResponse(render_metrics(collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class SlowQueryLogView(LoginRequiredMixin, View):
+    """
+    SlowQueryLogView is a Django View class listing the slow SQL statements recorded by SlowQueryMiddleware.
+
+    Only staff users can access it. Entries are the most recent ones of the serving process, grouped by
+    normalized SQL when the "group" query parameter is set.
+
+    Methods:
+    - get(request): Handles HTTP GET requests and renders the slow-query log.
+    """
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return HttpResponse('Brak dostępu', status=403)
+        entries = slow_query_log.recent()
+        groups = None
+        if request.GET.get('group'):
+            groups = {}
+            for entry in entries:
+                group = groups.setdefault(entry['sql'], {'sql': entry['sql'], 'count': 0, 'total_ms': 0,
+                                                         'max_ms': 0, 'callers': set()})
+                group['count'] += 1
+                group['total_ms'] += entry['duration_ms']
+                group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+                group['callers'].add(entry['caller'] or entry['view'])
+            groups = sorted(groups.values(), key=lambda group: group['total_ms'], reverse=True)
+        return render(request, 'slow_queries.html', {'entries': entries, 'groups': groups})
+
+
+class ProfileListView(LoginRequiredMixin, View):
+    """
+    ProfileListView is a Django View class listing the request profiles recorded by ProfilingMiddleware.
+
+    Only staff users can access it.
+
+    Methods:
+    - get(request): Handles HTTP GET requests and renders the list of stored profiles.
+    """
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return HttpResponse('Brak dostępu', status=403)
+        return render(request, 'profiles.html', {'profiles': profile_store.list()})
+
+
+class ProfileView(LoginRequiredMixin, View):
+    """
+    ProfileView is a Django View class showing one request profile, or downloading it with ?download=1.
+
+    Downloads are pstats dumps (.prof) of cProfile profiles, or folded stacks (.folded) of sampled ones.
+    Only staff users can access it.
+
+    Methods:
+    - get(request, profile_id): Handles HTTP GET requests and renders or downloads the profile.
+    """
+
+    def get(self, request, profile_id):
+        if not request.user.is_staff:
+            return HttpResponse('Brak dostępu', status=403)
+        profile = profile_store.get(profile_id)
+        if profile is None:
+            raise Http404('Profil nie istnieje')
+        meta, data = profile
+        if request.GET.get('download'):
+            response = HttpResponse(data, content_type='application/octet-stream')
+            response['Content-Disposition'] = f'attachment; filename="{meta["filename"]}"'
+            return response
+        return render(request, 'profiles.html', {'profile': meta})
+
+
+class CalendarView(LoginRequiredMixin, View):
+    """
+    CalendarView is a Django View class showing a month of the user's game sessions by day.
+
+    Sessions owned by the user and sessions joined by the user's characters are shown in the user's timezone,
+    chosen with the "tz" query parameter and remembered in the session. The grid is built from a single query
+    and cached until a session of the month changes.
+
+    Methods:
+    - get(request, year=None, month=None): Handles HTTP GET requests and renders the month, by default the
+      current one. Months outside CALENDAR_YEARS are answered with 404.
+    """
+
+    def get(self, request, year=None, month=None):
+        zone = user_timezone(request)
+        if year is None:
+            today = timezone.now().astimezone(zone).date()
+            year, month = today.year, today.month
+        if not 1 <= month <= 12 or year not in CALENDAR_YEARS:
+            raise Http404('Nieprawidłowy miesiąc')
+        previous = (year, month - 1) if month > 1 else (year - 1, 12)
+        following = (year, month + 1) if month < 12 else (year + 1, 1)
+        return render(request, 'calendar.html', {
+            'title': f'{month:02}.{year}',
+            'grid': render_grid(request.user, month_days(year, month), zone, month),
+            'previous': reverse('calendar_month', args=previous) if previous[0] in CALENDAR_YEARS else None,
+            'next': reverse('calendar_month', args=following) if following[0] in CALENDAR_YEARS else None,
+            'timezone': zone.key,
+        })
+
+
+class CalendarWeekView(LoginRequiredMixin, View):
+    """
+    CalendarWeekView is a Django View class showing one ISO week of the user's game sessions, like CalendarView.
+
+    Methods:
+    - get(request, year, week): Handles HTTP GET requests and renders the week. Weeks outside CALENDAR_YEARS
+      are answered with 404.
+    """
+
+    def get(self, request, year, week):
+        zone = user_timezone(request)
+        if year not in CALENDAR_YEARS:
+            raise Http404('Nieprawidłowy tydzień')
+        try:
+            days = week_days(year, week)
+        except ValueError:
+            raise Http404('Nieprawidłowy tydzień')
+        previous = (days[0][0] - timedelta(days=7)).isocalendar()
+        following = (days[0][0] + timedelta(days=7)).isocalendar()
+        return render(request, 'calendar.html', {
+            'title': f'{week}/{year}',
+            'grid': render_grid(request.user, days, zone),
+            'previous': reverse('calendar_week', args=[previous.year, previous.week])
+            if previous.year in CALENDAR_YEARS else None,
+            'next': reverse('calendar_week', args=[following.year, following.week])
+            if following.year in CALENDAR_YEARS else None,
+            'timezone': zone.key,
+        })
+
+
+class SessionMessagesView(LoginRequiredMixin, View):
+    """
+    SessionMessagesView is a Django View class for the message log of a game session.
+
+    This view requires authentication. The game master of the session and the players whose characters
+    joined it can access it, also after the session is archived, when the log becomes read-only. Messages
+    are returned oldest first with keyset pagination:
+    - ?after=<id> returns the messages after a known id, and with &wait=1 waits up to CHAT_LONG_POLL_TIMEOUT
+      seconds for new ones (long polling),
+    - ?before=<id> returns the messages before an id, for scrolling back through the history,
+    - without parameters the newest page is returned.
+    Ids that are not integers in the primary key range are answered with 400.
+
+    Methods:
+    - get(request, session_id): Handles HTTP GET requests and returns messages as JSON.
+    - post(request, session_id): Handles HTTP POST requests and appends the posted "body" to the log.
+    """
+
+    def get(self, request, session_id):
+        session = session_for_user(request.user, session_id)
+        if session is None:
+            raise Http404('Sesja nie istnieje')
+        try:
+            after, before = (parse_int(request.GET[name]) if request.GET.get(name) else None
+                             for name in ('after', 'before'))
+        except ValueError:
+            return JsonResponse({'error': 'Nieprawidłowy identyfikator wiadomości'}, status=400)
+        if after is not None:
+            if request.GET.get('wait'):
+                page = wait_for_messages(session, after)
+            else:
+                page = messages_after(session, after)
+        else:
+            page = messages_before(session, before)
+        return JsonResponse({
+            'messages': [message_as_dict(message) for message in page],
+            'last_id': page[-1].pk if page else after,
+        })
+
+    def post(self, request, session_id):
+        session = session_for_user(request.user, session_id)
+        if session is None:
+            raise Http404('Sesja nie istnieje')
+        try:
+            message = post_message(session, request.user, request.POST.get('body', ''))
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        return JsonResponse(message_as_dict(message), status=201)
+
+
+class ActivityView(LoginRequiredMixin, View):
+    """
+    ActivityView is a Django View class returning daily activity trends as JSON, read from the DailyActivity
+    rollups only.
+
+    Game masters get the figures of their own sessions. Staff users get the platform totals, or the figures
+    of one game master with ?game_master=<id>. The range is chosen with ?since= and ?until= (YYYY-MM-DD),
+    defaults to the last 90 complete days and spans at most ANALYTICS_MAX_DAYS days. Malformed dates and
+    game master ids are answered with 400.
+
+    Methods:
+    - get(request): Handles HTTP GET requests and returns one entry per day.
+    """
+
+    def get(self, request):
+        dates = {}
+        for name in ('since', 'until'):
+            value = request.GET.get(name)
+            try:
+                dates[name] = parse_date(value) if value else None
+            except ValueError:
+                dates[name] = None
+            if value and dates[name] is None:
+                return JsonResponse({'error': 'Invalid date'}, status=400)
+        until = dates['until'] or last_complete_day()
+        since = dates['since'] or until - timedelta(days=89)
+        if (until - since).days >= settings.ANALYTICS_MAX_DAYS:
+            return JsonResponse({'error': f'Range longer than {settings.ANALYTICS_MAX_DAYS} days'}, status=400)
+        if request.user.is_staff:
+            owner = request.GET.get('game_master')
+            try:
+                owner = parse_int(owner) if owner else None
+            except ValueError:
+                return JsonResponse({'error': 'Invalid game master'}, status=400)
+        else:
+            game_master = GameMaster.objects.filter(user_id=request.user, is_game_master=True).first()
+            if game_master is None:
+                return HttpResponse('Brak dostępu', status=403)
+            owner = game_master.pk
+        return JsonResponse({'game_master': owner, 'days': activity_series(owner, since, until)})
+
+
+class CampaignExportView(LoginRequiredMixin, View):
+    """
+    CampaignExportView is a Django View class downloading the campaign of the logged-in game master.
+
+    The campaign (sessions, systems, participating characters and their sheets) is streamed as a tar.gz
+    archive while it is generated, so memory use does not grow with the size of the campaign.
+
+    Methods:
+    - get(request): Handles HTTP GET requests and streams the archive.
+    """
+
+    def get(self, request):
+        game_master = get_object_or_404(GameMaster, user_id=request.user, is_game_master=True)
+        response = StreamingHttpResponse(export_campaign(game_master), content_type='application/gzip')
+        filename = f'campaign-{game_master.pk}-{timezone.now():%Y%m%d}.tar.gz'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class PersonalDataExportView(LoginRequiredMixin, View):
+    """
+    PersonalDataExportView is a Django View class downloading the personal data of the logged-in user.
+
+    The account, the game master and player profiles, owned sessions, characters, sheets, session memberships
+    and messages are streamed as one JSON document while they are read from the database.
+
+    Methods:
+    - get(request): Handles HTTP GET requests and streams the document.
+    """
+
+    def get(self, request):
+        response = StreamingHttpResponse(export_personal_data(request.user), content_type='application/json')
+        filename = f'personal-data-{request.user.pk}-{timezone.now():%Y%m%d}.json'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class CampaignRestoreView(LoginRequiredMixin, View):
+    """
+    CampaignRestoreView is a Django View class restoring a campaign archive for the logged-in game master.
+
+    The uploaded "archive" file is read as a stream and its rows are inserted in batches with new ids, in
+    a single transaction.
+
+    Methods:
+    - post(request): Handles HTTP POST requests and returns the number of restored rows per kind as JSON.
+    """
+
+    def post(self, request):
+        game_master = get_object_or_404(GameMaster, user_id=request.user, is_game_master=True)
+        upload = request.FILES.get('archive')
+        if upload is None:
+            return JsonResponse({'error': 'Brak pliku archiwum'}, status=400)
+        try:
+            counts = restore_campaign(upload, game_master)
+        except CampaignError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        return JsonResponse({'restored': counts}, status=201)
@@ -39,11 +39,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'GameMaster_app.middleware.MetricsMiddleware',
+    'GameMaster_app.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'GameMaster_app.middleware.TokenAuthenticationMiddleware',
+    'GameMaster_app.middleware.ProfilingMiddleware',
+    'GameMaster_app.middleware.TrafficCaptureMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -121,3 +126,110 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGIN_URL = 'login'
 LOGOUT_REDIRECT_URL = 'index'
+
+# Number of worker processes of the encounter simulator pool shared by the requests of a server process,
+# 0 runs in-process.
+ENCOUNTER_SIMULATION_WORKERS = 4
+
+# Number of character sheet events between two stored snapshots of the sheet.
+CHARACTER_SHEET_SNAPSHOT_INTERVAL = 50
+
+# Game sessions dated more than this many days ago are moved to the archive tables by archive_sessions.
+SESSION_ARCHIVE_AFTER_DAYS = 180
+
+# Lifetime of signed API bearer tokens in seconds.
+API_TOKEN_MAX_AGE = 60 * 60 * 24
+
+# How often, in seconds, every process reloads the list of revoked API tokens.
+API_TOKEN_REVOCATION_REFRESH = 60
+
+# Reminders are emailed to the game master and players this many minutes before a session starts.
+SESSION_REMINDER_OFFSETS = [24 * 60, 60]
+
+# Number of reminder emails sent per batch over one SMTP connection.
+REMINDER_EMAIL_BATCH_SIZE = 100
+
+# Seconds the reminder dispatcher waits before retrying reminders whose emails could not be sent.
+REMINDER_RETRY_DELAY = 60
+
+DEFAULT_FROM_EMAIL = 'noreply@mastergame.local'
+
+# Background job queue: first retry delay in seconds (doubled on every attempt), how often a worker renews the
+# lease of its running jobs and the time without renewal after which a running job is queued again.
+JOB_RETRY_BACKOFF = 30
+JOB_HEARTBEAT_INTERVAL = 60
+JOB_STALE_AFTER = 5 * 60
+
+# Lifetime of session invitation links in seconds.
+INVITATION_MAX_AGE = 60 * 60 * 24 * 7
+
+# Rate limits per view as {key: (requests, period in seconds)}, counted in the default cache. In production the
+# cache has to be shared by all workers (Memcached or Redis) for the limits to apply across processes.
+RATE_LIMITS = {
+    'login': {'ip': (20, 60), 'username': (5, 60)},
+    'register': {'ip': (5, 60 * 60)},
+    'add_session': {'user': (30, 60 * 60)},
+}
+
+# Directory shared by all worker processes for metric snapshots, None exports only the serving process.
+METRICS_DIR = None
+METRICS_FLUSH_INTERVAL = 5
+METRICS_ALLOWED_IPS = ['127.0.0.1']
+
+# SQL statements of requests slower than this many milliseconds are kept, with their EXPLAIN plan, in a
+# per-process ring buffer of SLOW_QUERY_LOG_SIZE entries shown to staff at /slow_queries/.
+SLOW_QUERY_THRESHOLD_MS = 200
+SLOW_QUERY_EXPLAIN = True
+SLOW_QUERY_LOG_SIZE = 200
+
+# Request profiles of staff users (X-Profile header or _profile parameter): number kept, shared directory for
+# all worker processes (None keeps them in memory) and the interval of the sampling profiler in seconds.
+PROFILE_RING_SIZE = 20
+PROFILE_DIR = None
+PROFILE_SAMPLE_INTERVAL = 0.005
+
+# Lifetime in seconds of cached calendar grids; grids are also invalidated when a session of their month changes.
+CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Session message log: page size, longest message, and how long a long-polling request waits for new messages
+# and how often it checks the cache meanwhile, in seconds.
+CHAT_PAGE_SIZE = 100
+CHAT_MESSAGE_MAX_LENGTH = 2000
+CHAT_LONG_POLL_TIMEOUT = 25
+CHAT_POLL_INTERVAL = 0.5
+
+# A day is added to the daily activity rollups this many seconds after it ends, so late writes are included.
+ANALYTICS_ROLLUP_LAG = 60 * 60
+# Longest range of days the activity trends can be requested for at once.
+ANALYTICS_MAX_DAYS = 366
+
+# Admin changelists on PostgreSQL show planner estimates instead of COUNT(*) for results of at least this size.
+ADMIN_EXACT_COUNT_LIMIT = 10000
+
+# Rows read per query and written per archive member when exporting a campaign.
+CAMPAIGN_EXPORT_CHUNK_SIZE = 2000
+
+# Session recommendations: number stored per player, and players scored per NumPy block (also the insert batch).
+RECOMMENDATIONS_TOP_K = 10
+RECOMMENDATIONS_PLAYER_CHUNK = 1000
+
+# Rows read per query and written per piece of the streamed personal data export.
+PERSONAL_DATA_CHUNK_SIZE = 2000
+
+# Account deletion: rows deleted per committed batch, and seconds to pause between batches so other writers proceed.
+ACCOUNT_DELETION_BATCH_SIZE = 500
+ACCOUNT_DELETION_BATCH_PAUSE = 0.05
+
+# Traffic capture: JSON Lines file the sampled request traces are appended to (None disables the capture),
+# and the share of requests sampled.
+TRAFFIC_CAPTURE_FILE = None
+TRAFFIC_CAPTURE_RATE = 0.01
+# Parameters, JSON keys and URL kwargs whose number, date and checkbox values are kept in traces; all other values
+# are masked.
+TRAFFIC_KEPT_PARAMETERS = ['page', 'after', 'before', 'cursor', 'limit', 'wait', 'download', 'group', 'as_of', 'since',
+                           'until', 'game_master', 'character', 'slots', 'date', 'is_public', 'is_open',
+                           'is_game_master', 'reserve_slot', 'life_points', 'wealth', 'reputation', 'session_id',
+                           'character_id', 'year', 'month', 'week', 'id', 'session', 'fights', 'count', 'attack',
+                           'defense', 'damage', 'damage_bonus', 'max_rounds']
+# URL names replay_traffic never replays, because their requests change state irreversibly.
+TRAFFIC_REPLAY_SKIPPED_VIEWS = ['delete_account', 'logout', 'campaign_restore', 'api_token_revoke']
@@ -15,16 +15,41 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
 from django.contrib.auth import views as auth_views
-from GameMaster_app.views import IndexView, RegisterView, DashboardView, AddSessionView, UserSettingsView
+from GameMaster_app.views import (IndexView, RegisterView, DashboardView, AddSessionView, UserSettingsView,
+                                  EncounterSimulationView, CharacterSheetHistoryView, PartyEffectView,
+                                  CreateInvitationView, InvitationView, MetricsView, SlowQueryLogView,
+                                  ProfileListView, ProfileView, CalendarView, CalendarWeekView,
+                                  SessionMessagesView, ActivityView, CampaignExportView, CampaignRestoreView,
+                                  PersonalDataExportView, AccountDeletionView, SessionDetailView)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/v1/', include('GameMaster_app.api_urls')),
     path('', IndexView.as_view(), name="index"),
     path('register/', RegisterView.as_view(), name="register"),
     path('dashboard/', DashboardView.as_view(), name="dashboard"),
     path('logout/', auth_views.LogoutView.as_view(), name="logout"),
     path('add_session/', AddSessionView.as_view(), name="add_session"),
-    path('settings/', UserSettingsView.as_view(), name="settings")
+    path('settings/', UserSettingsView.as_view(), name="settings"),
+    path('settings/export/', PersonalDataExportView.as_view(), name="personal_data_export"),
+    path('settings/delete/', AccountDeletionView.as_view(), name="delete_account"),
+    path('session/<int:session_id>/', SessionDetailView.as_view(), name="session_detail"),
+    path('session/<int:session_id>/simulate/', EncounterSimulationView.as_view(), name="simulate_encounter"),
+    path('session/<int:session_id>/party_effect/', PartyEffectView.as_view(), name="party_effect"),
+    path('session/<int:session_id>/invite/', CreateInvitationView.as_view(), name="create_invitation"),
+    path('session/<int:session_id>/messages/', SessionMessagesView.as_view(), name="session_messages"),
+    path('invite/<str:token>/', InvitationView.as_view(), name="invitation"),
+    path('campaign/export/', CampaignExportView.as_view(), name="campaign_export"),
+    path('campaign/restore/', CampaignRestoreView.as_view(), name="campaign_restore"),
+    path('calendar/', CalendarView.as_view(), name="calendar"),
+    path('calendar/<int:year>/<int:month>/', CalendarView.as_view(), name="calendar_month"),
+    path('calendar/week/<int:year>/<int:week>/', CalendarWeekView.as_view(), name="calendar_week"),
+    path('character/<int:character_id>/history/', CharacterSheetHistoryView.as_view(), name="character_history"),
+    path('analytics/', ActivityView.as_view(), name="analytics"),
+    path('metrics', MetricsView.as_view(), name="metrics"),
+    path('slow_queries/', SlowQueryLogView.as_view(), name="slow_queries"),
+    path('profiles/', ProfileListView.as_view(), name="profiles"),
+    path('profiles/<str:profile_id>/', ProfileView.as_view(), name="profile"),
 ]
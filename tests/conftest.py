@@ -1,9 +1,12 @@
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.urls import reverse
 from django.test import Client
+from django.utils import timezone
 import pytest
 
-from GameMaster_app.models import GameMaster
+from GameMaster_app.models import CharacterSheet, GameMaster, GameSession, Player, PlayerCharacter
+from GameMaster_app.tokens import revoked_tokens
 
 
 @pytest.fixture
@@ -46,3 +49,40 @@ def settings_url():
 @pytest.fixture
 def add_session_url():
     return reverse('add_session')
+
+
+@pytest.fixture
+def game_session(gamemaster):
+    return GameSession.objects.create(
+        owner_id=GameMaster.objects.get(user_id=gamemaster),
+        title='Test Session',
+        slots=6,
+        session_date=timezone.now(),
+    )
+
+
+@pytest.fixture
+def party(game_session):
+    user = User.objects.create_user(username='testplayer', password='testpassword')
+    player = Player.objects.create(user_id=user, player_nickname='testplayer')
+    characters = []
+    for name in ['Aragorn', 'Legolas', 'Gimli']:
+        character = PlayerCharacter.objects.create(owner_id=player, name=name, description='')
+        character.game_session_id.add(game_session)
+        CharacterSheet.objects.create(character_id=character, strength=14, dexterity=12, life_points=30)
+        characters.append(character)
+    return characters
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reload_revoked_tokens():
+    """
+    Makes every test reload the revocation list, so entries of rolled back rows do not outlive their test.
+    """
+    yield
+    revoked_tokens.loaded_at = None
@@ -0,0 +1,69 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from GameMaster_app import jobs
+from GameMaster_app.accounts import request_deletion, run_deletion
+from GameMaster_app.chat import post_message
+from GameMaster_app.models import (AccountDeletion, CharacterSheet, CharacterSheetEvent, GameMaster, GameSession,
+                                   Job, PlayerCharacter, SessionMessage)
+from GameMaster_app.tokens import TokenError, read_token
+
+
+@pytest.fixture(autouse=True)
+def no_pause(settings):
+    settings.ACCOUNT_DELETION_BATCH_PAUSE = 0
+
+
+@pytest.mark.django_db
+def test_player_deleted_in_batches(party, game_session):
+    """
+    Test that a player's characters, sheets and links are deleted batch by batch, while their messages in other
+    sessions are kept without author and the game master's session is untouched.
+    """
+    player = User.objects.get(username='testplayer')
+    post_message(game_session, player, 'Do zobaczenia')
+    deletion = request_deletion(player, queue=False)
+    player.refresh_from_db()
+    assert not player.is_active and not player.has_usable_password()
+    batches = list(run_deletion(deletion, batch_size=2))
+    assert len(batches) > 3 and max(batches) <= 2
+    deletion.refresh_from_db()
+    assert deletion.status == AccountDeletion.Status.DONE and deletion.progress() == 1.0
+    assert deletion.deleted_rows >= deletion.total_rows > 0
+    assert not User.objects.filter(username='testplayer').exists()
+    assert not PlayerCharacter.objects.exists() and not CharacterSheet.objects.exists()
+    assert not CharacterSheetEvent.objects.exists()
+    assert SessionMessage.objects.get().user_id is None
+    assert GameSession.objects.filter(pk=game_session.pk).exists()
+
+
+@pytest.mark.django_db
+def test_game_master_deletion_view_queues_job(client, party, game_session, index_url):
+    """
+    Test that the deletion view disables and logs out the user at once, and that the queued job deletes the
+    game master's sessions and profile but leaves the players' characters.
+    """
+    client.login(username='testuser', password='testpassword')
+    response = client.post(reverse('delete_account'))
+    assert response.status_code == 302 and response.url == index_url
+    assert not User.objects.get(username='testuser').is_active
+    assert '_auth_user_id' not in client.session
+    assert Job.objects.get().name == 'delete_account'
+    assert jobs.run_job(jobs.claim_jobs('worker', 1)[0])
+    assert not GameSession.objects.exists() and not GameMaster.objects.exists()
+    assert PlayerCharacter.objects.count() == 3
+    assert AccountDeletion.objects.get().status == AccountDeletion.Status.DONE
+
+
+@pytest.mark.django_db
+def test_deletion_revokes_api_tokens(client, gamemaster):
+    """
+    Test that API tokens issued before the deletion request are rejected at once.
+    """
+    token = client.post(reverse('api_token'), {'username': 'testuser', 'password': 'testpassword'}).json()['token']
+    assert client.get(reverse('api_sessions'), HTTP_AUTHORIZATION=f'Bearer {token}').status_code == 200
+    request_deletion(gamemaster, queue=False)
+    with pytest.raises(TokenError):
+        read_token(token)
+    assert client.get(reverse('api_sessions'), HTTP_AUTHORIZATION=f'Bearer {token}').status_code == 401
@@ -0,0 +1,50 @@
+import pytest
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from GameMaster_app.admin import EstimatedCountPaginator
+from GameMaster_app.models import CharacterSheetEvent, GameSession
+
+
+@pytest.fixture
+def superuser(client):
+    User.objects.create_superuser(username='admin', password='adminpassword')
+    client.login(username='admin', password='adminpassword')
+
+
+@pytest.mark.django_db
+def test_every_model_changelist(client, superuser, party):
+    """
+    Test that every model of the app is registered and that its changelist runs no COUNT over the whole table.
+    """
+    models = [model for model in admin.site._registry if model._meta.app_label == 'GameMaster_app']
+    assert len(models) == 22
+    for model in models:
+        url = reverse(f'admin:GameMaster_app_{model._meta.model_name}_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get(url).status_code == 200
+        counts = [query['sql'] for query in queries if 'COUNT(*)' in query['sql'].upper()]
+        assert len(counts) <= 1, model
+
+
+@pytest.mark.django_db
+def test_changelist_filters_and_append_only(client, superuser, party, game_session):
+    """
+    Test the indexed list filters and that append-only logs cannot be changed in the admin.
+    """
+    url = reverse('admin:GameMaster_app_gamesession_changelist')
+    assert 'Test Session' in client.get(url, {'is_open__exact': '1'}).content.decode()
+    url = reverse('admin:GameMaster_app_playercharacter_changelist')
+    assert 'Aragorn' not in client.get(url, {'character_status__exact': 'Dead'}).content.decode()
+    assert not admin.site._registry[CharacterSheetEvent].has_change_permission(None)
+
+
+@pytest.mark.django_db
+def test_estimated_paginator_is_exact_on_sqlite(game_session):
+    """
+    Test that the paginator counts exactly on databases without planner statistics.
+    """
+    assert EstimatedCountPaginator(GameSession.objects.all(), 10).count == 1
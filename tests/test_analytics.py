@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from GameMaster_app.analytics import update_rollups
+from GameMaster_app.models import DailyActivity, GameSession, PlayerCharacter, RollupWatermark
+
+DAY = datetime(2026, 5, 10, 18, 0, tzinfo=dt_timezone.utc)
+
+
+@pytest.fixture
+def played_session(game_session, party):
+    GameSession.objects.filter(pk=game_session.pk).update(creation_date=DAY - timedelta(days=3), session_date=DAY)
+    PlayerCharacter.objects.filter(pk__in=[character.pk for character in party]).update(creation_date=DAY)
+    character = PlayerCharacter.objects.get(pk=party[0].pk)
+    character.character_status = PlayerCharacter.CharacterStatus.DEAD
+    character.save()
+    PlayerCharacter.objects.filter(pk=character.pk).update(death_date=DAY)
+    return game_session
+
+
+@pytest.mark.django_db
+def test_daily_rollups(played_session):
+    """
+    Test that whole days are rolled up per game master and in total, and that the watermark advances.
+    """
+    assert update_rollups(now=DAY + timedelta(days=2)) == 4
+    total = DailyActivity.objects.get(day=DAY.date(), owner_id__isnull=True)
+    assert (total.slots_offered, total.slots_filled, total.active_players) == (6, 3, 1)
+    assert (total.characters_created, total.characters_died) == (3, 1)
+    owner = DailyActivity.objects.get(day=DAY.date(), owner_id=played_session.owner_id)
+    assert (owner.slots_filled, owner.characters_created) == (3, 0)
+    assert DailyActivity.objects.get(day=(DAY - timedelta(days=3)).date(), owner_id__isnull=True).sessions_created == 1
+    assert RollupWatermark.objects.get().day == (DAY + timedelta(days=1)).date()
+
+
+@pytest.mark.django_db
+def test_rollups_are_incremental(played_session):
+    """
+    Test that a run only computes the days after the watermark.
+    """
+    update_rollups(now=DAY - timedelta(days=1))
+    assert not DailyActivity.objects.filter(day=DAY.date()).exists()
+    GameSession.objects.filter(pk=played_session.pk).update(creation_date=DAY - timedelta(days=30))
+    update_rollups(now=DAY + timedelta(days=2))
+    assert DailyActivity.objects.filter(day=DAY.date()).exists()
+    assert DailyActivity.objects.filter(sessions_created=1, owner_id__isnull=True).count() == 1
+    assert update_rollups(now=DAY + timedelta(days=2)) == 0
+
+
+@pytest.mark.django_db
+def test_activity_view(client, played_session):
+    """
+    Test that game masters get their own series and other users without staff rights are refused.
+    """
+    update_rollups(now=DAY + timedelta(days=2))
+    client.login(username='testuser', password='testpassword')
+    response = client.get(reverse('analytics'), {'since': '2026-05-09', 'until': '2026-05-11'})
+    days = response.json()['days']
+    assert [day['slots_filled'] for day in days] == [0, 3, 0]
+    assert client.get(reverse('analytics'), {'since': 'yesterday'}).status_code == 400
+    assert client.get(reverse('analytics'), {'until': '2026-02-30'}).status_code == 400
+    assert client.get(reverse('analytics'), {'since': '2020-01-01', 'until': '2026-05-11'}).status_code == 400
+    client.login(username='testplayer', password='testpassword')
+    assert client.get(reverse('analytics')).status_code == 403
+    User.objects.filter(username='testplayer').update(is_staff=True)
+    response = client.get(reverse('analytics'), {'since': '2026-05-10', 'until': '2026-05-10'})
+    assert response.json()['days'][0]['characters_died'] == 1
+    assert client.get(reverse('analytics'), {'game_master': 'abc'}).status_code == 400
+    assert client.get(reverse('analytics'), {'game_master': '9' * 30}).status_code == 400
@@ -0,0 +1,119 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from GameMaster_app.api import encode_cursor
+from GameMaster_app.archive import archive_batch
+from GameMaster_app.models import GameSession
+
+
+@pytest.mark.django_db
+def test_api_requires_authentication(client):
+    """
+    Test that the API answers anonymous requests with 401 instead of redirecting to the login page.
+    """
+    response = client.get(reverse('api_sessions'))
+    assert response.status_code == 401
+    assert response.json() == {'error': 'Authentication required'}
+
+
+@pytest.mark.django_db
+def test_api_cursor_pagination(client, game_session):
+    """
+    Test that the session list is paginated with an opaque cursor.
+    """
+    for number in range(4):
+        GameSession.objects.create(owner_id=game_session.owner_id, title=f'Session {number}',
+                                   session_date=timezone.now())
+    client.login(username='testuser', password='testpassword')
+    first = client.get(reverse('api_sessions'), {'limit': 3}).json()
+    assert len(first['data']) == 3
+    second = client.get(reverse('api_sessions'), {'limit': 3, 'cursor': first['next']}).json()
+    assert len(second['data']) == 2
+    assert second['next'] is None
+    ids = [row['id'] for row in first['data'] + second['data']]
+    assert ids == sorted(ids)
+    assert client.get(reverse('api_sessions'), {'cursor': '!!'}).status_code == 400
+    assert client.get(reverse('api_sessions'), {'cursor': encode_cursor(10 ** 20)}).status_code == 400
+    assert client.get(reverse('api_session', args=[10 ** 20])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_api_sparse_fieldsets_narrow_select(client, party):
+    """
+    Test that ?fields= narrows both the response and the SQL SELECT, and that related ids are loaded
+    with one extra query.
+    """
+    client.login(username='testplayer', password='testpassword')
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('api_characters'), {'fields': 'name,sessions'})
+    data = response.json()['data']
+    assert data[0].keys() == {'id', 'name', 'sessions'}
+    select = [query['sql'] for query in queries if 'GameMaster_app_playercharacter"."name' in query['sql']][0]
+    assert 'description' not in select
+    assert client.get(reverse('api_characters'), {'fields': 'password'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_api_etag(client, party):
+    """
+    Test that responses carry a strong ETag and that a matching If-None-Match gives 304.
+    """
+    client.login(username='testplayer', password='testpassword')
+    url = reverse('api_sheet', args=[party[0].pk])
+    response = client.get(url)
+    etag = response['ETag']
+    assert response.json()['data']['life_points'] == 30
+    assert etag.startswith('"')
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+@pytest.mark.django_db
+def test_api_session_detail_falls_back_to_archive(client, game_session):
+    """
+    Test that an archived session is still served by the session detail endpoint.
+    """
+    game_session.session_date = timezone.now() - timedelta(days=365)
+    game_session.save()
+    archive_batch(timezone.now())
+    client.login(username='testuser', password='testpassword')
+    response = client.get(reverse('api_session', args=[game_session.pk]), {'fields': 'title'})
+    assert response.json() == {'data': {'id': game_session.pk, 'title': 'Test Session'}}
+
+
+@pytest.mark.django_db
+def test_api_batch_coalesces_queries(client, party, game_session):
+    """
+    Test that the batch endpoint resolves a whole session page and loads each resource with one query.
+    """
+    client.login(username='testplayer', password='testpassword')
+    requests = [
+        {'resource': 'sessions', 'id': game_session.pk, 'fields': 'title,owner'},
+        {'resource': 'game_masters', 'id': game_session.owner_id_id, 'fields': 'nickname'},
+        {'resource': 'characters', 'session': game_session.pk, 'fields': 'name'},
+        {'resource': 'systems', 'session': game_session.pk},
+    ] + [{'resource': 'sheets', 'id': character.pk, 'fields': 'life_points'} for character in party] + [
+        {'resource': 'sheets', 'id': 0},
+        {'resource': 'dragons', 'id': 1},
+        {'resource': 'sheets', 'id': 1.5},
+        {'resource': 'sheets', 'id': 10 ** 20},
+        {'resource': 'sheets', 'id': float('inf')},
+        {'resource': 'characters', 'session': True},
+    ]
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(reverse('api_batch'), json.dumps({'requests': requests}),
+                               content_type='application/json')
+    responses = response.json()['responses']
+    assert responses[0]['data']['title'] == 'Test Session'
+    assert responses[1]['data'] == {'id': game_session.owner_id_id, 'nickname': 'testnickname'}
+    assert [row['name'] for row in responses[2]['data']] == ['Aragorn', 'Legolas', 'Gimli']
+    assert responses[3]['data'] == []
+    assert [item['data']['life_points'] for item in responses[4:7]] == [30, 30, 30]
+    assert [item['status'] for item in responses[7:]] == [404, 400, 400, 400, 400, 400]
+    sheet_queries = [query for query in queries if 'FROM "GameMaster_app_charactersheet"' in query['sql']]
+    assert len(sheet_queries) == 1
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from GameMaster_app.archive import archive_batch, archive_cutoff, get_session, session_characters, session_systems
+from GameMaster_app.chat import post_message
+from GameMaster_app.models import (ArchivedGameSession, ArchivedSessionMessage, GameMaster, GameSession, GameSystem,
+                                   SessionMessage)
+
+
+@pytest.mark.django_db
+def test_archive_batch_moves_old_sessions(party, game_session):
+    """
+    Test that sessions older than the cutoff are moved with their systems, character links and messages, and
+    that reads fall back to the archive transparently.
+    """
+    game_session.session_date = timezone.now() - timedelta(days=400)
+    game_session.save()
+    GameSystem.objects.create(session_id=game_session, system='Rpg1')
+    message = post_message(game_session, game_session.owner_id.user_id, 'Do zobaczenia')
+    recent = GameSession.objects.create(owner_id=game_session.owner_id, title='Recent', session_date=timezone.now())
+    assert archive_batch(archive_cutoff(180)) == 1
+    assert archive_batch(archive_cutoff(180)) == 0
+    assert list(GameSession.objects.all()) == [recent]
+    assert not GameSystem.objects.exists()
+    assert not SessionMessage.objects.exists()
+    assert ArchivedSessionMessage.objects.get(session_id=game_session.pk).pk == message.pk
+    session = get_session(game_session.pk)
+    assert isinstance(session, ArchivedGameSession)
+    assert session.title == 'Test Session'
+    assert list(session_systems(session).values_list('system', flat=True)) == ['Rpg1']
+    assert set(session_characters(session)) == set(party)
+    assert get_session(recent.pk) == recent
+
+
+@pytest.mark.django_db
+def test_archive_sessions_command(gamemaster, capsys):
+    """
+    Test that the archive_sessions command archives in batches and stops after max_batches.
+    """
+    owner = GameMaster.objects.get(user_id=gamemaster)
+    for number in range(5):
+        GameSession.objects.create(owner_id=owner, title=f'Old {number}',
+                                   session_date=timezone.now() - timedelta(days=365 + number))
+    call_command('archive_sessions', batch_size=2, max_batches=2)
+    assert GameSession.objects.count() == 1
+    call_command('archive_sessions', batch_size=2)
+    assert ArchivedGameSession.objects.count() == 5
+    assert 'Done, 1 sessions archived' in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_archived_session_stays_reachable(client, party, game_session):
+    """
+    Test that an archived session is still shown in the calendar, its detail page and the character history.
+    """
+    moment = timezone.now() - timedelta(days=400)
+    game_session.session_date = moment
+    game_session.save()
+    GameSystem.objects.create(session_id=game_session, system='Rpg1')
+    archive_batch(archive_cutoff(180))
+    client.login(username='testplayer', password='testpassword')
+    month = client.get(reverse('calendar_month', args=[moment.year, moment.month])).content.decode()
+    assert reverse('session_detail', args=[game_session.pk]) in month
+    data = client.get(reverse('session_detail', args=[game_session.pk])).json()
+    assert data['archived'] and data['systems'] == ['Rpg1']
+    assert {character['name'] for character in data['characters']} == {'Aragorn', 'Legolas', 'Gimli'}
+    client.login(username='testuser', password='testpassword')
+    assert client.get(reverse('character_history', args=[party[0].pk])).status_code == 200
+    ArchivedGameSession.objects.filter(pk=game_session.pk).update(is_public=False)
+    client.force_login(User.objects.create_user(username='other', password='testpassword'))
+    assert client.get(reverse('session_detail', args=[game_session.pk])).status_code == 404
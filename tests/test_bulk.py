@@ -0,0 +1,54 @@
+import pytest
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from GameMaster_app import bulk
+from GameMaster_app.models import CharacterSheet, CharacterSheetEvent, GameMaster, GameSession, PlayerCharacter
+
+
+@pytest.mark.django_db
+def test_bulk_create_sessions_enforced_by_database(gamemaster):
+    """
+    Test that bulk created sessions are bounded by the slots check constraint and that a violation
+    rolls back the whole batch.
+    """
+    owner = GameMaster.objects.get(user_id=gamemaster)
+    sessions = [GameSession(owner_id=owner, title=f'Session {slots}', slots=slots, session_date=timezone.now())
+                for slots in [1, 6]]
+    assert len(bulk.bulk_create(GameSession, sessions)) == 2
+    invalid = [GameSession(owner_id=owner, title='Fine', slots=2, session_date=timezone.now()),
+               GameSession(owner_id=owner, title='Too big', slots=7, session_date=timezone.now())]
+    with pytest.raises(ValidationError) as error:
+        bulk.bulk_create(GameSession, invalid)
+    assert error.value.code == 'gamesession_slots_range'
+    assert GameSession.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_update_sheets(party, gamemaster):
+    """
+    Test that bulk updated character sheets are bounded by the check constraints and that valid updates
+    are recorded in the change log.
+    """
+    sheets = list(CharacterSheet.objects.order_by('pk'))
+    for sheet in sheets:
+        sheet.strength = 20
+    assert bulk.bulk_update(CharacterSheet, sheets, ['strength'], changed_by=gamemaster) == 3
+    event = CharacterSheetEvent.objects.get(sheet_id=sheets[0], sequence=2)
+    assert event.changes == {'strength': [14, 20]}
+    sheets[1].life_points = 101
+    with pytest.raises(ValidationError) as error:
+        bulk.bulk_update(CharacterSheet, sheets, ['life_points'])
+    assert error.value.code == 'charactersheet_life_points_range'
+    assert not CharacterSheet.objects.filter(life_points=101).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_create_sheets_start_change_log(party):
+    """
+    Test that character sheets created in bulk get their first change log event.
+    """
+    character = PlayerCharacter.objects.create(owner_id=party[0].owner_id, name='Frodo', description='')
+    bulk.bulk_create(CharacterSheet, [CharacterSheet(character_id=character, age=50)])
+    event = CharacterSheetEvent.objects.get(sheet_id=character.pk)
+    assert event.changes['age'] == [None, 50]
@@ -0,0 +1,92 @@
+from datetime import datetime, timezone as dt_timezone
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from GameMaster_app.archive import archive_batch, archive_cutoff
+from GameMaster_app.models import GameSession
+
+
+def session_queries(queries):
+    return [query for query in queries if 'FROM "GameMaster_app_gamesession"' in query['sql']]
+
+
+@pytest.mark.django_db
+def test_month_grid_in_user_timezone(client, game_session, party):
+    """
+    Test that a player sees joined sessions on their local date, loaded with one session query.
+    """
+    game_session.session_date = datetime(2026, 3, 31, 23, 30, tzinfo=dt_timezone.utc)
+    game_session.save()
+    client.login(username='testplayer', password='testpassword')
+    url = reverse('calendar_month', args=[2026, 4])
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, {'tz': 'Europe/Warsaw'})
+    content = response.content.decode()
+    assert response.status_code == 200
+    assert '01:30 Test Session' in content
+    assert len(session_queries(queries)) == 1
+    assert client.get(reverse('calendar_month', args=[2026, 2])).content.decode().count('Test Session') == 0
+
+
+@pytest.mark.django_db
+def test_month_grid_is_cached_and_invalidated(client, game_session, gamemaster):
+    """
+    Test that a cached grid is served without queries and rendered again when a session of the month changes.
+    """
+    client.login(username='testuser', password='testpassword')
+    moment = game_session.session_date
+    url = reverse('calendar_month', args=[moment.year, moment.month])
+    client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    assert not session_queries(queries)
+    session = GameSession.objects.get(pk=game_session.pk)
+    session.title = 'Renamed Session'
+    session.save()
+    assert 'Renamed Session' in client.get(url).content.decode()
+
+
+@pytest.mark.django_db
+def test_week_view(client, game_session, gamemaster):
+    """
+    Test that the ISO week containing a session shows it.
+    """
+    client.login(username='testuser', password='testpassword')
+    week = game_session.session_date.isocalendar()
+    response = client.get(reverse('calendar_week', args=[week.year, week.week]))
+    assert 'Test Session' in response.content.decode()
+    assert client.get(reverse('calendar_week', args=[2026, 60])).status_code == 404
+    assert client.get(reverse('calendar_week', args=[1, 1])).status_code == 404
+    assert client.get(reverse('calendar_week', args=[9999, 52])).status_code == 404
+    last = client.get(reverse('calendar_week', args=[2100, 52])).content.decode()
+    assert 'Następny' not in last and 'Poprzedni' in last
+
+
+@pytest.mark.django_db
+def test_month_navigation_stops_at_calendar_edges(client, gamemaster):
+    """
+    Test that months outside the calendar years are not found and the edge months link only inwards.
+    """
+    client.login(username='testuser', password='testpassword')
+    assert client.get(reverse('calendar_month', args=[1899, 12])).status_code == 404
+    assert client.get(reverse('calendar_month', args=[2101, 1])).status_code == 404
+    first = client.get(reverse('calendar_month', args=[1900, 1])).content.decode()
+    assert 'Poprzedni' not in first and reverse('calendar_month', args=[1900, 2]) in first
+    last = client.get(reverse('calendar_month', args=[2100, 12])).content.decode()
+    assert 'Następny' not in last and reverse('calendar_month', args=[2100, 11]) in last
+
+
+@pytest.mark.django_db
+def test_month_grid_reads_recent_archive(client, game_session, gamemaster):
+    """
+    Test that a session archived with a cutoff shorter than SESSION_ARCHIVE_AFTER_DAYS stays on the calendar.
+    """
+    moment = game_session.session_date
+    archive_batch(archive_cutoff(0))
+    assert not GameSession.objects.exists()
+    client.login(username='testuser', password='testpassword')
+    response = client.get(reverse('calendar_month', args=[moment.year, moment.month]))
+    assert 'Test Session' in response.content.decode()
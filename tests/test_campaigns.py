@@ -0,0 +1,129 @@
+import io
+import json
+import tarfile
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+
+from GameMaster_app.archive import archive_batch, archive_cutoff
+from GameMaster_app.campaigns import FORMAT_VERSION, CampaignError, export_campaign, restore_campaign
+from GameMaster_app.models import CharacterSheet, GameMaster, GameSession, GameSystem, PlayerCharacter
+
+
+@pytest.mark.django_db
+def test_export_is_streamed_in_chunks(game_session, party, settings):
+    """
+    Test that the archive is yielded in pieces, one per member of at most CAMPAIGN_EXPORT_CHUNK_SIZE rows.
+    """
+    settings.CAMPAIGN_EXPORT_CHUNK_SIZE = 1
+    pieces = list(export_campaign(GameMaster.objects.get(pk=game_session.owner_id_id)))
+    assert len(pieces) > 9
+    assert b''.join(pieces)[:2] == b'\x1f\x8b'
+
+
+@pytest.mark.django_db
+def test_restore_remaps_ids(client, game_session, party):
+    """
+    Test that a downloaded campaign is restored for another game master with new ids.
+    """
+    GameSystem.objects.create(session_id=game_session, system=GameSystem.GameSystem.choices[0][0])
+    client.login(username='testuser', password='testpassword')
+    response = client.get(reverse('campaign_export'))
+    archive = b''.join(response.streaming_content)
+    user = User.objects.create_user(username='othermaster', password='testpassword')
+    other = GameMaster.objects.create(user_id=user, user_nickname='other', is_game_master=True)
+    counts = restore_campaign(io.BytesIO(archive), other)
+    assert counts == {'sessions': 1, 'systems': 1, 'characters': 3, 'links': 3, 'sheets': 3, 'skipped': 0}
+    restored = GameSession.objects.get(owner_id=other)
+    assert restored.pk != game_session.pk
+    assert GameSystem.objects.filter(session_id=restored).count() == 1
+    characters = PlayerCharacter.objects.filter(game_session_id=restored)
+    assert sorted(characters.values_list('name', flat=True)) == ['Aragorn', 'Gimli', 'Legolas']
+    assert {character.owner_id.user_id for character in characters} == {user}
+    assert CharacterSheet.objects.filter(character_id__in=characters, strength=14).count() == 3
+
+
+@pytest.mark.django_db
+def test_restore_view_rejects_bad_archive(client, gamemaster):
+    """
+    Test that an invalid upload is refused without restoring anything.
+    """
+    client.login(username='testuser', password='testpassword')
+    upload = io.BytesIO(b'not an archive')
+    upload.name = 'campaign.tar.gz'
+    response = client.post(reverse('campaign_restore'), {'archive': upload})
+    assert response.status_code == 400
+    with pytest.raises(CampaignError):
+        restore_campaign(io.BytesIO(b''), GameMaster.objects.get(user_id=gamemaster))
+
+
+def campaign_archive(members):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for name, rows in [('manifest.json', {'version': FORMAT_VERSION})] + members:
+            content = (json.dumps(rows) if name == 'manifest.json'
+                       else ''.join(json.dumps(row) + '\n' for row in rows)).encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return io.BytesIO(buffer.getvalue())
+
+
+@pytest.mark.django_db
+def test_restore_ignores_foreign_keys_and_limits_members(game_session, settings):
+    """
+    Test that owner keys smuggled into archive rows are ignored and that oversized or malformed members are
+    refused.
+    """
+    owner = GameMaster.objects.get(pk=game_session.owner_id_id)
+    user = User.objects.create_user(username='othermaster', password='testpassword')
+    other = GameMaster.objects.create(user_id=user, user_nickname='other', is_game_master=True)
+    row = {'id': 1, 'title': 'Przejęta', 'slots': 3, 'session_date': '2030-01-01T18:00:00Z', 'is_public': False,
+           'is_open': True, 'creation_date': '2029-12-01T18:00:00Z', 'owner_id_id': owner.pk}
+    restore_campaign(campaign_archive([('sessions/000001.jsonl', [row])]), other)
+    assert GameSession.objects.get(title='Przejęta').owner_id == other
+    settings.CAMPAIGN_EXPORT_CHUNK_SIZE = 1
+    with pytest.raises(CampaignError):
+        restore_campaign(campaign_archive([('sessions/000001.jsonl', [row, row])]), other)
+    with pytest.raises(CampaignError):
+        restore_campaign(campaign_archive([('sessions/000001.jsonl', [['not', 'a', 'row']])]), other)
+    assert GameSession.objects.filter(title='Przejęta').count() == 1
+
+
+@pytest.mark.django_db
+def test_export_includes_archived_sessions(game_session, party):
+    """
+    Test that archived sessions, their systems and players are exported and restored.
+    """
+    game_session.session_date = timezone.now() - timedelta(days=400)
+    game_session.save()
+    GameSystem.objects.create(session_id=game_session, system=GameSystem.GameSystem.choices[0][0])
+    archive_batch(archive_cutoff(180))
+    archive = b''.join(export_campaign(GameMaster.objects.get(pk=game_session.owner_id_id)))
+    user = User.objects.create_user(username='othermaster', password='testpassword')
+    other = GameMaster.objects.create(user_id=user, user_nickname='other', is_game_master=True)
+    counts = restore_campaign(io.BytesIO(archive), other)
+    assert counts == {'sessions': 1, 'systems': 1, 'characters': 3, 'links': 3, 'sheets': 3, 'skipped': 0}
+
+
+@pytest.mark.django_db
+def test_restore_skips_orphaned_rows(gamemaster):
+    """
+    Test that systems, links and sheets of sessions or characters missing from the archive are skipped and
+    counted instead of failing the restore.
+    """
+    session = {'id': 1, 'title': 'Sierota', 'slots': 3, 'session_date': '2030-01-01T18:00:00Z', 'is_public': False,
+               'is_open': True, 'creation_date': '2029-12-01T18:00:00Z'}
+    system = {'id': 1, 'session_id': 1, 'system': GameSystem.GameSystem.choices[0][0],
+              'creation_date': '2029-12-01T18:00:00Z'}
+    counts = restore_campaign(campaign_archive([
+        ('sessions/000001.jsonl', [session]),
+        ('systems/000001.jsonl', [system, dict(system, id=2, session_id=7)]),
+        ('links/000001.jsonl', [{'gamesession_id': 1, 'playercharacter_id': 5}]),
+        ('sheets/000001.jsonl', [{'character_id': 5}]),
+    ]), GameMaster.objects.get(user_id=gamemaster))
+    assert counts == {'sessions': 1, 'systems': 1, 'characters': 0, 'links': 0, 'sheets': 0, 'skipped': 3}
+    assert GameSystem.objects.filter(session_id__title='Sierota').count() == 1
@@ -0,0 +1,82 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+
+from GameMaster_app import chat
+from GameMaster_app.archive import archive_batch
+from GameMaster_app.chat import messages_after, messages_before, post_message, wait_for_messages
+from GameMaster_app.models import SessionMessage
+
+
+@pytest.mark.django_db
+def test_keyset_pages(game_session, gamemaster, settings):
+    """
+    Test that pages after and before an id are returned oldest first, and that messages are append-only.
+    """
+    settings.CHAT_PAGE_SIZE = 2
+    ids = [post_message(game_session, gamemaster, f'Wiadomość {number}').pk for number in range(5)]
+    assert [message.pk for message in messages_after(game_session, ids[1])] == ids[2:4]
+    assert [message.pk for message in messages_before(game_session)] == ids[3:]
+    assert [message.pk for message in messages_before(game_session, ids[3])] == ids[1:3]
+    with pytest.raises(ValueError):
+        SessionMessage.objects.get(pk=ids[0]).delete()
+    with pytest.raises(ValueError):
+        post_message(game_session, gamemaster, '   ')
+
+
+@pytest.mark.django_db
+def test_long_poll_returns_new_message(game_session, gamemaster, settings, monkeypatch):
+    """
+    Test that a waiting reader gets a message posted while it waits, and an empty list on timeout.
+    """
+    settings.CHAT_POLL_INTERVAL = 0.01
+    assert wait_for_messages(game_session, 0, timeout=0.05) == []
+    sleeps = []
+
+    def post_while_sleeping(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            post_message(game_session, gamemaster, 'Rzuć na inicjatywę')
+
+    monkeypatch.setattr(chat.time, 'sleep', post_while_sleeping)
+    messages = wait_for_messages(game_session, 0, timeout=5)
+    assert [message.body for message in messages] == ['Rzuć na inicjatywę']
+    assert len(sleeps) == 2
+
+
+@pytest.mark.django_db
+def test_session_messages_view(client, game_session, party):
+    """
+    Test that players of the session can post and read messages and that other users cannot.
+    """
+    url = reverse('session_messages', args=[game_session.pk])
+    client.login(username='testplayer', password='testpassword')
+    first = client.post(url, {'body': 'Cześć'}).json()['id']
+    client.post(url, {'body': 'Zaczynamy?'})
+    response = client.get(url, {'after': first}).json()
+    assert [message['body'] for message in response['messages']] == ['Zaczynamy?']
+    assert response['last_id'] > first
+    assert client.get(url, {'after': '²'}).status_code == 400
+    assert client.get(url, {'before': '9' * 30}).status_code == 400
+    User.objects.create_user(username='outsider', password='testpassword')
+    client.login(username='outsider', password='testpassword')
+    assert client.get(url).status_code == 404
+
+
+@pytest.mark.django_db
+def test_archived_session_messages(client, game_session, party):
+    """
+    Test that players keep reading the log of an archived session by the same ids and cannot post to it.
+    """
+    url = reverse('session_messages', args=[game_session.pk])
+    client.login(username='testplayer', password='testpassword')
+    first = client.post(url, {'body': 'Cześć'}).json()['id']
+    client.post(url, {'body': 'Do zobaczenia'})
+    archive_batch(timezone.now())
+    response = client.get(url, {'after': first, 'wait': 1}).json()
+    assert [message['body'] for message in response['messages']] == ['Do zobaczenia']
+    assert [message['id'] for message in client.get(url).json()['messages']][0] == first
+    assert client.post(url, {'body': 'Halo?'}).status_code == 400
+    client.login(username='testuser', password='testpassword')
+    assert len(client.get(url).json()['messages']) == 2
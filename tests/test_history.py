@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+
+from GameMaster_app.history import sheet_history, sheet_state_as_of
+from GameMaster_app.models import CharacterSheet, CharacterSheetEvent, CharacterSheetSnapshot
+
+
+@pytest.mark.django_db
+def test_sheet_changes_are_logged(party, gamemaster):
+    """
+    Test that creating and saving a character sheet appends events with old and new values.
+    """
+    sheet = CharacterSheet.objects.get(pk=party[0].pk)
+    sheet.life_points = 25
+    sheet.wealth = 100
+    sheet.save(changed_by=gamemaster)
+    sheet.save()
+    events = sheet_history(sheet)
+    assert [event.sequence for event in events] == [2, 1]
+    assert events[0].changes == {'life_points': [30, 25], 'wealth': [0, 100]}
+    assert events[0].user_id == gamemaster
+    assert events[1].changes['strength'] == [None, 14]
+    with pytest.raises(ValueError):
+        events[0].save()
+
+
+@pytest.mark.django_db
+def test_sheet_state_as_of(party, settings):
+    """
+    Test that the state of a sheet is rebuilt from the nearest snapshot and the events after it.
+    """
+    settings.CHARACTER_SHEET_SNAPSHOT_INTERVAL = 3
+    sheet = CharacterSheet.objects.get(pk=party[0].pk)
+    start = timezone.now() - timedelta(days=10)
+    CharacterSheetEvent.objects.filter(sheet_id=sheet).update(creation_date=start)
+    CharacterSheetSnapshot.objects.filter(sheet_id=sheet).update(creation_date=start)
+    for day in range(1, 8):
+        sheet.wealth = day * 10
+        sheet.save()
+        CharacterSheetEvent.objects.filter(sheet_id=sheet, sequence=day + 1).update(
+            creation_date=start + timedelta(days=day))
+        CharacterSheetSnapshot.objects.filter(sheet_id=sheet, sequence=day + 1).update(
+            creation_date=start + timedelta(days=day))
+    assert list(CharacterSheetSnapshot.objects.filter(sheet_id=sheet).values_list('sequence', flat=True)) == [1, 3, 6]
+    assert sheet_state_as_of(sheet, start - timedelta(days=1)) is None
+    assert sheet_state_as_of(sheet, start)['wealth'] == 0
+    assert sheet_state_as_of(sheet, start + timedelta(days=4, hours=1))['wealth'] == 40
+    assert sheet_state_as_of(sheet, timezone.now())['wealth'] == 70
+
+
+@pytest.mark.django_db
+def test_character_history_view(client, party):
+    """
+    Test that the owner of a character can read its history and that other users cannot.
+    """
+    sheet = CharacterSheet.objects.get(pk=party[0].pk)
+    sheet.reputation = 5
+    sheet.save()
+    url = reverse('character_history', args=[sheet.pk])
+    client.login(username='testplayer', password='testpassword')
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.json()['events'][0]['changes'] == {'reputation': [0, 5]}
+    response = client.get(url, {'as_of': timezone.now().isoformat()})
+    assert response.json()['state']['reputation'] == 5
+    assert client.get(url, {'before': '2'}).status_code == 200
+    for invalid in [{'as_of': '2024-13-45T00:00'}, {'before': '²'}, {'before': '9' * 20}, {'before': 'abc'}]:
+        assert client.get(url, invalid).status_code == 400
+    client.logout()
+    User.objects.create_user(username='outsider', password='testpassword')
+    client.login(username='outsider', password='testpassword')
+    assert client.get(url).status_code in [302, 404]
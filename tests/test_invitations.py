@@ -0,0 +1,67 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from GameMaster_app.invitations import InvitationError, accept_invitation, create_invitation, read_invitation
+from GameMaster_app.models import Player, PlayerCharacter, SlotReservation
+
+
+@pytest.fixture
+def invitee():
+    user = User.objects.create_user(username='invitee', password='testpassword')
+    player = Player.objects.create(user_id=user, player_nickname='invitee')
+    return PlayerCharacter.objects.create(owner_id=player, name='Boromir', description='')
+
+
+@pytest.mark.django_db
+def test_open_invitation_without_queries(client, game_session):
+    """
+    Test that opening an invitation link only verifies the signature and runs no database query.
+    """
+    token = create_invitation(game_session)
+    url = reverse('invitation', args=[token])
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert 'Test Session' in response.content.decode()
+    assert len(queries) == 0
+    assert client.get(reverse('invitation', args=[token[:-3] + 'abc'])).status_code == 400
+
+
+@pytest.mark.django_db
+def test_reserved_slot(game_session, party, invitee):
+    """
+    Test that a reserved slot counts as taken and lets its invitee join a full, closed session.
+    """
+    game_session.slots = 4
+    game_session.is_open = False
+    game_session.save()
+    claims = read_invitation(create_invitation(game_session, reserve_slot=True))
+    with pytest.raises(InvitationError):
+        create_invitation(game_session, reserve_slot=True)
+    with pytest.raises(InvitationError):
+        accept_invitation(read_invitation(create_invitation(game_session)), invitee)
+    accept_invitation(claims, invitee)
+    assert invitee.game_session_id.filter(pk=game_session.pk).exists()
+    assert SlotReservation.objects.get().character_id == invitee
+
+
+@pytest.mark.django_db
+def test_accept_invitation_view(client, game_session, invitee):
+    """
+    Test that a logged-in player joins the session by posting to the invitation link.
+    """
+    client.login(username='testuser', password='testpassword')
+    response = client.post(reverse('create_invitation', args=[game_session.pk]))
+    url = response.json()['url']
+    client.logout()
+    client.login(username='invitee', password='testpassword')
+    assert client.post(url, {'character': 'abc'}).status_code == 400
+    assert client.post(url, {'character': '²'}).status_code == 400
+    assert client.post(url, {'character': '9' * 30}).status_code == 400
+    response = client.post(url)
+    assert response.status_code == 302
+    assert response.url == reverse('dashboard')
+    assert invitee.game_session_id.filter(pk=game_session.pk).exists()
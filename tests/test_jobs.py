@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from GameMaster_app import jobs
+from GameMaster_app.models import Job
+
+calls = []
+
+
+@jobs.task('test_record')
+def record_task(value):
+    calls.append(value)
+
+
+@jobs.task('test_fail')
+def fail_task():
+    raise RuntimeError('boom')
+
+
+@pytest.mark.django_db
+def test_claim_jobs_once():
+    """
+    Test that due jobs are claimed once, in run_after order, and that future jobs wait.
+    """
+    first = jobs.enqueue('test_record', value=1)
+    second = jobs.enqueue('test_record', value=2)
+    jobs.enqueue('test_record', run_after=timezone.now() + timedelta(hours=1), value=3)
+    claimed = jobs.claim_jobs('worker-a', 5)
+    assert claimed == [first, second]
+    assert all(job.status == Job.Status.RUNNING and job.locked_by == 'worker-a' for job in claimed)
+    assert jobs.claim_jobs('worker-b', 5) == []
+    with pytest.raises(ValueError):
+        jobs.enqueue('missing')
+
+
+@pytest.mark.django_db
+def test_run_job_retries_with_backoff(settings):
+    """
+    Test that a failing job is retried with exponential backoff and finally marked as failed.
+    """
+    settings.JOB_RETRY_BACKOFF = 10
+    job = jobs.enqueue('test_fail', max_attempts=2)
+    assert not jobs.run_job(jobs.claim_jobs('worker', 1)[0])
+    job.refresh_from_db()
+    assert job.status == Job.Status.QUEUED
+    assert job.attempts == 1
+    assert 'boom' in job.last_error
+    assert job.run_after > timezone.now() + timedelta(seconds=5)
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    assert not jobs.run_job(jobs.claim_jobs('worker', 1)[0])
+    job.refresh_from_db()
+    assert job.status == Job.Status.FAILED
+
+
+@pytest.mark.django_db(transaction=True)
+def test_work_runs_queue(settings):
+    """
+    Test that the worker runs all due jobs in its thread pool and requeues stale running jobs.
+    """
+    calls.clear()
+    for value in range(3):
+        jobs.enqueue('test_record', value=value)
+    stale = jobs.enqueue('test_record', value=9)
+    Job.objects.filter(pk=stale.pk).update(status=Job.Status.RUNNING,
+                                           locked_date=timezone.now() - timedelta(days=1))
+    assert jobs.work(threads=2, once=True) == 4
+    assert sorted(calls) == [0, 1, 2, 9]
+    assert set(Job.objects.values_list('status', flat=True)) == {Job.Status.DONE}
+
+
+@pytest.mark.django_db
+def test_requeue_counts_attempts_and_leases(settings):
+    """
+    Test that stale jobs are requeued as a failed attempt, failed without attempts left, and kept while renewed.
+    """
+    settings.JOB_STALE_AFTER = 60
+    retried = jobs.enqueue('test_record', value=1)
+    exhausted = jobs.enqueue('test_record', max_attempts=1, value=2)
+    renewed = jobs.enqueue('test_record', value=3)
+    claimed = jobs.claim_jobs('worker', 3)
+    Job.objects.update(locked_date=timezone.now() - timedelta(minutes=5))
+    assert jobs.renew_leases('worker', [job for job in claimed if job.pk == renewed.pk]) == 1
+    assert jobs.requeue_stale_jobs() == 2
+    retried.refresh_from_db()
+    exhausted.refresh_from_db()
+    renewed.refresh_from_db()
+    assert (retried.status, retried.attempts) == (Job.Status.QUEUED, 1)
+    assert (exhausted.status, exhausted.attempts) == (Job.Status.FAILED, 1)
+    assert renewed.status == Job.Status.RUNNING
+    # The worker that lost its lease does not overwrite the outcome of the requeued job.
+    jobs.run_job(next(job for job in claimed if job.pk == retried.pk))
+    retried.refresh_from_db()
+    assert retried.status == Job.Status.QUEUED
@@ -0,0 +1,43 @@
+import pytest
+from django.urls import reverse
+
+from GameMaster_app.metrics import Registry, collect, registry, render
+
+
+def test_render_histogram_is_cumulative():
+    """
+    Test that latency buckets are rendered cumulatively in the Prometheus text format.
+    """
+    metrics = Registry()
+    metrics.observe_request('index', 'GET', 200, 0.003, 2, 100)
+    metrics.observe_request('index', 'GET', 200, 0.2, 3, 50)
+    text = render(metrics.snapshot())
+    assert 'mastergame_requests_total{view="index",method="GET",status="200"} 2' in text
+    assert 'mastergame_request_duration_seconds_bucket{view="index",le="0.005"} 1' in text
+    assert 'mastergame_request_duration_seconds_bucket{view="index",le="0.25"} 2' in text
+    assert 'mastergame_request_duration_seconds_bucket{view="index",le="+Inf"} 2' in text
+    assert 'mastergame_db_queries_total{view="index"} 5' in text
+    assert 'mastergame_response_bytes_total{view="index"} 150' in text
+
+
+def test_collect_sums_worker_files(tmp_path, settings):
+    """
+    Test that the snapshots of other worker processes in METRICS_DIR are added up.
+    """
+    settings.METRICS_DIR = str(tmp_path)
+    (tmp_path / '999999.json').write_text('[[["queries", "dashboard"], 7]]')
+    before = registry.snapshot().get(('queries', 'dashboard'), 0)
+    assert collect()[('queries', 'dashboard')] == before + 7
+    assert any(path.name.endswith('.json') and path.name != '999999.json' for path in tmp_path.iterdir())
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint(client, index_url):
+    """
+    Test that requests are recorded by the middleware and exposed at /metrics for allowed addresses.
+    """
+    client.get(index_url)
+    response = client.get(reverse('metrics'))
+    assert response.status_code == 200
+    assert 'mastergame_requests_total{view="index",method="GET",status="200"}' in response.content.decode()
+    assert client.get(reverse('metrics'), REMOTE_ADDR='10.1.1.1').status_code == 403
@@ -0,0 +1,54 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from GameMaster_app.models import CharacterSheet, CharacterSheetEvent
+from GameMaster_app.party import apply_party_effect, field_bounds
+
+
+def test_field_bounds():
+    """
+    Test that the bounds of party effect fields follow the CharacterSheet validators.
+    """
+    assert field_bounds(CharacterSheet, 'life_points') == (0, 100)
+    assert field_bounds(CharacterSheet, 'wealth')[0] == 0
+
+
+@pytest.mark.django_db
+def test_apply_party_effect_clamps_values(party, game_session, gamemaster):
+    """
+    Test that a party effect updates every living character with one UPDATE statement, clamps the
+    values to the validator bounds and records the changes in the character sheet log.
+    """
+    party[2].character_status = 'Dead'
+    party[2].save()
+    with CaptureQueriesContext(connection) as queries:
+        assert apply_party_effect(game_session, changed_by=gamemaster, life_points=-50, wealth=25) == 2
+    assert len([query for query in queries if query['sql'].startswith('UPDATE')]) == 1
+    assert list(CharacterSheet.objects.order_by('pk').values_list('life_points', 'wealth')) == [
+        (0, 25), (0, 25), (30, 0)]
+    apply_party_effect(game_session, life_points=500)
+    assert CharacterSheet.objects.get(pk=party[0].pk).life_points == 100
+    event = CharacterSheetEvent.objects.filter(sheet_id=party[0].pk).order_by('-sequence')[1]
+    assert event.changes == {'life_points': [30, 0], 'wealth': [0, 25]}
+    assert event.user_id == gamemaster
+    with pytest.raises(ValueError):
+        apply_party_effect(game_session, age=5)
+
+
+@pytest.mark.django_db
+def test_party_effect_view(client, party, game_session):
+    """
+    Test that the session owner can apply a party effect through the view.
+    """
+    client.login(username='testuser', password='testpassword')
+    url = reverse('party_effect', args=[game_session.pk])
+    response = client.post(url, {'reputation': '-3'})
+    assert response.status_code == 200
+    assert response.json() == {'updated': 3}
+    assert set(CharacterSheet.objects.values_list('reputation', flat=True)) == {-3}
+    assert client.post(url, {'wealth': 'lots'}).status_code == 400
+    assert client.post(url, {'wealth': '9' * 30}).status_code == 400
+    assert client.post(url, {'life_points': '-101'}).status_code == 400
+    assert client.post(url, {'life_points': '-100'}).status_code == 200
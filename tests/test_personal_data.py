@@ -0,0 +1,77 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+
+from GameMaster_app.archive import archive_batch, archive_cutoff
+from GameMaster_app.chat import post_message
+from GameMaster_app.models import CharacterSheet, GameSystem
+
+
+def download(response):
+    return json.loads(b''.join(response.streaming_content))
+
+
+@pytest.mark.django_db
+def test_player_export(client, party, settings):
+    """
+    Test that a player's export holds their profile, characters, sheets, memberships, messages and sheet changes,
+    in chunks.
+    """
+    settings.PERSONAL_DATA_CHUNK_SIZE = 2
+    post_message(party[0].game_session_id.get(), User.objects.get(username='testplayer'), 'Cześć')
+    sheet = CharacterSheet.objects.get(character_id=party[0])
+    sheet.strength = 15
+    sheet.save(changed_by=User.objects.get(username='testplayer'))
+    client.login(username='testplayer', password='testpassword')
+    response = client.get(reverse('personal_data_export'))
+    assert response['Content-Type'] == 'application/json'
+    data = download(response)
+    assert data['user']['username'] == 'testplayer'
+    assert data['game_master'] is None
+    assert data['player']['player_nickname'] == 'testplayer'
+    assert [character['name'] for character in data['characters']] == ['Aragorn', 'Legolas', 'Gimli']
+    assert [sheet['strength'] for sheet in data['sheets']] == [15, 14, 14]
+    assert {membership['gamesession_id__title'] for membership in data['memberships']} == {'Test Session'}
+    assert len(data['memberships']) == 3
+    assert [message['body'] for message in data['messages']] == ['Cześć']
+    assert data['sessions'] == [] and data['systems'] == []
+    assert [event['changes'] for event in data['sheet_events']] == [{'strength': [14, 15]}]
+
+
+@pytest.mark.django_db
+def test_export_includes_archived_sessions(client, party, game_session):
+    """
+    Test that archived sessions, their systems, memberships and messages stay in the export.
+    """
+    game_session.session_date = timezone.now() - timedelta(days=400)
+    game_session.save()
+    GameSystem.objects.create(session_id=game_session, system='Rpg1')
+    post_message(game_session, User.objects.get(username='testplayer'), 'Dzięki za grę')
+    archive_batch(archive_cutoff(180))
+    client.login(username='testplayer', password='testpassword')
+    data = download(client.get(reverse('personal_data_export')))
+    assert data['memberships'] == []
+    assert {membership['session_id__title'] for membership in data['archived_memberships']} == {'Test Session'}
+    assert [message['body'] for message in data['archived_messages']] == ['Dzięki za grę']
+    client.login(username='testuser', password='testpassword')
+    data = download(client.get(reverse('personal_data_export')))
+    assert data['sessions'] == []
+    assert [session['title'] for session in data['archived_sessions']] == ['Test Session']
+    assert [system['system'] for system in data['archived_systems']] == ['Rpg1']
+
+
+@pytest.mark.django_db
+def test_game_master_export_is_limited_to_own_rows(client, party):
+    """
+    Test that a game master's export holds their sessions but not the characters of their players.
+    """
+    client.login(username='testuser', password='testpassword')
+    data = download(client.get(reverse('personal_data_export')))
+    assert data['game_master']['user_nickname'] == 'testnickname'
+    assert data['player'] is None
+    assert [session['title'] for session in data['sessions']] == ['Test Session']
+    assert data['characters'] == [] and data['memberships'] == []
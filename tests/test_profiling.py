@@ -0,0 +1,71 @@
+import marshal
+
+import pytest
+from django.test import RequestFactory
+from django.urls import reverse
+
+from GameMaster_app.profiling import profile_store, requested_mode
+
+
+@pytest.fixture
+def staff(gamemaster, client):
+    gamemaster.is_staff = True
+    gamemaster.save()
+    client.login(username='testuser', password='testpassword')
+    return gamemaster
+
+
+@pytest.mark.django_db
+def test_cprofile_request_is_stored(client, staff, dashboard_url):
+    """
+    Test that a staff request with the X-Profile header is profiled and its pstats dump can be downloaded.
+    """
+    assert 'X-Profile-Id' not in client.get(dashboard_url)
+    response = client.get(dashboard_url, HTTP_X_PROFILE='cprofile')
+    profile_id = response['X-Profile-Id']
+    assert profile_id in [profile['id'] for profile in profile_store.list()]
+    page = client.get(reverse('profile', args=[profile_id]))
+    assert 'cumulative' in page.content.decode()
+    download = client.get(reverse('profile', args=[profile_id]), {'download': 1})
+    stats = marshal.loads(download.content)
+    assert any(function == 'render' for _, _, function in stats)
+
+
+@pytest.mark.django_db
+def test_sampled_profile_in_directory(client, staff, dashboard_url, settings, tmp_path):
+    """
+    Test that sampled profiles are stored as folded stacks in PROFILE_DIR, keeping only PROFILE_RING_SIZE.
+    """
+    settings.PROFILE_DIR = str(tmp_path)
+    settings.PROFILE_RING_SIZE = 2
+    settings.PROFILE_SAMPLE_INTERVAL = 0.0001
+    ids = [client.get(dashboard_url, {'_profile': 'sample'})['X-Profile-Id'] for _ in range(3)]
+    assert [profile['id'] for profile in profile_store.list()] == ids[:0:-1]
+    assert {path.suffix for path in tmp_path.iterdir()} <= {'.json', '.folded'}
+    download = client.get(reverse('profile', args=[ids[-1]]), {'download': 1})
+    assert download['Content-Disposition'].endswith('.folded"')
+
+
+@pytest.mark.django_db
+def test_profiles_are_staff_only(client, gamemaster, dashboard_url):
+    """
+    Test that requests of other users are not profiled and that they cannot browse profiles.
+    """
+    client.login(username='testuser', password='testpassword')
+    stored = len(profile_store.list())
+    assert 'X-Profile-Id' not in client.get(dashboard_url, HTTP_X_PROFILE='cprofile')
+    assert len(profile_store.list()) == stored
+    assert client.get(reverse('profiles')).status_code == 403
+
+
+@pytest.mark.django_db
+def test_requested_mode_requires_staff(gamemaster):
+    """
+    Test that only staff requests select a profiler.
+    """
+    request = RequestFactory().get('/', {'_profile': 'sample'})
+    assert requested_mode(request) is None
+    request.user = gamemaster
+    assert requested_mode(request) is None
+    gamemaster.is_staff = True
+    assert requested_mode(request) == 'sample'
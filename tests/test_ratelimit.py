@@ -0,0 +1,42 @@
+import pytest
+from django.urls import reverse
+
+from GameMaster_app.ratelimit import hit
+
+
+def test_sliding_window_counts_previous_window():
+    """
+    Test that the sliding window weights the previous window and reports how long to wait.
+    """
+    assert [hit('test', 'ip', '1.2.3.4', 3, 60, now=600) for _ in range(3)] == [0, 0, 0]
+    assert hit('test', 'ip', '1.2.3.4', 3, 60, now=610) > 0
+    assert hit('test', 'ip', '1.2.3.4', 3, 60, now=630) > 0
+    assert hit('test', 'ip', '1.2.3.4', 3, 60, now=700) == 0
+
+
+@pytest.mark.django_db
+def test_login_rate_limited_per_username(client, user, index_url, settings):
+    """
+    Test that repeated login attempts for one username get 429 with Retry-After before any password check.
+    """
+    settings.RATE_LIMITS = {'login': {'username': (2, 60)}}
+    data = {'username': 'testuser', 'password': 'wrongpassword'}
+    assert client.post(index_url, data).status_code == 200
+    assert client.post(index_url, data, REMOTE_ADDR='10.0.0.2').status_code == 200
+    response = client.post(index_url, data, REMOTE_ADDR='10.0.0.3')
+    assert response.status_code == 429
+    assert int(response['Retry-After']) > 0
+    data['username'] = 'otheruser'
+    assert client.post(index_url, data).status_code == 200
+
+
+@pytest.mark.django_db
+def test_add_session_rate_limited_per_user(client, gamemaster, add_session_url, settings):
+    """
+    Test that session creation is limited per logged-in user.
+    """
+    settings.RATE_LIMITS = {'add_session': {'user': (1, 3600)}}
+    client.login(username='testuser', password='testpassword')
+    data = {'title': 'Session', 'slots': 2, 'date': '2023-09-30', 'is_open': True, 'is_public': True}
+    assert client.post(add_session_url, data).status_code == 302
+    assert client.post(add_session_url, data).status_code == 429
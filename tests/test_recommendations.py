@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from GameMaster_app.archive import archive_batch
+from GameMaster_app.models import GameMaster, GameSession, GameSystem, SessionRecommendation
+from GameMaster_app.recommendations import recommended_sessions, update_recommendations
+
+
+@pytest.fixture
+def upcoming(game_session, party):
+    """
+    The party played a 'Rpg1' session of testnickname; three sessions by two game masters are coming up.
+    """
+    GameSession.objects.filter(pk=game_session.pk).update(session_date=timezone.now() - timedelta(days=7))
+    GameSystem.objects.create(session_id=game_session, system=GameSystem.GameSystem.RPG1)
+    other = GameMaster.objects.create(user_id=User.objects.create_user(username='othergm', password='testpassword'),
+                                      user_nickname='othergm', is_game_master=True)
+    date = timezone.now() + timedelta(days=7)
+    sessions = {
+        'same_gm': GameSession.objects.create(owner_id=game_session.owner_id, title='Same GM', slots=4,
+                                              session_date=date),
+        'same_system': GameSession.objects.create(owner_id=other, title='Same system', slots=4, session_date=date),
+        'unrelated': GameSession.objects.create(owner_id=other, title='Unrelated', slots=4, session_date=date),
+    }
+    GameSystem.objects.create(session_id=sessions['same_system'], system=GameSystem.GameSystem.RPG1)
+    GameSystem.objects.create(session_id=sessions['unrelated'], system=GameSystem.GameSystem.RPG2)
+    return sessions
+
+
+@pytest.mark.django_db
+def test_recommendations_follow_history(upcoming, party):
+    """
+    Test that sessions sharing the game master or the system of past sessions are ranked, and unrelated ones not.
+    """
+    assert update_recommendations() == 2
+    recommendations = list(SessionRecommendation.objects.filter(player_id=party[0].owner_id).order_by('rank'))
+    assert {recommendation.session_id for recommendation in recommendations} == {upcoming['same_gm'],
+                                                                                  upcoming['same_system']}
+    assert [recommendation.rank for recommendation in recommendations] == [1, 2]
+    assert all(recommendation.score > 0 for recommendation in recommendations)
+    GameSession.objects.filter(pk=upcoming['same_gm'].pk).update(is_public=False)
+    assert recommended_sessions(User.objects.get(username='testplayer')) == [upcoming['same_system']]
+
+
+@pytest.mark.django_db
+def test_recommendations_survive_archiving(upcoming, party):
+    """
+    Test that the history of archived sessions, added to the live one, scores the candidates as it did before
+    archiving.
+    """
+    def scores():
+        return sorted(SessionRecommendation.objects.values_list('player_id', 'session_id', 'rank', 'score'))
+
+    recent = GameSession.objects.create(owner_id=upcoming['same_gm'].owner_id, title='Recent', slots=4,
+                                        session_date=timezone.now() - timedelta(days=1))
+    GameSystem.objects.create(session_id=recent, system=GameSystem.GameSystem.RPG1)
+    party[0].game_session_id.add(recent)
+    update_recommendations()
+    before = scores()
+    assert archive_batch(timezone.now() - timedelta(days=3)) == 1
+    assert update_recommendations() == 2
+    assert scores() == before
+
+
+@pytest.mark.django_db
+def test_joined_sessions_are_not_recommended(upcoming, party):
+    """
+    Test that upcoming sessions the player already joined are left out, and that a rerun replaces old rows.
+    """
+    update_recommendations()
+    party[0].game_session_id.add(upcoming['same_gm'])
+    assert update_recommendations() == 1
+    assert SessionRecommendation.objects.get().session_id == upcoming['same_system']
+
+
+@pytest.mark.django_db
+def test_dashboard_lists_recommendations(client, upcoming, party, dashboard_url):
+    """
+    Test that the dashboard shows the open recommended sessions of the logged in player.
+    """
+    update_recommendations()
+    GameSession.objects.filter(pk=upcoming['same_system'].pk).update(is_open=False)
+    player = User.objects.get(username='testplayer')
+    assert recommended_sessions(player) == [upcoming['same_gm']]
+    client.login(username='testplayer', password='testpassword')
+    response = client.get(dashboard_url)
+    assert list(response.context['recommendations']) == [upcoming['same_gm']]
+    assert 'Same GM' in response.content.decode()
@@ -0,0 +1,93 @@
+import smtplib
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.utils import timezone
+
+from GameMaster_app.models import GameSession, SentReminder
+from GameMaster_app.reminders import ReminderDispatcher
+
+
+@pytest.mark.django_db
+def test_dispatcher_heap_and_batched_delivery(party, game_session, settings):
+    """
+    Test that reminders are loaded into the heap ahead of time, sent to the game master and players
+    once they are due, in batches over one connection, and never twice.
+    """
+    settings.REMINDER_EMAIL_BATCH_SIZE = 2
+    now = timezone.now().replace(microsecond=0)
+    game_session.owner_id.user_id.email = 'gm@example.com'
+    game_session.owner_id.user_id.save()
+    party[0].owner_id.user_id.email = 'player@example.com'
+    party[0].owner_id.user_id.save()
+    game_session.session_date = now + timedelta(minutes=65)
+    game_session.save()
+    for number in range(3):
+        GameSession.objects.create(owner_id=game_session.owner_id, title=f'Other {number}',
+                                   session_date=now + timedelta(minutes=66 + number))
+    GameSession.objects.create(owner_id=game_session.owner_id, title='Later', session_date=now + timedelta(days=3))
+    dispatcher = ReminderDispatcher(offsets=[60], start=now)
+    assert dispatcher.run_once(now) == 0
+    assert len(dispatcher.heap) == 4
+    assert dispatcher.run_once(now + timedelta(minutes=5)) == 1
+    assert mail.outbox[0].subject == 'Przypomnienie: Test Session'
+    assert mail.outbox[0].bcc == ['gm@example.com', 'player@example.com']
+    assert dispatcher.run_once(now + timedelta(minutes=10)) == 3
+    assert SentReminder.objects.count() == 4
+    assert ReminderDispatcher(offsets=[60], start=now).run_once(now + timedelta(minutes=10)) == 0
+    assert len(mail.outbox) == 4
+
+
+@pytest.mark.django_db
+def test_dispatcher_skips_moved_sessions(game_session):
+    """
+    Test that a reminder is not sent when its session was moved after the reminder was loaded.
+    """
+    now = timezone.now()
+    game_session.session_date = now + timedelta(minutes=61)
+    game_session.save()
+    dispatcher = ReminderDispatcher(offsets=[60], start=now)
+    dispatcher.load(now)
+    GameSession.objects.filter(pk=game_session.pk).update(session_date=now + timedelta(days=1))
+    assert dispatcher.run_once(now + timedelta(minutes=2)) == 0
+    assert not SentReminder.objects.exists()
+
+
+@pytest.mark.django_db
+def test_dispatcher_picks_up_sessions_added_to_loaded_window(game_session):
+    """
+    Test that a session created after its stretch of time was loaded still gets its reminder.
+    """
+    now = timezone.now()
+    dispatcher = ReminderDispatcher(offsets=[60], start=now)
+    dispatcher.load(now)
+    GameSession.objects.create(owner_id=game_session.owner_id, title='Late', session_date=now + timedelta(minutes=65))
+    dispatcher.run_once(now + timedelta(minutes=1))
+    dispatcher.run_once(now + timedelta(minutes=6))
+    assert SentReminder.objects.filter(session_id__title='Late').exists()
+
+
+@pytest.mark.django_db
+def test_failed_delivery_is_retried(game_session, settings, monkeypatch):
+    """
+    Test that reminders whose emails could not be sent go back into the heap and are sent after the delay.
+    """
+    settings.REMINDER_RETRY_DELAY = 60
+    now = timezone.now()
+    game_session.owner_id.user_id.email = 'gm@example.com'
+    game_session.owner_id.user_id.save()
+    game_session.session_date = now + timedelta(minutes=61)
+    game_session.save()
+    dispatcher = ReminderDispatcher(offsets=[60], start=now)
+
+    def refuse(self, messages):
+        raise smtplib.SMTPServerDisconnected('down')
+
+    with monkeypatch.context() as patch:
+        patch.setattr('django.core.mail.backends.locmem.EmailBackend.send_messages', refuse)
+        assert dispatcher.run_once(now + timedelta(minutes=2)) == 0
+    assert not SentReminder.objects.exists() and len(dispatcher.heap) == 1
+    assert dispatcher.run_once(now + timedelta(minutes=2, seconds=30)) == 0
+    assert dispatcher.run_once(now + timedelta(minutes=3, seconds=1)) == 1
+    assert SentReminder.objects.count() == 1 and len(mail.outbox) == 1
@@ -0,0 +1,52 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from GameMaster_app import richtext
+from GameMaster_app.models import PlayerCharacter, RenderedText
+from GameMaster_app.richtext import content_hash, render_markdown, rendered_html
+
+BACKSTORY = '# Dzieciństwo\n\nUrodzony w **Gondorze**.\n\n<script>alert(1)</script>\n\n[link](javascript:alert(1))'
+
+
+def test_render_markdown_sanitizes():
+    """
+    Test that Markdown is rendered and that scripts and javascript: links are removed.
+    """
+    html = render_markdown(BACKSTORY)
+    assert '<h1>Dzieciństwo</h1>' in html
+    assert '<strong>Gondorze</strong>' in html
+    assert '<script' not in html
+    assert 'javascript:' not in html
+
+
+@pytest.mark.django_db
+def test_rendered_once_per_version(monkeypatch):
+    """
+    Test that a text is rendered once and stored, and rendered again after the renderer version changes.
+    """
+    calls = []
+    monkeypatch.setattr(richtext, 'render_markdown', lambda text: calls.append(text) or f'<p>{text}</p>')
+    rendered_html('Legolas')
+    with CaptureQueriesContext(connection) as queries:
+        assert rendered_html('Legolas') == '<p>Legolas</p>'
+    assert len(calls) == 1
+    assert len(queries) == 1
+    monkeypatch.setattr(richtext, 'RENDERER_VERSION', 2)
+    rendered_html('Legolas')
+    assert len(calls) == 2
+    assert RenderedText.objects.get(pk=content_hash('Legolas')).renderer_version == 2
+
+
+@pytest.mark.django_db
+def test_description_html_in_api(client, party):
+    """
+    Test that the characters API serves rendered descriptions.
+    """
+    PlayerCharacter.objects.filter(pk=party[0].pk).update(description=BACKSTORY)
+    client.login(username='testplayer', password='testpassword')
+    response = client.get(reverse('api_characters'), {'fields': 'name,description_html'})
+    html = {row['name']: row['description_html'] for row in response.json()['data']}
+    assert '<strong>Gondorze</strong>' in html['Aragorn']
+    assert html['Legolas'] == ''
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from django.urls import reverse
+
+from GameMaster_app.simulation import (Combatant, EncounterError, parse_encounter, session_party, shared_pool,
+                                       simulate_encounter)
+
+GOBLINS = {'enemies': [{'name': 'Goblin', 'count': 3, 'life_points': 7, 'attack': 3, 'defense': 12}]}
+DRAGON = {'enemies': [{'name': 'Dragon', 'life_points': 500, 'attack': 15, 'defense': 25, 'damage': 40}]}
+
+
+@pytest.mark.django_db
+def test_session_party(party, game_session):
+    """
+    Test that the party of a session is built from the character sheets of its living characters.
+    """
+    party[0].character_status = 'Dead'
+    party[0].save()
+    combatants = session_party(game_session)
+    assert [combatant.name for combatant in combatants] == ['Legolas', 'Gimli']
+    assert all(combatant.life_points == 30 for combatant in combatants)
+
+
+def test_parse_encounter_invalid():
+    """
+    Test that invalid encounter definitions raise EncounterError.
+    """
+    with pytest.raises(EncounterError):
+        parse_encounter({'enemies': []})
+    with pytest.raises(EncounterError):
+        parse_encounter({'enemies': [{'name': 'Ghost'}]})
+    with pytest.raises(EncounterError):
+        parse_encounter({**GOBLINS, 'max_rounds': 10 ** 9})
+    with pytest.raises(EncounterError):
+        parse_encounter({'enemies': [{'life_points': 7, 'count': 60}, {'life_points': 7, 'count': 60}]})
+    with pytest.raises(EncounterError):
+        parse_encounter({'enemies': [{'life_points': 7, 'defense': 10 ** 6}]})
+
+
+def test_simulate_encounter_is_reproducible():
+    """
+    Test that a seeded in-process simulation is deterministic and stops early once the
+    confidence interval is tight enough.
+    """
+    party = [Combatant('Hero', life_points=30, attack=4, defense=13, damage=8, damage_bonus=2)] * 3
+    enemies, max_rounds = parse_encounter(GOBLINS)
+    first = simulate_encounter(party, enemies, fights=200_000, chunk_size=5_000, tolerance=0.01,
+                               workers=0, seed=7)
+    second = simulate_encounter(party, enemies, fights=200_000, chunk_size=5_000, tolerance=0.01,
+                                workers=0, seed=7)
+    assert first.as_dict() == second.as_dict()
+    assert first.stopped_early
+    assert first.fights < 200_000
+    assert first.as_dict()['win_probability'] > 0.9
+
+
+def test_simulate_encounter_process_pool():
+    """
+    Test that chunks fanned out over the process pool are all accounted for, and that runs share one pool.
+    """
+    party = [Combatant('Hero', life_points=10, attack=0, defense=10)]
+    enemies, max_rounds = parse_encounter(DRAGON)
+    result = simulate_encounter(party, enemies, fights=4_000, chunk_size=1_000, tolerance=0, workers=2, seed=1)
+    assert result.fights == 4_000
+    assert result.wins == 0
+    assert not result.stopped_early
+    pool = shared_pool(2)
+    assert simulate_encounter(party, enemies, fights=2_000, chunk_size=1_000, tolerance=0, workers=2).fights == 2_000
+    assert shared_pool(2) is pool
+
+
+@pytest.mark.django_db
+def test_simulate_encounter_view(client, party, game_session, settings):
+    """
+    Test that the session owner receives the simulation result as JSON.
+    """
+    settings.ENCOUNTER_SIMULATION_WORKERS = 0
+    client.login(username='testuser', password='testpassword')
+    url = reverse('simulate_encounter', args=[game_session.pk])
+    response = client.post(url, json.dumps({'encounter': GOBLINS, 'fights': 2_000}),
+                           content_type='application/json')
+    assert response.status_code == 200
+    assert set(response.json()['survival']) == {str(character.pk) for character in party}
+    assert set(response.json()['names'].values()) == {'Aragorn', 'Legolas', 'Gimli'}
+    response = client.post(url, json.dumps({'encounter': {}}), content_type='application/json')
+    assert response.status_code == 400
+    body = '{"encounter": %s, "fights": 1e999}' % json.dumps(GOBLINS)
+    assert client.post(url, body, content_type='application/json').status_code == 400
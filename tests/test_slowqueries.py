@@ -0,0 +1,42 @@
+import pytest
+from django.urls import reverse
+
+from GameMaster_app.slowqueries import normalize_sql, slow_query_log
+
+
+def test_normalize_sql_collapses_literals_and_lists():
+    """
+    Test that literals, parameter lists and whitespace are normalized.
+    """
+    sql = "SELECT *  FROM t WHERE a = 5 AND b = 'x''y' AND c IN (%s, %s,%s)"
+    assert normalize_sql(sql) == 'SELECT * FROM t WHERE a = %s AND b = %s AND c IN (...)'
+
+
+@pytest.mark.django_db
+def test_slow_queries_are_attributed(client, party, settings):
+    """
+    Test that slow queries are logged with the URL name, the calling line and the EXPLAIN plan.
+    """
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    slow_query_log.entries.clear()
+    client.login(username='testplayer', password='testpassword')
+    client.get(reverse('character_history', args=[party[0].pk]))
+    entries = [entry for entry in slow_query_log.recent() if entry['view'] == 'character_history']
+    assert entries
+    assert any(entry['caller'] and entry['caller'].startswith('GameMaster_app/') for entry in entries)
+    assert any(entry['plan'] for entry in entries if entry['sql'].startswith('SELECT'))
+
+
+@pytest.mark.django_db
+def test_slow_query_log_is_staff_only(client, gamemaster, settings):
+    """
+    Test that only staff users can browse the slow-query log.
+    """
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    client.login(username='testuser', password='testpassword')
+    assert client.get(reverse('slow_queries')).status_code == 403
+    gamemaster.is_staff = True
+    gamemaster.save()
+    response = client.get(reverse('slow_queries'), {'group': 1})
+    assert response.status_code == 200
+    assert 'Wolne zapytania' in response.content.decode()
@@ -0,0 +1,54 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from GameMaster_app.tokens import TokenError, read_token, revoked_tokens
+
+
+@pytest.fixture
+def api_token(client, gamemaster):
+    response = client.post(reverse('api_token'), {'username': 'testuser', 'password': 'testpassword'})
+    return response.json()['token']
+
+
+@pytest.mark.django_db
+def test_token_carries_roles(api_token, gamemaster):
+    """
+    Test that an issued token carries the user id and the role flags.
+    """
+    claims = read_token(api_token)
+    assert claims['u'] == gamemaster.pk
+    assert claims['gm'] is True
+    assert claims['p'] is False
+    with pytest.raises(TokenError):
+        read_token(api_token[:-2] + 'xx')
+
+
+@pytest.mark.django_db
+def test_token_authentication_without_database(client, api_token, game_session):
+    """
+    Test that a bearer token authenticates API requests without reading the session or User tables.
+    """
+    client.get(reverse('api_sessions'), HTTP_AUTHORIZATION=f'Bearer {api_token}')
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('api_sessions'), {'fields': 'title'}, HTTP_AUTHORIZATION=f'Bearer {api_token}')
+    assert response.status_code == 200
+    assert response.json()['data'] == [{'id': game_session.pk, 'title': 'Test Session'}]
+    assert len(queries) == 1
+    assert 'auth_user' not in queries[0]['sql'].split('WHERE')[0]
+    assert 'django_session' not in queries[0]['sql']
+
+
+@pytest.mark.django_db
+def test_token_revocation(client, api_token, settings):
+    """
+    Test that a revoked token is rejected and that bad tokens get 401.
+    """
+    response = client.post(reverse('api_token_revoke'), HTTP_AUTHORIZATION=f'Bearer {api_token}')
+    assert response.json() == {'revoked': True}
+    response = client.get(reverse('api_sessions'), HTTP_AUTHORIZATION=f'Bearer {api_token}')
+    assert response.status_code == 401
+    assert response.json() == {'error': 'Token revoked'}
+    assert client.get(reverse('api_sessions'), HTTP_AUTHORIZATION='Bearer nonsense').status_code == 401
+    revoked_tokens.loaded_at = None
@@ -0,0 +1,98 @@
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+
+from GameMaster_app.traffic import compare, read_traces, replay, trace_request
+
+
+@pytest.fixture
+def capture(settings, tmp_path):
+    settings.TRAFFIC_CAPTURE_FILE = str(tmp_path / 'capture.jsonl')
+    settings.TRAFFIC_CAPTURE_RATE = 1.0
+    return settings.TRAFFIC_CAPTURE_FILE
+
+
+@pytest.mark.django_db
+def test_capture_is_anonymized(client, gamemaster, capture, index_url, dashboard_url):
+    """
+    Test that sampled requests are written with URL name, role and timing, and without personal values.
+    """
+    client.post(index_url, {'username': '2024', 'password': '123456', 'csrfmiddlewaretoken': 'true'})
+    client.post(index_url, {'username': 'testuser', 'password': 'testpassword'})
+    client.get(dashboard_url, {'page': '2', 'q': 'secret', 'token': '42'})
+    numeric, login, dashboard = read_traces(capture)
+    assert numeric['f'] == {'username': ['xxxx'], 'password': ['xxxxxx'], 'csrfmiddlewaretoken': ['xxxx']}
+    assert (login['m'], login['v'], login['r']) == ('POST', 'index', 'anonymous')
+    assert login['f']['username'] == ['xxxxxxxx'] and login['f']['password'] == ['x' * 12]
+    assert (dashboard['v'], dashboard['r'], dashboard['s']) == ('dashboard', 'game_master', 200)
+    assert dashboard['q'] == {'page': ['2'], 'q': ['xxxxxx'], 'token': ['xx']}
+    assert dashboard['d'] > 0
+    assert 'testuser' not in open(capture).read()
+
+
+@pytest.mark.django_db
+def test_json_body_is_captured_and_replayed(client, game_session, capture):
+    """
+    Test that JSON bodies are recorded with values masked by key, and replayed as JSON.
+    """
+    client.login(username='testuser', password='testpassword')
+    requests = [{'resource': 'sessions', 'id': game_session.pk, 'fields': 'title'},
+                {'resource': 'characters', 'session': game_session.pk, 'note': 'Gandalf', 'secret': 1234}]
+    client.post(reverse('api_batch'), json.dumps({'requests': requests, 'flag': True}),
+                content_type='application/json')
+    client.post(reverse('api_batch'), '{broken', content_type='application/json')
+    batch, broken = read_traces(capture)
+    assert batch['f'] == {}
+    assert batch['j'] == {'flag': True, 'requests': [
+        {'resource': 'xxxxxxxx', 'id': game_session.pk, 'fields': 'xxxxx'},
+        {'resource': 'xxxxxxxxxx', 'session': game_session.pk, 'note': 'xxxxxxx', 'secret': 0},
+    ]}
+    assert broken['j'] == 'x' * 7
+    request = trace_request(batch, 'http://localhost:8000')
+    assert request.get_header('Content-type') == 'application/json'
+    assert json.loads(request.data) == batch['j']
+
+
+@pytest.mark.django_db
+def test_no_capture_by_default(client, tmp_path, index_url):
+    """
+    Test that nothing is written when no capture file is configured.
+    """
+    client.get(index_url)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_replay_reports_differences(live_server, gamemaster, tmp_path):
+    """
+    Test that a capture is replayed against a running server with the role's token, and that status changes,
+    skipped roles and skipped views are reported per view.
+    """
+    path = tmp_path / 'capture.jsonl'
+    traces = [
+        {'ts': 1.0, 'm': 'GET', 'v': 'index', 'k': {}, 'q': {}, 'f': {}, 'r': 'anonymous', 's': 200, 'd': 5.0},
+        {'ts': 1.1, 'm': 'GET', 'v': 'dashboard', 'k': {}, 'q': {}, 'f': {}, 'r': 'game_master', 's': 200, 'd': 9.0},
+        {'ts': 1.2, 'm': 'GET', 'v': 'dashboard', 'k': {}, 'q': {}, 'f': {}, 'r': 'player', 's': 200, 'd': 8.0},
+        {'ts': 1.3, 'm': 'GET', 'v': 'slow_queries', 'k': {}, 'q': {}, 'f': {}, 'r': 'game_master', 's': 200,
+         'd': 3.0},
+        {'ts': 1.4, 'm': 'POST', 'v': 'delete_account', 'k': {}, 'q': {}, 'f': {}, 'r': 'game_master', 's': 302,
+         'd': 4.0},
+        {'ts': 1.5, 'm': 'GET', 'v': 'analytics', 'k': {}, 'q': {}, 'f': {}, 'r': 'game_master', 's': 200, 'd': 4.0},
+    ]
+    path.write_text(''.join(json.dumps(trace) + '\n' for trace in traces))
+    out = StringIO()
+    call_command('replay_traffic', str(path), base_url=live_server.url, speed=0, users=['game_master=testuser'],
+                 skipped_views=['analytics'], stdout=out)
+    assert 'Replaying 6 requests' in out.getvalue()
+    rows = {row['view']: row for row in compare(replay(read_traces(path), live_server.url, speed=0))}
+    assert rows['index']['status_changes'] == 0 and rows['index']['replayed_p50'] > 0
+    assert rows['dashboard']['skipped'] == 2
+    report = {line.split()[0]: line.split() for line in out.getvalue().splitlines()[2:]}
+    assert report['dashboard'][1:3] == ['2', '1']
+    assert report['slow_queries'][-2:] == ['1', '0']
+    assert report['delete_account'][1:3] == ['1', '1'] and report['analytics'][1:3] == ['1', '1']
+    assert User.objects.get(username='testuser').is_active